@@ -0,0 +1,133 @@
+from collections import namedtuple
+
+import numpy as np
+
+from goal_solver import MAX_MONTHS, solve_monthly_contributions, target_year_from_months
+
+# Splits a limited monthly budget across goals, greedy with repair:
+#   1. Goals are funded with their steady required contribution, cheapest first, while the budget
+#      lasts. Taking the cheapest first meets the most goals on time with steady contributions.
+#   2. Repair: the remaining goals, earliest deadline first, are funded from the money left over
+#      in each month (including the money freed once a funded goal's target is reached) if that
+#      is enough to meet them on time.
+#   3. Goals that still can't be met on time take what is left from then on, smallest first to
+#      keep the total lateness down, and are reached late (or not within MAX_MONTHS).
+# Money is deposited at the end of each month, as in goal_solver.
+
+# Status of each goal in the plan
+ON_TIME = 'on_time'
+LATE = 'late'
+UNFUNDED = 'unfunded'  # Not reached within MAX_MONTHS with the money left over
+
+Allocation = namedtuple('Allocation', ['required', 'contributions', 'schedule', 'status', 'completion_months', 'months_late'])
+
+
+# Function to plan monthly contributions to every goal from a monthly budget.
+# months is the number of months until each goal's target; the schedule is (goals x max_months).
+def allocate_funds(goal_amounts, current_savings, annual_rates, months, available, max_months=MAX_MONTHS):
+    goal_amounts, current_savings, annual_rates, months = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(goal_amounts, dtype=float)),
+        np.asarray(current_savings, dtype=float),
+        np.asarray(annual_rates, dtype=float),
+        np.asarray(months, dtype=float),
+    )
+    goal_count = len(goal_amounts)
+    monthly_rates = annual_rates / 100 / 12
+    deadlines = np.clip(np.ceil(months), 0, max_months).astype(int)
+    month_numbers = np.arange(max_months)
+    leftover = np.full(max_months, max(float(available), 0.0))
+    schedule = np.zeros((goal_count, max_months))
+    status = np.full(goal_count, UNFUNDED, dtype=object)
+    completion_months = np.full(goal_count, np.nan)
+
+    # Goals the savings already cover need nothing
+    funded = current_savings >= goal_amounts
+    status[funded] = ON_TIME
+    completion_months[funded] = 0
+
+    # 1. Steady contributions, cheapest goals first (earliest deadline breaks ties)
+    required = solve_monthly_contributions(goal_amounts, current_savings, annual_rates, deadlines).values
+    candidates = np.flatnonzero(~funded & np.isfinite(required))
+    order = candidates[np.lexsort((deadlines[candidates], required[candidates]))]
+    taken = order[np.cumsum(required[order]) <= leftover[0] + 1e-9]
+    schedule[taken] = np.where(month_numbers < deadlines[taken, None], required[taken, None], 0.0)
+    leftover = np.maximum(leftover - schedule[taken].sum(axis=0), 0.0)
+    status[taken] = ON_TIME
+    completion_months[taken] = deadlines[taken]
+
+    # 2. Repair: fund the rest on time from the money left over, earliest deadline first
+    for goal in np.argsort(deadlines, kind='stable'):
+        deadline = deadlines[goal]
+        if status[goal] == ON_TIME or deadline == 0:
+            continue
+        growth = (1 + monthly_rates[goal]) ** (deadline - 1 - month_numbers[:deadline])
+        needed = goal_amounts[goal] - current_savings[goal] * (1 + monthly_rates[goal]) ** deadline
+        value = np.cumsum(leftover[:deadline] * growth)
+        if value[-1] < needed:
+            continue
+        last = int(np.searchsorted(value, needed))
+        contributions = leftover[:last + 1].copy()
+        contributions[last] -= (value[last] - needed) / growth[last]
+        schedule[goal, :last + 1] = contributions
+        leftover[:last + 1] = np.maximum(leftover[:last + 1] - contributions, 0.0)
+        status[goal] = ON_TIME
+        completion_months[goal] = deadline
+
+    # 3. The rest are reached late from whatever is left, smallest amount first
+    remaining = np.flatnonzero(status != ON_TIME)
+    for goal in remaining[np.argsort((goal_amounts - current_savings)[remaining], kind='stable')]:
+        # After m months the goal is reached once savings + sum(deposit_t * (1 + r) ** -t) >= goal * (1 + r) ** -m
+        discount = (1 + monthly_rates[goal]) ** -(month_numbers + 1.0)
+        value = current_savings[goal] + np.cumsum(leftover * discount)
+        reached = np.flatnonzero(value >= goal_amounts[goal] * discount)
+        if not reached.size:
+            continue
+        last = int(reached[0])
+        contributions = leftover[:last + 1].copy()
+        contributions[last] = max(contributions[last] - (value[last] - goal_amounts[goal] * discount[last]) / discount[last], 0.0)
+        schedule[goal, :last + 1] = contributions
+        leftover[:last + 1] = np.maximum(leftover[:last + 1] - contributions, 0.0)
+        status[goal] = LATE
+        completion_months[goal] = last + 1
+
+    months_late = np.maximum(completion_months - deadlines, 0)
+    return Allocation(np.where(funded, 0.0, required), schedule[:, 0], schedule, status, completion_months, months_late)
+
+
+# Function to turn a plan into one row per goal: the steady contribution it needs, what it gets this month,
+# and the year it is reached
+def plan_rows(names, target_years, allocation, current_year):
+    rows = []
+    for index, name in enumerate(names):
+        completion = allocation.completion_months[index]
+        rows.append({
+            'name': name,
+            'target_year': int(target_years[index]),
+            'required': None if np.isnan(allocation.required[index]) else float(allocation.required[index]),
+            'contribution': float(allocation.contributions[index]),
+            'reached_year': None if np.isnan(completion) else (current_year if completion == 0 else target_year_from_months(current_year, completion)),
+            'months_late': None if np.isnan(completion) else int(allocation.months_late[index]),
+            'status': allocation.status[index],
+        })
+    return rows
+
+
+# Function to plan a monthly budget across Future You goals (dicts as stored by the Future You tool)
+def plan_goals(goals, available, current_year):
+    allocation = allocate_funds(
+        [goal['goal_amount'] for goal in goals],
+        [goal['current_savings'] for goal in goals],
+        [goal['interest_rate'] for goal in goals],
+        [12 * (goal['target_year'] - current_year) for goal in goals],
+        available,
+    )
+    return plan_rows([goal['goal_name'] for goal in goals], [goal['target_year'] for goal in goals], allocation, current_year)
+
+
+# Function to describe a goal's place in the plan for display
+def plan_status(row):
+    if row['status'] == ON_TIME:
+        return "On time"
+    if row['status'] == LATE:
+        return f"{row['months_late']} months late"
+    return "Not reached"
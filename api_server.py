@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+from projections import project_future_values
+from goal_solver import solve_monthly_contributions, solve_months_to_goal
+from ledger import AccountLedger, GoalLedger
+from household import projection_table, goal_progress, score_household
+
+# Local HTTP API over the same math the apps use, for other tools that need the numbers.
+# It is a plain asyncio server: requests are parsed on the event loop, the math runs in a process
+# pool, and identical requests are answered from a response cache (or share the computation
+# already in flight). Every endpoint takes a batch of items in one POST.
+#
+#   POST /projections      {"items": [{"principal": 1000, "annual_rate": 5, "years": 10, "monthly_contribution": 100}]}
+#   POST /contributions    {"items": [{"goal_amount": 50000, "current_savings": 0, "interest_rate": 5, "target_year": 2030}]}
+#   POST /months-to-goal   {"items": [{"goal_amount": 50000, "current_savings": 0, "interest_rate": 5, "monthly_contribution": 500}]}
+#   POST /goal-progress    {"accounts": [...], "goals": [...]}   (ledger records, as in the bulk import)
+#   POST /score            a household document, as read by batch_cli.py
+#   GET  /health
+#
+#   python api_server.py --port 8600 --workers 4
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8600
+CACHE_ENTRIES = 4096
+MAX_BODY = 10 * 1024 * 1024
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Function to convert NumPy results to JSON-ready lists, with NaN as null
+def to_json_list(values):
+    return [None if math.isnan(value) else value for value in np.asarray(values, dtype=float).tolist()]
+
+
+# Function to turn a result into plain JSON values: NumPy scalars become numbers and NaN becomes null
+def plain(value):
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+# Function to read a numeric field from every item of a batch
+def field(items, name, default=None):
+    try:
+        return np.array([item[name] if default is None else item.get(name, default) for item in items], dtype=float)
+    except KeyError:
+        raise ValueError(f"every item needs '{name}'")
+
+
+def projections(body):
+    items = body['items']
+    values = project_future_values(
+        field(items, 'principal'),
+        field(items, 'annual_rate'),
+        field(items, 'years'),
+        field(items, 'monthly_contribution', 0.0),
+    )
+    return {'future_values': to_json_list(values)}
+
+
+def contributions(body):
+    items = body['items']
+    current_year = body.get('current_year', date.today().year)
+    months = np.array([
+        item['months'] if 'months' in item else 12 * (item['target_year'] - current_year) for item in items
+    ], dtype=float)
+    solution = solve_monthly_contributions(field(items, 'goal_amount'), field(items, 'current_savings', 0.0), field(items, 'interest_rate'), months)
+    return {'monthly_contributions': to_json_list(solution.values), 'status': solution.status.tolist()}
+
+
+def months_to_goal(body):
+    items = body['items']
+    solution = solve_months_to_goal(field(items, 'goal_amount'), field(items, 'current_savings', 0.0), field(items, 'interest_rate'), field(items, 'monthly_contribution'))
+    return {'months': to_json_list(solution.values), 'status': solution.status.tolist()}
+
+
+def progress(body):
+    accounts = AccountLedger.from_records(body.get('accounts', []))
+    goals = GoalLedger.from_records(body.get('goals', []))
+    table = projection_table(accounts, goals, body.get('selected_year', date.today().year))
+    return {'goals': goal_progress(goals, table)}
+
+
+def score(body):
+    summary, goal_rows = score_household(body)
+    return {'household': summary, 'goals': goal_rows}
+
+
+ROUTES = {
+    '/projections': projections,
+    '/contributions': contributions,
+    '/months-to-goal': months_to_goal,
+    '/goal-progress': progress,
+    '/score': score,
+}
+
+
+# Function run in a worker process: decode a request body, compute and encode the response
+def handle(path, body):
+    try:
+        request = json.loads(body)
+        if not isinstance(request, dict):
+            raise ValueError("the request body must be a JSON object")
+        result = ROUTES[path](request)
+        return 200, json.dumps(plain(result), allow_nan=False)
+    except (ValueError, KeyError, TypeError, AttributeError) as error:
+        # Missing fields or values of the wrong type in the request
+        return 400, json.dumps({'error': str(error)})
+    except Exception as error:
+        return 500, json.dumps({'error': f"Internal error: {error}"})
+
+
+class ResponseCache:
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+
+    # Function to answer from the cache, join an identical request already running, or compute
+    async def get_or_compute(self, key, compute):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if key in self.in_flight:
+            self.hits += 1
+            return await asyncio.shield(self.in_flight[key])
+
+        self.misses += 1
+        task = asyncio.ensure_future(compute())
+        self.in_flight[key] = task
+        try:
+            response = await asyncio.shield(task)
+        finally:
+            self.in_flight.pop(key, None)
+        if response[0] == 200:
+            self.entries[key] = response
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return response
+
+
+class ApiServer:
+    def __init__(self, workers=None, cache_entries=CACHE_ENTRIES):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.cache = ResponseCache(cache_entries)
+        self.requests = 0
+
+    async def compute(self, path, body):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, handle, path, body)
+
+    async def respond(self, method, path, body):
+        if path == '/health':
+            return 200, json.dumps({'status': 'ok', 'requests': self.requests, 'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses})
+        if path not in ROUTES:
+            raise HttpError(404, f"Unknown path {path}")
+        if method != 'POST':
+            raise HttpError(405, "Use POST")
+        # Requests that leave out the year are answered for this year, so the year is part of the key
+        key = f"{path}:{date.today().year}:{hashlib.sha1(body).hexdigest()}"
+        return await self.cache.get_or_compute(key, lambda: self.compute(path, body))
+
+    # Function to serve one connection, keeping it open for further requests
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                keep_alive = True
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY:
+                        raise HttpError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b'{}'
+                    self.requests += 1
+                    status, payload = await self.respond(method, target.split('?', 1)[0], body)
+                except HttpError as error:
+                    status, payload = error.status, json.dumps({'error': str(error)})
+                    # An unread body would be taken for the next request
+                    keep_alive = keep_alive and status != 413
+                except ValueError:
+                    status, payload, keep_alive = 400, json.dumps({'error': "Malformed request"}), False
+                except Exception:
+                    # E.g. a worker process died; answer rather than dropping the connection
+                    status, payload, keep_alive = 500, json.dumps({'error': "Internal error"}), False
+                data = payload.encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        print(f"Serving on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve projections and goal math over a local HTTP API.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--cache-entries', type=int, default=CACHE_ENTRIES)
+    args = parser.parse_args()
+    try:
+        asyncio.run(ApiServer(args.workers, args.cache_entries).run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+import streamlit as st
+
+# The three tools as one multipage app, run with `streamlit run app.py`. All pages share one session,
+# so the Current You tool picks up the expense limit worked out by the Future You tool, and one
+# server process (with its modules and process-wide caches) serves every page. Each tool still runs
+# on its own as before; every page sets up its own page config and styles (styles.setup_page).
+
+PAGES = [
+    st.Page("future_you.py", title="Future You", default=True),
+    st.Page("current_you.py", title="Current You"),
+    st.Page("couples_tool.py", title="Get Aligned as a Couple"),
+]
+
+st.navigation(PAGES).run()
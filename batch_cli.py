@@ -0,0 +1,133 @@
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from household import score_household
+
+# Batch scoring of many households without the UI. Every *.json file in a directory is one
+# household (see household.py for the format); files are scored in a process pool and the results
+# are written as two tables, one row per household and one row per goal, to CSV or Parquet.
+#
+#   python batch_cli.py households/ --output results/scores.csv --workers 8
+#
+# writes results/scores.csv and results/scores_goals.csv. Parquet output needs pyarrow.
+
+FILES_PER_TASK = 16  # Households sent to a worker at a time, so small files don't pay one round trip each
+
+
+# Function to load and score one household file, returning (summary row, goal rows)
+def score_file(path):
+    household_id = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path, encoding='utf-8') as file:
+            household = json.load(file)
+        household.setdefault('id', household_id)
+        summary, goal_rows = score_household(household)
+        summary['error'] = ''
+        return summary, goal_rows
+    except Exception as error:
+        return {'household': household_id, 'error': f"{type(error).__name__}: {error}"}, []
+
+
+# Function to score every file, in parallel when more than one worker is asked for
+def score_files(paths, workers=None):
+    if workers == 1:
+        yield from map(score_file, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(score_file, paths, chunksize=FILES_PER_TASK)
+
+
+# Function to turn NaN into an empty cell
+def clean(row):
+    return {key: '' if isinstance(value, float) and math.isnan(value) else value for key, value in row.items()}
+
+
+class CsvTable:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = None
+        self.rows = []  # Rows seen before the first complete one (households that failed to load)
+
+    # Function to write rows as they arrive, taking the columns from the first row that has them all
+    def write(self, row):
+        if self.writer is None:
+            if row.get('error'):
+                self.rows.append(row)
+                return
+            self.writer = csv.DictWriter(self.file, fieldnames=list(row), restval='', extrasaction='ignore')
+            self.writer.writeheader()
+            self.writer.writerows(clean(pending) for pending in self.rows)
+            self.rows = []
+        self.writer.writerow(clean(row))
+
+    def close(self):
+        if self.writer is None and self.rows:
+            self.writer = csv.DictWriter(self.file, fieldnames=['household', 'error'], extrasaction='ignore')
+            self.writer.writeheader()
+            self.writer.writerows(self.rows)
+        self.file.close()
+
+
+class ParquetTable:
+    def __init__(self, path):
+        self.path = path
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+
+    def close(self):
+        import pandas as pd
+        pd.DataFrame(self.rows).to_parquet(self.path, index=False)
+
+
+# Function to open the household and goal tables for an output path
+def open_tables(output):
+    base, extension = os.path.splitext(output)
+    if extension == '.parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            sys.exit("Parquet output needs pyarrow (pip install pyarrow); use a .csv output instead.")
+        table_type = ParquetTable
+    elif extension == '.csv':
+        table_type = CsvTable
+    else:
+        sys.exit("The output must end in .csv or .parquet.")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return table_type(output), table_type(f"{base}_goals{extension}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a directory of household JSON files.")
+    parser.add_argument('directory', help="directory with one JSON file per household")
+    parser.add_argument('--output', default='household_scores.csv', help="output path ending in .csv or .parquet")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(args.directory, name) for name in os.listdir(args.directory) if name.endswith('.json')
+    )
+    households, goals = open_tables(args.output)
+    failed = 0
+    try:
+        for summary, goal_rows in score_files(paths, args.workers):
+            failed += bool(summary['error'])
+            households.write(summary)
+            for row in goal_rows:
+                goals.write(row)
+    finally:
+        households.close()
+        goals.close()
+    print(f"Scored {len(paths) - failed} of {len(paths)} households; {failed} failed.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+# Load generator for api_server.py. Opens a number of keep-alive connections and sends batched
+# requests as fast as the server answers for a fixed time, then reports throughput and latency.
+# A share of the requests repeats earlier bodies, so the response cache is exercised as well.
+#
+#   python api_server.py --port 8600 &
+#   python benchmarks/api_load.py --port 8600 --connections 32 --seconds 10 --repeat-share 0.5
+
+DEFAULT_PORT = 8600
+
+
+# Function to build a random request body for one endpoint
+def random_request(batch_size):
+    path = random.choice(['/projections', '/contributions', '/months-to-goal'])
+    items = []
+    for _ in range(batch_size):
+        item = {
+            'goal_amount': random.randint(1, 100) * 1000,
+            'current_savings': random.randint(0, 50) * 100,
+            'interest_rate': random.choice([0, 2.5, 5, 7]),
+        }
+        if path == '/projections':
+            item = {'principal': item['current_savings'], 'annual_rate': item['interest_rate'], 'years': random.randint(1, 40), 'monthly_contribution': random.randint(0, 20) * 50}
+        elif path == '/contributions':
+            item['months'] = random.randint(12, 480)
+        else:
+            item['monthly_contribution'] = random.randint(1, 40) * 50
+        items.append(item)
+    return path, json.dumps({'items': items}).encode()
+
+
+async def send(reader, writer, host, path, body):
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+# Function to keep one connection busy until the deadline, recording each request's latency
+async def client(host, port, deadline, batch_size, repeat_share, seen, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            if seen and random.random() < repeat_share:
+                path, body = random.choice(seen)
+            else:
+                path, body = random_request(batch_size)
+                seen.append((path, body))
+            start = time.perf_counter()
+            status = await send(reader, writer, host, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host, port, connections, seconds, batch_size, repeat_share):
+    latencies, errors, seen = [], [], []
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, deadline, batch_size, repeat_share, seen, latencies, errors) for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.1f}s: {len(latencies) / elapsed:.0f} requests/s, {len(errors)} errors")
+    if latencies:
+        print(f"latency p50 {statistics.median(latencies) * 1000:.1f} ms, "
+              f"p95 {latencies[int(0.95 * (len(latencies) - 1))] * 1000:.1f} ms, "
+              f"max {latencies[-1] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate load against the local API server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--batch-size', type=int, default=50, help="items per request")
+    parser.add_argument('--repeat-share', type=float, default=0.5, help="share of requests that repeat an earlier body")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(run(args.host, args.port, args.connections, args.seconds, args.batch_size, args.repeat_share))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import date
+
+# Rerun benchmark for the three apps, driven headlessly by Streamlit's AppTest. Each household is
+# seeded with 1, 10, 100 or 1000 accounts, debts, goals and expense categories through the same
+# journal the apps restore from, then typical interactions are replayed and every rerun's wall time,
+# peak traced memory and element count (what it sent to the browser) are recorded.
+#
+#   python benchmarks/rerun.py --json rerun.json
+#   python benchmarks/rerun.py --sizes 1 100 --baseline rerun.json   # exit 1 on regressions
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [1, 10, 100, 1000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25  # Allowed slowdown or memory growth against the baseline, as a fraction
+NOISE_SECONDS = 0.05  # Slowdowns smaller than this are never reported
+TIMEOUT = 600
+
+# The journal is opened from COUPLES_TOOL_DB when persistence is first imported, so point it at a
+# scratch database before the apps are loaded. The directory is removed when the run ends (main), or
+# at exit when the module is only imported.
+SCRATCH = tempfile.TemporaryDirectory(prefix='rerun-benchmark-', ignore_cleanup_errors=True)
+DATABASE = os.path.join(SCRATCH.name, 'state.db')
+os.environ['COUPLES_TOOL_DB'] = DATABASE
+sys.path.insert(0, REPO)
+
+from persistence import Journal  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+
+# Function to build the saved state of a household with n of everything
+def seed_state(n):
+    year = date.today().year
+    state = {
+        'couples.widget.partner1_paycheck': 6000.0,
+        'couples.widget.partner1_expenses': 2500.0,
+        'couples.widget.partner2_paycheck': 5000.0,
+        'couples.widget.partner2_expenses': 2000.0,
+        'couples.widget.joint_income': 500.0,
+        'couples.widget.joint_expenses': 1500.0,
+        'future_you.widget.monthly_income': 8000.0,
+        'future_you.retirement_goal_added': True,
+        'current_you.widget.post_tax_income': 7000.0,
+        'current_you.widget.future_you_limit': 4000.0,
+    }
+    for partner in ('responses_1', 'responses_2'):
+        state[f'couples.{partner}.accounts'] = [
+            {'name': f'Account {i}', 'type': 'Savings', 'rate': 2.0 + i % 6, 'balance': 1000.0 * (i + 1)} for i in range(n)
+        ]
+        state[f'couples.{partner}.debts'] = [
+            {'name': f'Debt {i}', 'amount': 500.0 * (i + 1), 'rate': 3.0 + i % 15, 'payment': 50.0 + i % 200} for i in range(n)
+        ]
+        state[f'couples.{partner}.goals'] = [
+            {'name': f'Goal {i}', 'cost': 20000.0 + 100 * i, 'target_year': year + 1 + i % 40, 'account': f'Account {i}'} for i in range(n)
+        ]
+    state['couples.joint_responses.joint_accounts'] = [
+        {'name': f'Joint {i}', 'type': 'Investment', 'rate': 5.0, 'balance': 2000.0 * (i + 1)} for i in range(n)
+    ]
+    state['couples.joint_responses.joint_goals'] = [
+        {'name': f'Joint Goal {i}', 'cost': 10000.0 + 50 * i, 'target_year': year + 1 + i % 30, 'account': None} for i in range(n)
+    ]
+    state['future_you.goals'] = [
+        {'goal_name': f'Goal {i}', 'goal_amount': 20000 + 100 * i, 'current_savings': 500.0, 'interest_rate': 5.0,
+         'monthly_contribution': 100 + i % 300, 'target_year': year + 1 + i % 40, 'goal_type': 'Target Year'}
+        for i in range(n)
+    ]
+    state['current_you.fixed_expenses'] = {f'Fixed {i}': 100.0 + i for i in range(n)}
+    state['current_you.variable_expenses'] = {f'Variable {i}': 50.0 + i for i in range(n)}
+    return state
+
+
+# Function to save a seeded household in the scratch journal and return its id
+def seed_household(n):
+    household = uuid.uuid4().hex
+    journal = Journal(household, DATABASE)
+    for key, value in seed_state(n).items():
+        journal.record('set', key, value)
+    return household
+
+
+def click(at, label, sidebar=False):
+    buttons = at.sidebar.button if sidebar else at.button
+    next(button for button in buttons if button.label == label).click()
+
+
+def set_by_label(elements, label, value):
+    next(element for element in elements if element.label == label).set_value(value)
+
+
+# Interactions of each app, in order, as (name, function that changes the app before the rerun)
+def couples_add_account(at):
+    at.text_input(key='account_1').input('Benchmark Account')
+    at.number_input(key='balance_1').set_value(1234.0)
+    click(at, "Add this Account for Partner 1")
+
+
+def couples_change_year(at):
+    set_by_label(at.number_input, "Select the year to project your financial situation:", date.today().year + 20)
+
+
+def current_add_category(at):
+    next(element for element in at.text_input if element.label == "Add a new fixed expense category:").input('Benchmark')
+    click(at, "Add Fixed Expense Category")
+
+
+def future_add_goal(at):
+    at.text_input[0].input('Benchmark Goal')
+    set_by_label(at.number_input, "Goal amount", 25000.0)
+    click(at, "Add goal to timeline")
+
+
+SCENARIOS = {
+    'couples_tool': [
+        ('show dashboard', lambda at: click(at, "Show Dashboard")),
+        ('add item', couples_add_account),
+        ('change year', couples_change_year),
+        ('show dashboard again', lambda at: click(at, "Show Dashboard")),
+    ],
+    'current_you': [
+        ('add item', current_add_category),
+        ('calculate expenses', lambda at: click(at, "Calculate Expenses")),
+    ],
+    'future_you': [
+        ('add item', future_add_goal),
+        ('open goal editor', lambda at: click(at, "Edit Goal", sidebar=True)),
+        ('update goal', lambda at: click(at, "Update Goal", sidebar=True)),
+    ],
+}
+
+
+# Function to count the elements and blocks a rerun left on the page (main area and sidebar), i.e. the
+# messages it sent to the browser
+def count_elements(at):
+    def count(node):
+        return sum(1 + count(child) for child in getattr(node, 'children', {}).values())
+    return count(at.main) + count(at.sidebar)
+
+
+# Function to replay one app's interactions on a freshly seeded household.
+# Returns {interaction: {'seconds', 'elements'}} or, with trace_memory, {interaction: {'peak_mb', 'elements'}}.
+def replay(app, n, trace_memory=False):
+    at = AppTest.from_file(os.path.join(REPO, f'{app}.py'), default_timeout=TIMEOUT)
+    at.query_params['household'] = seed_household(n)
+    steps = [('first render', lambda at: None)] + SCENARIOS[app]
+    results = {}
+    for name, interact in steps:
+        interact(at)
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+        if trace_memory:
+            results[name] = {'peak_mb': tracemalloc.get_traced_memory()[1] / 2 ** 20}
+            tracemalloc.stop()
+        else:
+            results[name] = {'seconds': elapsed}
+        results[name]['elements'] = count_elements(at)
+        if at.exception:
+            raise RuntimeError(f"{app} failed at '{name}' with {n} items: {at.exception[0].value}")
+    return results
+
+
+# Function to measure every app at every size: median wall time over repeat runs, plus one traced run for
+# memory and the element count
+def measure(apps, sizes, repeat=DEFAULT_REPEAT):
+    results = {}
+    for app in apps:
+        for n in sizes:
+            timings = [replay(app, n) for _ in range(repeat)]
+            memory = replay(app, n, trace_memory=True)
+            results.setdefault(app, {})[str(n)] = {
+                name: {
+                    'seconds': statistics.median(run[name]['seconds'] for run in timings),
+                    'peak_mb': memory[name]['peak_mb'],
+                    'elements': memory[name]['elements'],
+                }
+                for name in memory
+            }
+    return results
+
+
+# Function to list the reruns that got slower or used more memory than the baseline allows
+def regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    found = []
+    for app, sizes in results.items():
+        for n, steps in sizes.items():
+            for name, measurement in steps.items():
+                before = baseline.get(app, {}).get(n, {}).get(name)
+                if not before:
+                    continue
+                if measurement['seconds'] > before['seconds'] * (1 + tolerance) and measurement['seconds'] - before['seconds'] > NOISE_SECONDS:
+                    found.append(f"{app} n={n} {name}: {measurement['seconds']:.3f}s vs baseline {before['seconds']:.3f}s")
+                if measurement['peak_mb'] > before['peak_mb'] * (1 + tolerance):
+                    found.append(f"{app} n={n} {name}: {measurement['peak_mb']:.1f} MB vs baseline {before['peak_mb']:.1f} MB")
+                # The element count doesn't vary between runs, so any growth is reported
+                if measurement['elements'] > before.get('elements', measurement['elements']):
+                    found.append(f"{app} n={n} {name}: {measurement['elements']} elements vs baseline {before['elements']}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure rerun time and peak memory of the apps as households grow.")
+    parser.add_argument('--apps', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timed runs per size (the median is reported)")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="compare against results saved earlier with --json")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    with SCRATCH:
+        results = measure(args.apps, args.sizes, args.repeat)
+    print(f"{'app':<14}{'n':>6}  {'interaction':<22}{'seconds':>10}{'peak MB':>10}{'elements':>10}")
+    for app, sizes in results.items():
+        for n, steps in sizes.items():
+            for name, measurement in steps.items():
+                print(f"{app:<14}{n:>6}  {name:<22}{measurement['seconds']:>10.3f}{measurement['peak_mb']:>10.1f}{measurement['elements']:>10}")
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            found = regressions(results, json.load(file), args.tolerance)
+        for message in found:
+            print(f"REGRESSION {message}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
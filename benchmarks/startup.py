@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Cold-start benchmark for the three apps. Every measurement runs in a fresh interpreter, so nothing
+# is already imported or cached:
+#   import  - time to import the app module (the Future You script also runs its first page here)
+#   render  - time for Streamlit's headless AppTest to render the first page, after Streamlit itself is imported
+# It also reports which heavy libraries the app itself loaded, on import and by the first render.
+#
+#   python benchmarks/startup.py --repeat 5 --json startup.json
+#   python benchmarks/startup.py --baseline startup.json   # fail when a median got slower than allowed
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = ['couples_tool', 'current_you', 'future_you']
+HEAVY_MODULES = ['pandas', 'matplotlib', 'plotly.graph_objects', 'numpy', 'pyarrow']
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25  # Allowed slowdown against the baseline, as a fraction
+
+# Both scripts snapshot sys.modules once the harness is loaded and only report the heavy modules the app
+# added, since Streamlit and AppTest load some of them (e.g. numpy, pandas) themselves
+IMPORT_SCRIPT = """
+import importlib, json, sys, time
+import streamlit
+loaded = set(sys.modules)
+start = time.perf_counter()
+importlib.import_module({app!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': [name for name in {heavy!r} if name in sys.modules and name not in loaded]}}))
+"""
+
+RENDER_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+# Render an empty page first, so the modules Streamlit loads for any run are in the snapshot
+AppTest.from_string("import streamlit as st", default_timeout=120).run()
+loaded = set(sys.modules)
+app = AppTest.from_file({path!r}, default_timeout=120)
+start = time.perf_counter()
+app.run()
+elapsed = time.perf_counter() - start
+if app.exception:
+    raise SystemExit(app.exception[0].value)
+print(json.dumps({{'seconds': elapsed, 'modules': [name for name in {heavy!r} if name in sys.modules and name not in loaded]}}))
+"""
+
+
+# Function to run one measurement script in a clean interpreter and return its JSON result
+def run_clean(script, database):
+    env = dict(os.environ, COUPLES_TOOL_DB=database, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=REPO,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# Function to measure import and first-render times of each app
+def measure(apps=APPS, repeat=DEFAULT_REPEAT):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'startup.db')
+        for app in apps:
+            imports = [run_clean(IMPORT_SCRIPT.format(app=app, heavy=HEAVY_MODULES), database) for _ in range(repeat)]
+            renders = [run_clean(RENDER_SCRIPT.format(path=os.path.join(REPO, f'{app}.py'), heavy=HEAVY_MODULES), database) for _ in range(repeat)]
+            results[app] = {
+                'import_seconds': statistics.median(run['seconds'] for run in imports),
+                'render_seconds': statistics.median(run['seconds'] for run in renders),
+                'import_modules': imports[-1]['modules'],
+                'render_modules': renders[-1]['modules'],
+            }
+    return results
+
+
+# Function to list the measurements that got slower than the baseline allows
+def regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    found = []
+    for app, measurement in results.items():
+        for metric in ('import_seconds', 'render_seconds'):
+            before = baseline.get(app, {}).get(metric)
+            if before and measurement[metric] > before * (1 + tolerance):
+                found.append(f"{app} {metric}: {measurement[metric]:.3f}s vs baseline {before:.3f}s")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import and first-render times of the apps.")
+    parser.add_argument('--apps', nargs='+', default=APPS, choices=APPS)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="clean runs per measurement (the median is reported)")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="compare against results saved earlier with --json")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = measure(args.apps, args.repeat)
+    print(f"{'app':<14}{'import (s)':>12}{'render (s)':>12}  loaded by first render")
+    for app, measurement in results.items():
+        print(f"{app:<14}{measurement['import_seconds']:>12.3f}{measurement['render_seconds']:>12.3f}  {', '.join(measurement['render_modules']) or '-'}")
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            found = regressions(results, json.load(file), args.tolerance)
+        for message in found:
+            print(f"REGRESSION {message}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
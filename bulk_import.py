@@ -0,0 +1,217 @@
+import csv
+import io
+import json
+import math
+from collections import namedtuple
+from datetime import date
+
+from ledger import account_names, goal_account
+
+# Bulk import of accounts, debts and goals for the Couples tool from CSV, JSON or JSON Lines files.
+# Files are read as a stream in chunks of rows and validated in a single pass, so a large export
+# never has to be loaded whole. Every row names its section (partner_1, partner_2 or joint) and
+# its kind (account, debt or goal), e.g.
+#
+#   section,kind,name,type,rate,balance,amount,payment,cost,target_year,account
+#   partner_1,account,Emergency Fund,Savings,4.5,12000,,,,,
+#   partner_1,goal,House,,,,,,60000,2030,Emergency Fund
+#
+# A goal can draw on several accounts, separated by ';' (or given as a list in JSON); a goal with no
+# account draws on all of its section's accounts.
+
+CHUNK_ROWS = 1000
+READ_SIZE = 64 * 1024
+MAX_ERRORS = 50
+
+SECTIONS = {
+    'partner_1': 'partner_1', 'partner 1': 'partner_1', '1': 'partner_1',
+    'partner_2': 'partner_2', 'partner 2': 'partner_2', '2': 'partner_2',
+    'joint': 'joint',
+}
+KINDS = {'account': 'account', 'accounts': 'account', 'debt': 'debt', 'debts': 'debt', 'goal': 'goal', 'goals': 'goal'}
+ACCOUNT_TYPES = ["Checking", "Savings", "Investment"]
+
+# Fields of each kind of row, matching the ledger columns, with the type each value is parsed to
+FIELDS = {
+    'account': (('name', str), ('type', str), ('rate', float), ('balance', float)),
+    'debt': (('name', str), ('amount', float), ('rate', float), ('payment', float)),
+    'goal': (('name', str), ('cost', float), ('target_year', int), ('account', str)),
+}
+
+ImportResult = namedtuple('ImportResult', ['records', 'errors', 'row_count'])
+
+
+# Function to read CSV rows as dicts from a text stream
+def iter_csv_rows(stream):
+    return csv.DictReader(stream)
+
+
+# Function to read JSON Lines rows from a text stream
+def iter_jsonl_rows(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+# Function to read the objects of a top-level JSON array incrementally instead of loading the whole file
+def iter_json_rows(stream, read_size=READ_SIZE):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        chunk = stream.read(read_size)
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer:
+                    break
+                if buffer[0] != '[':
+                    raise ValueError("JSON imports must be a list of rows.")
+                buffer = buffer[1:]
+                started = True
+                continue
+            buffer = buffer.lstrip(', \t\r\n')
+            if buffer.startswith(']'):
+                return
+            try:
+                row, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break  # The next row is not complete yet
+            yield row
+            buffer = buffer[end:]
+        if not chunk:
+            if buffer.strip():
+                raise ValueError("The JSON file ended in the middle of a row.")
+            return
+
+
+# Function to group any row iterator into chunks
+def iter_chunks(rows, chunk_rows=CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Function to parse one row into (section, kind, record), raising ValueError with a readable message
+def parse_row(row):
+    if not isinstance(row, dict):
+        raise ValueError("row is not an object")
+    section = SECTIONS.get(str(row.get('section', '')).strip().lower())
+    if section is None:
+        raise ValueError(f"unknown section '{row.get('section')}'")
+    kind = KINDS.get(str(row.get('kind', '')).strip().lower())
+    if kind is None:
+        raise ValueError(f"unknown kind '{row.get('kind')}'")
+    if section == 'joint' and kind == 'debt':
+        raise ValueError("joint debts are entered as a monthly payment, not imported")
+
+    record = {}
+    for field, parse in FIELDS[kind]:
+        value = row.get(field)
+        if kind == 'goal' and field == 'account' and isinstance(value, list):
+            value = ';'.join(str(name) for name in value)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            record[field] = None
+            continue
+        if parse is str:
+            record[field] = str(value).strip()
+            continue
+        # Numbers are read as floats first, so NaN, infinity and fractional years (2030.5) are reported, not truncated
+        try:
+            number = float(value.strip() if isinstance(value, str) else value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} '{value}' is not a valid {parse.__name__}")
+        if not math.isfinite(number):
+            raise ValueError(f"{field} '{value}' is not a finite number")
+        if parse is int and not number.is_integer():
+            raise ValueError(f"{field} '{value}' is not a whole number")
+        if number < 0:
+            raise ValueError(f"{field} can't be negative")
+        record[field] = parse(number)
+
+    if not record['name']:
+        raise ValueError("name is required")
+    if kind == 'account':
+        record['type'] = record['type'] or "Savings"
+        if record['type'] not in ACCOUNT_TYPES:
+            raise ValueError(f"account type must be one of {', '.join(ACCOUNT_TYPES)}")
+        for field in ('rate', 'balance'):
+            record[field] = record[field] or 0.0
+    elif kind == 'debt':
+        for field in ('amount', 'rate', 'payment'):
+            record[field] = record[field] or 0.0
+    else:
+        record['cost'] = record['cost'] or 0.0
+        if record['target_year'] is None or record['target_year'] < date.today().year:
+            raise ValueError("target_year must be this year or later")
+        if section == 'joint':
+            record['account'] = None
+        else:
+            record['account'] = goal_account(name.strip() for name in (record['account'] or '').split(';') if name.strip())
+    return section, kind, record
+
+
+# Function to read and validate a whole import file in one pass.
+# existing_names maps (section, kind) to the names already entered, so duplicates can be reported.
+def read_import_file(file, filename, existing_names=None, chunk_rows=CHUNK_ROWS):
+    existing_names = existing_names or {}
+    stream = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    extension = filename.lower().rsplit('.', 1)[-1]
+    if extension == 'csv':
+        rows = iter_csv_rows(stream)
+        first_row = 2  # Row 1 is the header
+    elif extension == 'jsonl':
+        rows = iter_jsonl_rows(stream)
+        first_row = 1
+    elif extension == 'json':
+        rows = iter_json_rows(stream)
+        first_row = 1
+    else:
+        return ImportResult({}, ["Please upload a .csv, .json or .jsonl file."], 0)
+
+    records = {}
+    names = {key: set(value) for key, value in existing_names.items()}
+    errors = []
+    row_count = 0
+    try:
+        for chunk in iter_chunks(rows, chunk_rows):
+            for row in chunk:
+                row_number = first_row + row_count
+                row_count += 1
+                try:
+                    section, kind, record = parse_row(row)
+                except ValueError as error:
+                    errors.append(f"Row {row_number}: {error}")
+                    continue
+                seen = names.setdefault((section, kind), set())
+                if record['name'] in seen:
+                    errors.append(f"Row {row_number}: {kind} '{record['name']}' already exists for {section}")
+                    continue
+                seen.add(record['name'])
+                records.setdefault((section, kind), []).append((row_number, record))
+            if len(errors) >= MAX_ERRORS:
+                errors.append("Too many errors; stopped reading the file.")
+                break
+    except (ValueError, csv.Error) as error:
+        errors.append(f"Could not read the file: {error}")
+    finally:
+        stream.detach()
+
+    # Every account a goal names must belong to its partner, either already entered or in the same file
+    for (section, kind), section_records in records.items():
+        if kind != 'goal' or section == 'joint':
+            continue
+        section_accounts = names.get((section, 'account'), set())
+        for row_number, record in section_records:
+            for account_name in account_names(record['account']):
+                if account_name not in section_accounts:
+                    errors.append(f"Row {row_number}: goal account '{account_name}' not found for {section}")
+
+    records = {key: [record for row_number, record in value] for key, value in records.items()}
+    return ImportResult(records, errors, row_count)
@@ -0,0 +1,148 @@
+from datetime import date
+
+import numpy as np
+
+from household import goal_links
+
+# Month-by-month cashflow of a whole household. Every month, for each section (a partner or the joint
+# finances):
+#   - accounts earn interest and debts accrue interest, then each debt gets its monthly payment
+#   - expenses grow with inflation; income less expenses less debt payments is saved into the
+#     section's accounts, split by the costs of the goals still ahead that draw on each account
+#     (evenly when there are none), or taken out of them when it is negative
+#   - each goal is withdrawn from its accounts, in proportion to their balances, in the last month of
+#     its target year, or this month when that is past (a goal whose accounts are all missing is a shortfall)
+# Money the accounts can't cover is recorded as a shortfall. State is kept in flat arrays with one
+# entry per account or debt across all sections, so a month is a handful of NumPy operations.
+#
+# sections maps a section name to a dict with 'income', 'expenses' (monthly, in today's money),
+# 'fixed_payments' (monthly payments that don't inflate, e.g. the joint debt payments), and the
+# section's 'accounts', 'debts' and 'goals' ledgers.
+
+DEFAULT_INFLATION = 2.5  # Annual, in percent
+SECTION_COLUMNS = ('income', 'expenses', 'debt_payments', 'saved', 'shortfall')
+
+
+# Function to split each section's money over its accounts by the goals still ahead, or evenly when there are none.
+# Claims are kept as (goal, account, amount) entries, since each goal draws on only a few accounts.
+def deposit_weights(claim_goals, claim_accounts, claim_amounts, active, account_sections, section_count):
+    weights = np.bincount(claim_accounts, weights=claim_amounts * active[claim_goals], minlength=len(account_sections))
+    totals = np.bincount(account_sections, weights=weights, minlength=section_count)
+    even = 1.0 / np.maximum(np.bincount(account_sections, minlength=section_count), 1)
+    return np.where(totals[account_sections] > 0, weights / np.where(totals > 0, totals, 1.0)[account_sections], even[account_sections])
+
+
+# Function to simulate the household from this month through the end of end_year, returning a frame
+# with one row per month
+def simulate_cashflow(sections, end_year, inflation=DEFAULT_INFLATION, start=None):
+    start = date.today() if start is None else start
+    months = max(12 * (end_year - start.year) + 12 - start.month + 1, 1)
+    names = list(sections)
+    section_count = len(names)
+
+    # Flat state across all sections
+    account_sections = np.concatenate([np.full(len(sections[name]['accounts']), index) for index, name in enumerate(names)]).astype(int)
+    debt_sections = np.concatenate([np.full(len(sections[name]['debts']), index) for index, name in enumerate(names)]).astype(int)
+    balances = np.concatenate([sections[name]['accounts'].column('balance') for name in names]).astype(float)
+    account_rates = np.concatenate([sections[name]['accounts'].column('rate') for name in names]) / 100 / 12
+    debts = np.concatenate([sections[name]['debts'].column('amount') for name in names]).astype(float)
+    debt_rates = np.concatenate([sections[name]['debts'].column('rate') for name in names]) / 100 / 12
+    debt_payments = np.concatenate([sections[name]['debts'].column('payment') for name in names]).astype(float)
+    income = np.array([sections[name].get('income', 0.0) for name in names], dtype=float)
+    expenses = np.array([sections[name].get('expenses', 0.0) for name in names], dtype=float)
+    fixed_payments = np.array([sections[name].get('fixed_payments', 0.0) for name in names], dtype=float)
+
+    # Goals: each one's claims on the accounts it draws from (sorted by goal), and the month it is withdrawn
+    claim_goals, claim_accounts, claim_amounts = [], [], []
+    goal_sections = []
+    goal_months = []
+    costs = []
+    goal_offset = account_offset = 0
+    for index, name in enumerate(names):
+        accounts, goals = sections[name]['accounts'], sections[name]['goals']
+        links = goal_links(goals, {account_name: row for row, account_name in enumerate(accounts.names)})
+        goal_rows, account_rows = np.nonzero(links)
+        claim_goals.append(goal_offset + goal_rows)
+        claim_accounts.append(account_offset + account_rows)
+        claim_amounts.append((goals.column('cost') / np.maximum(links.sum(axis=1), 1))[goal_rows])
+        goal_sections += [index] * len(goals)
+        # Withdrawn in the last month of the target year (month 0 is the start month)
+        goal_months += (12 * (goals.column('target_year') - start.year) + 12 - start.month).tolist()
+        costs += goals.column('cost').tolist()
+        goal_offset += len(goals)
+        account_offset += len(accounts)
+    claim_goals = np.concatenate(claim_goals).astype(int)
+    claim_accounts = np.concatenate(claim_accounts).astype(int)
+    claim_amounts = np.concatenate(claim_amounts).astype(float)
+    costs = np.array(costs, dtype=float)
+    claim_starts = np.searchsorted(claim_goals, np.arange(len(costs) + 1))
+    goal_months = np.clip(np.array(goal_months, dtype=int), 0, months - 1)
+    due = {}
+    for goal, month in enumerate(goal_months.tolist()):
+        due.setdefault(month, []).append(goal)
+    active = np.ones(len(costs), dtype=bool)
+    weights = deposit_weights(claim_goals, claim_accounts, claim_amounts, active, account_sections, section_count)
+
+    account_history = np.empty((months, len(balances)))
+    debt_history = np.empty((months, len(debts)))
+    goal_history = np.zeros((months, len(costs)))
+    section_history = np.zeros((months, section_count, len(SECTION_COLUMNS)))
+    monthly_inflation = (1 + inflation / 100) ** (1 / 12)
+
+    for month in range(months):
+        balances *= 1 + account_rates
+        owed = debts * (1 + debt_rates)
+        paid = np.minimum(debt_payments, owed)
+        debts = owed - paid
+        section_paid = np.bincount(debt_sections, weights=paid, minlength=section_count) + fixed_payments
+        month_expenses = expenses * monthly_inflation ** month
+        surplus = income - month_expenses - section_paid
+
+        # Save the surplus, or cover the deficit from the section's accounts in proportion to their balances
+        available = np.bincount(account_sections, weights=balances, minlength=section_count)
+        deficit = np.minimum(np.maximum(-surplus, 0.0), available)
+        shortfall = np.maximum(-surplus, 0.0) - deficit
+        taken = np.divide(balances, available[account_sections], out=np.zeros_like(balances), where=available[account_sections] > 0) * deficit[account_sections]
+        has_accounts = np.bincount(account_sections, minlength=section_count) > 0
+        saved = np.where(has_accounts, np.maximum(surplus, 0.0), 0.0)
+        balances += saved[account_sections] * weights - taken
+
+        # Withdraw the goals due this month
+        for goal in due.get(month, ()):
+            goal_accounts = claim_accounts[claim_starts[goal]:claim_starts[goal + 1]]
+            pool = balances[goal_accounts]
+            withdrawn = min(costs[goal], pool.sum())
+            if withdrawn > 0:
+                balances[goal_accounts] -= pool / pool.sum() * withdrawn
+            goal_history[month, goal] = withdrawn
+            shortfall[goal_sections[goal]] += costs[goal] - withdrawn
+            active[goal] = False
+        if month in due:
+            weights = deposit_weights(claim_goals, claim_accounts, claim_amounts, active, account_sections, section_count)
+
+        account_history[month] = balances
+        debt_history[month] = debts
+        section_history[month] = np.stack([income, month_expenses, section_paid, saved - deficit, shortfall], axis=1)
+
+    return cashflow_frame(sections, names, start, account_history, debt_history, goal_history, section_history)
+
+
+# Function to label the simulated arrays as a frame: one row per month, columns (section, kind, name)
+# where kind is 'account' or 'debt' (balance at the end of the month), 'goal' (amount withdrawn) or 'cashflow'
+def cashflow_frame(sections, names, start, account_history, debt_history, goal_history, section_history):
+    import pandas as pd  # Only needed once a simulation is shown
+
+    columns = []
+    for name in names:
+        columns += [(name, 'account', account_name) for account_name in sections[name]['accounts'].names]
+    for name in names:
+        columns += [(name, 'debt', debt_name) for debt_name in sections[name]['debts'].names]
+    for name in names:
+        columns += [(name, 'goal', goal_name) for goal_name in sections[name]['goals'].names]
+    for name in names:
+        columns += [(name, 'cashflow', column) for column in SECTION_COLUMNS]
+
+    data = np.concatenate([account_history, debt_history, goal_history, section_history.reshape(len(section_history), -1)], axis=1)
+    index = pd.period_range(start=pd.Period(start, freq='M'), periods=len(data), freq='M', name='month')
+    frame = pd.DataFrame(data, index=index, columns=pd.MultiIndex.from_tuples(columns, names=['section', 'kind', 'name']))
+    return frame.sort_index(axis=1)
@@ -0,0 +1,105 @@
+import io
+import threading
+from collections import OrderedDict
+
+from section_cache import fingerprint
+from metrics import count
+
+# Chart rendering for the Current You tool. Charts are drawn off-screen on a plain matplotlib Figure
+# with the Agg canvas (never through pyplot, so no figure is left in a global registry) and saved
+# as PNG bytes. The bytes are kept in a process-wide LRU cache keyed by a hash of the chart's data
+# and title, so redrawing unchanged expenses never touches matplotlib.
+
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+CHART_SIZE = (8, 5)
+CHART_DPI = 100
+BAR_COLOR = '#2e6ef7'
+
+
+class ChartCache:
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    # Function to return cached chart bytes, rendering them only when the key is new
+    def get_or_render(self, key, render):
+        with self._lock:
+            if key in self.entries:
+                self.hits += 1
+                count('chart_cache_hits')
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.misses += 1
+            count('chart_cache_misses')
+
+        image = render()
+        with self._lock:
+            if key not in self.entries:
+                self.entries[key] = image
+                self.size += len(image)
+            # Evict the least recently used charts until the cache fits its byte budget
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                evicted_key, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+        return image
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
+
+
+chart_cache = ChartCache()
+
+
+# Function to draw on a new off-screen figure and return it as PNG bytes
+def render_png(draw):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=CHART_SIZE, dpi=CHART_DPI)
+    canvas = FigureCanvasAgg(fig)
+    try:
+        draw(fig)
+        buffer = io.BytesIO()
+        canvas.print_png(buffer)
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+# Function to return a pie chart as PNG bytes
+def pie_chart_png(data, title, colors=None):
+    def draw(fig):
+        ax = fig.subplots()
+        ax.pie(data.values(), labels=data.keys(), autopct='%1.1f%%', startangle=90, colors=colors, textprops={'fontsize': 12})
+        ax.set_title(title, fontweight="bold")
+        ax.axis('equal')
+
+    key = fingerprint('pie', list(data.items()), title, colors)
+    return chart_cache.get_or_render(key, lambda: render_png(draw))
+
+
+# Function to return a bar chart with a value label on each bar as PNG bytes
+def bar_chart_png(data, title):
+    def draw(fig):
+        ax = fig.subplots()
+        bars = ax.bar(data.keys(), data.values(), color=BAR_COLOR)
+        ax.set_title(title, fontweight="bold")
+        ax.set_ylabel('Amount ($)', fontweight="bold")
+        ax.tick_params(axis='x', labelrotation=45)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment('right')
+
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 0.01*max(data.values()),
+                    f'${height:.2f}', ha='center', va='bottom')
+        fig.tight_layout()
+
+    key = fingerprint('bar', list(data.items()), title)
+    return chart_cache.get_or_render(key, lambda: render_png(draw))
@@ -1,162 +1,466 @@
+import re
 import streamlit as st
-import pandas as pd
+import numpy as np
 from datetime import date
-
-# Set the page config to wide mode
-st.set_page_config(page_title="Get Aligned as a Couple", layout="wide")
+from projections import project_future_values, balances_in_year
+from section_cache import shared_sections, fingerprint
+from ledger import AccountLedger, DebtLedger, GoalLedger, account_names, goal_account
+from session_persistence import restore_state, record, persist_widget
+from bulk_import import read_import_file
+from debts import MINIMUM_PAYMENTS, compare_strategies
+from household import remaining_funds, projection_table, goal_progress, goal_links, goal_shares, funding_plan
+from allocation import ON_TIME, plan_status
+from cashflow import DEFAULT_INFLATION, simulate_cashflow
+from session_budget import use_derived, enforce_budget
+from metrics import start_rerun, lap, count, finish_rerun
+from monte_carlo import DEFAULT_VOLATILITY, simulate_balances, summarize_balances, goal_success_probability
+from styles import setup_page
+
+# Long summary lists are shown a page at a time, so each rerun sends the same few elements however much is entered
+SUMMARY_PAGE_ROWS = 25
 
 # Function to calculate future account value considering principal and monthly contributions
 def calculate_future_value(principal, annual_rate, years, monthly_contribution):
-    if annual_rate == 0:
-        future_value = principal + (monthly_contribution * years * 12)
-    else:
-        monthly_rate = annual_rate / 100 / 12
-        months = years * 12
-        future_value = principal * (1 + monthly_rate) ** months
-        future_value += monthly_contribution * (((1 + monthly_rate) ** months - 1) / monthly_rate)
-    return future_value
+    return float(project_future_values(principal, annual_rate, years, monthly_contribution))
+
+# Function to get the (account x year) projection table for a section, rebuilding it only when the accounts change
+def get_projection_table(section, accounts, goals, selected_year):
+    if 'projection_tables' not in st.session_state:
+        st.session_state.projection_tables = {}
+
+    accounts_key = fingerprint(accounts)
+    horizon_year = max([selected_year] + goals.column('target_year').tolist())
+    table = st.session_state.projection_tables.get(section)
+    rebuilt = table is None or table['accounts_key'] != accounts_key or table['years'][-1] < horizon_year
+    if rebuilt:
+        table = projection_table(accounts, goals, selected_year)
+        count('projection_table_builds')
+        table['accounts_key'] = accounts_key
+        st.session_state.projection_tables[section] = table
+    use_derived('projection_tables', changed=rebuilt)
+    return table
+
+# Function to show one list of the input summary as a single markdown block, a page at a time once it gets long
+def show_summary_list(title, lines, empty_message, key):
+    st.subheader(title)
+    if not lines:
+        st.write(empty_message)
+        return
+
+    start = 0
+    if len(lines) > SUMMARY_PAGE_ROWS:
+        pages = -(-len(lines) // SUMMARY_PAGE_ROWS)
+        page_key = f"summary_page_{key}"
+        # Stay on the last page if entries were removed
+        if st.session_state.get(page_key, 1) > pages:
+            st.session_state[page_key] = pages
+        page = st.number_input(f"Page (of {pages}, {len(lines)} entries):", min_value=1, max_value=pages, step=1, key=page_key)
+        start = (page - 1) * SUMMARY_PAGE_ROWS
+    st.markdown("\n".join(lines[start:start + SUMMARY_PAGE_ROWS]))
+
+# Function to escape the characters markdown would read as formatting (emphasis, math, tables, links...) in text the user typed
+def escape_markdown(text):
+    return re.sub(r'([\\`*_{}\[\]()#+\-.!|$~<>])', r'\\\1', str(text))
+
+# Functions to write the summary lines for accounts, debts and goals (names are escaped, and so are the dollar
+# signs, so markdown doesn't read them as formatting or math)
+def account_lines(accounts):
+    return [f"- {escape_markdown(account.name)} ({escape_markdown(account.type)}): \\${account.balance:,.2f}" for account in accounts]
+
+def debt_lines(debts):
+    return [f"- {escape_markdown(debt.name)}: \\${debt.amount:,.2f} at {debt.rate:,.2f}% interest, monthly payment \\${debt.payment:,.2f}" for debt in debts]
+
+def goal_lines(goals, show_account=True):
+    return [f"- {escape_markdown(goal.name)}: \\${goal.cost:.2f} by {goal.target_year}"
+            + (f", Account: {', '.join(escape_markdown(name) for name in account_names(goal.account)) or 'All accounts'}" if show_account else "")
+            for goal in goals]
+
+# Function to display projected account values as one table
+def display_projected_values(projected_values):
+    st.dataframe(
+        {
+            'Account': [account_name for account_name, _, _ in projected_values],
+            'Type': [account_type for _, account_type, _ in projected_values],
+            'Projected Value': [future_value for _, _, future_value in projected_values],
+        },
+        column_config={'Projected Value': st.column_config.NumberColumn(format="dollar")},
+        hide_index=True,
+    )
 
 # Function to display progress toward goals
-def display_goal_progress(goals, selected_year, account_balances):
-    st.subheader(f"Goal Progress in {selected_year}:")
-    if not goals:
+def display_goal_progress(goal_progress):
+    st.subheader("Goal Progress by Target Year:")
+    if not goal_progress:
         st.write("No goals have been added.")
         return
 
-    for goal in goals:
-        goal_name = goal["name"]
-        goal_cost = goal["cost"]
-        goal_year = goal["target_year"]
-        account_name = goal["account"]
-
-        if account_name not in account_balances:
-            st.write(f"Account {account_name} not found.")
-            continue
-
-        account_balance = account_balances[account_name]
-
-        # Prevent division by zero for goal cost
-        if goal_cost > 0:
-            progress = min(account_balance / goal_cost, 1)
-        else:
-            progress = 0
-
-        progress_percentage = progress * 100
-
-        st.write(f"**Goal: {goal_name}**")
-        st.write(f"Cost: ${goal_cost:,.0f}, Target Year: {goal_year}")
-        st.progress(progress)
-        st.write(f"{progress_percentage:.0f}% of goal achieved.\n")
+    # One table for all goals; the frontend only draws the rows in view
+    st.dataframe(
+        {
+            'Goal': [goal['name'] for goal in goal_progress],
+            'Cost': [goal['cost'] for goal in goal_progress],
+            'Target Year': [goal['target_year'] for goal in goal_progress],
+            'Projected Funds': [goal['funds'] for goal in goal_progress],
+            'Shortfall': [goal['shortfall'] for goal in goal_progress],
+            'Progress': [goal['progress'] for goal in goal_progress],
+        },
+        column_config={
+            'Cost': st.column_config.NumberColumn(format="dollar"),
+            'Projected Funds': st.column_config.NumberColumn(format="dollar", help="The goal's share of its accounts' projected balances in its target year"),
+            'Shortfall': st.column_config.NumberColumn(format="dollar"),
+            'Target Year': st.column_config.NumberColumn(format="%d"),
+            'Progress': st.column_config.ProgressColumn("Goal Achieved", format="percent", min_value=0, max_value=1),
+        },
+        hide_index=True,
+    )
+    missing_accounts = sorted({goal['account'] or "No accounts added" for goal in goal_progress if goal['progress'] is None})
+    if missing_accounts:
+        st.write("Account(s) not found: " + "; ".join(missing_accounts))
+
+# Function to display how the remaining monthly funds could be split across the goals' shortfalls
+def display_funding_plan(plan, available):
+    if not plan:
+        return
+    on_time = sum(1 for row in plan if row['status'] == ON_TIME)
+    st.subheader(f"Funding Plan for ${available:,.0f} of Remaining Funds per Month ({on_time} of {len(plan)} goals on time):")
+    st.dataframe(
+        {
+            'Goal': [row['name'] for row in plan],
+            'Target Year': [row['target_year'] for row in plan],
+            'Needed per Month': [row['required'] for row in plan],
+            'Planned Now per Month': [row['contribution'] for row in plan],
+            'Reached In': [row['reached_year'] for row in plan],
+            'Status': [plan_status(row) for row in plan],
+        },
+        column_config={
+            'Target Year': st.column_config.NumberColumn(format="%d"),
+            'Needed per Month': st.column_config.NumberColumn(format="dollar", help="Steady contribution that covers the goal's shortfall by its target year"),
+            'Planned Now per Month': st.column_config.NumberColumn(format="dollar"),
+            'Reached In': st.column_config.NumberColumn(format="%d"),
+        },
+        hide_index=True,
+    )
+
+# Function to compute Monte Carlo ranges for account values and the chance of reaching each goal
+def compute_simulation(accounts, goals, selected_year, volatility):
+    import pandas as pd  # Loaded on first use, so it doesn't slow down the first page load
+    # Simulate the accounts to the selected year and each goal's accounts to the goal's target year in one batch;
+    # goals are funded from the same shares of their accounts as in the goal progress table
+    links = goal_links(goals, {name: row for row, name in enumerate(accounts.names)})
+    linked = links.any(axis=1)
+    linked_goals = [goal for goal, has_account in zip(goals, linked) if has_account]
+    shares = goal_shares(goals.column('cost'), links)[linked]
+    goal_rows, account_rows = np.nonzero(shares)
+    rows = list(range(len(accounts))) + account_rows.tolist()
+    target_years = goals.column('target_year')[linked]
+    years = [selected_year - date.today().year] * len(accounts) + (target_years[goal_rows] - date.today().year).tolist()
+    balances = simulate_balances(accounts.column('balance')[rows], accounts.column('rate')[rows], years, 0, volatility=volatility, seed=0)
+
+    summary = summarize_balances(balances[:, :len(accounts)])
+    simulation = {
+        'accounts_df': pd.DataFrame({
+            'Account Name': accounts.names,
+            'Pessimistic (P10) ($)': summary['p10'].round(),
+            'Median (P50) ($)': summary['p50'].round(),
+            'Optimistic (P90) ($)': summary['p90'].round(),
+        }),
+        'goals_df': None,
+    }
+
+    if linked_goals:
+        goal_funds = np.zeros((len(balances), len(linked_goals)))
+        np.add.at(goal_funds.T, goal_rows, (balances[:, len(accounts):] * shares[goal_rows, account_rows]).T)
+        probability = goal_success_probability(goal_funds, [goal.cost for goal in linked_goals])
+        simulation['goals_df'] = pd.DataFrame({
+            'Goal Name': [goal.name for goal in linked_goals],
+            'Target Year': [goal.target_year for goal in linked_goals],
+            'Probability (%)': (probability * 100).round(1),
+        })
+    return simulation
+
+# Function to display Monte Carlo ranges for account values and the chance of reaching each goal
+def display_simulation(simulation, selected_year):
+    st.subheader(f"Simulated Account Values in {selected_year}:")
+    st.write(simulation['accounts_df'])
+    if simulation['goals_df'] is not None:
+        st.subheader("Chance of Reaching Goals:")
+        st.write(simulation['goals_df'])
+
+# Function to describe a payoff that is a number of months away as a month and year
+def payoff_date(months):
+    if months != months:
+        return "Not within 30 years"
+    today = date.today()
+    month_index = today.month - 1 + int(months)
+    return date(today.year + month_index // 12, month_index % 12 + 1, 1).strftime("%b %Y")
+
+# Function to compute payoff dates and interest for every debt, and compare payoff strategies that use the remaining funds
+def compute_debt_payoff(debts, extra_payment, debt_order):
+    import pandas as pd
+    custom_order = [debts.position(name) for name in debt_order if name in debts]
+    results = compare_strategies(debts.column('amount'), debts.column('rate'), debts.column('payment'), extra_payment, custom_order)
+
+    minimum = results[MINIMUM_PAYMENTS]
+    payoff_df = pd.DataFrame({
+        'Debt Name': debts.names,
+        'Payoff (months)': minimum['payoff_months'],
+        'Payoff Date': [payoff_date(months) for months in minimum['payoff_months']],
+        'Total Interest ($)': minimum['total_interest'].round(),
+    })
+
+    minimum_interest = minimum['total_interest'].sum()
+    strategy_rows = []
+    for strategy, result in results.items():
+        # A household is debt free once its last debt is paid off
+        debt_free_months = np.nan if np.isnan(result['payoff_months']).any() else result['payoff_months'].max()
+        strategy_rows.append({
+            'Strategy': strategy,
+            'Debt-Free In (months)': debt_free_months,
+            'Debt-Free Date': payoff_date(debt_free_months),
+            'Total Interest ($)': round(result['total_interest'].sum()),
+            'Interest Saved ($)': round(minimum_interest - result['total_interest'].sum()),
+        })
+    return payoff_df, pd.DataFrame(strategy_rows)
+
+# Function to compute a section's derived outputs: tables, projections, goal progress and simulations
+# The debts get extra_payment on top of their minimum payments, and the goal funding plan gets available;
+# callers split the remaining funds between the two so no dollar is planned twice.
+def compute_section(section, accounts, debts, goals, goal_exclude, selected_year, volatility, extra_payment, available, debt_order):
+    outputs = {'accounts_df': None, 'projected_values': [], 'simulation': None, 'debts_df': None, 'debt_payoff_df': None, 'strategy_df': None, 'goals_df': None, 'goal_progress': [], 'funding_plan': []}
+    table = get_projection_table(section, accounts, goals, selected_year)
+
+    if accounts:
+        outputs['accounts_df'] = accounts.to_frame(copy=True)
+        future_values = balances_in_year(table['years'], table['balances'], selected_year)
+        outputs['projected_values'] = list(zip(accounts.names, accounts.column('type'), future_values))
+        if volatility is not None:
+            outputs['simulation'] = compute_simulation(accounts, goals, selected_year, volatility)
+
+    if debts:
+        outputs['debts_df'] = debts.to_frame(copy=True)
+        outputs['debt_payoff_df'], outputs['strategy_df'] = compute_debt_payoff(debts, extra_payment, debt_order)
+
+    if goals:
+        outputs['goals_df'] = goals.to_frame(exclude=goal_exclude, copy=True)
+        if 'account' not in goal_exclude:
+            outputs['goals_df']['Account'] = [", ".join(account_names(account)) or "All accounts" for account in goals.column('account')]
+        outputs['goal_progress'] = goal_progress(goals, table)
+        outputs['funding_plan'] = funding_plan(accounts, goals, table, available)
+    return outputs
+
+# Function to get a section's outputs, recomputing them only when the section's inputs changed.
+# The outputs are shared by every session, so they must not hold views of this session's ledgers.
+def get_section_outputs(section, accounts, debts, goals, goal_exclude, selected_year, volatility, extra_payment=0.0, available=0.0, debt_order=()):
+    key = fingerprint(accounts, debts, goals, selected_year, volatility, extra_payment, available, list(debt_order), date.today().year)
+    return shared_sections.get_or_compute(
+        section,
+        key,
+        lambda: compute_section(section, accounts, debts, goals, goal_exclude, selected_year, volatility, extra_payment, available, debt_order),
+    )
+
+# Function to simulate the household month by month and keep what the dashboard shows: each section's
+# net worth at the end of every year, and how much of each goal could be withdrawn at the end of its target year
+def compute_cashflow(sections, end_year, inflation):
+    import pandas as pd  # Loaded on first use, so it doesn't slow down the first page load
+    frame = simulate_cashflow(sections, end_year, inflation)
+    yearly = frame.groupby(frame.index.year).last()
+    totals = yearly.T.groupby(level=['section', 'kind']).sum().T
+    net_worth = {}
+    for section in sections:
+        net_worth[section] = totals.get((section, 'account'), 0.0) - totals.get((section, 'debt'), 0.0)
+    # Total withdrawn per (section, goal); a household without goals has no goal columns
+    goal_columns = frame.columns.get_level_values('kind') == 'goal'
+    withdrawn = {(section, name): total for (section, kind, name), total in zip(frame.columns[goal_columns], frame.loc[:, goal_columns].sum().tolist())}
+    goal_table = {'Section': [], 'Goal': [], 'Target Year': [], 'Cost ($)': [], 'Withdrawn ($)': [], 'Short ($)': []}
+    for section, values in sections.items():
+        goals = values['goals']
+        goal_withdrawn = np.array([withdrawn[(section, name)] for name in goals.names])
+        goal_table['Section'] += [section] * len(goals)
+        goal_table['Goal'] += goals.names
+        goal_table['Target Year'] += goals.column('target_year').tolist()
+        goal_table['Cost ($)'] += goals.column('cost').tolist()
+        goal_table['Withdrawn ($)'] += goal_withdrawn.round().tolist()
+        goal_table['Short ($)'] += (goals.column('cost') - goal_withdrawn).round().tolist()
+    shortfall = frame.xs('cashflow', level='kind', axis=1).xs('shortfall', level='name', axis=1)
+    return {
+        'net_worth': pd.DataFrame(net_worth, index=pd.Index(yearly.index, name='Year')).round(),
+        'goals': goal_table,
+        'shortfall': float(shortfall.sum().sum()),
+    }
+
+# Function to get the household cashflow, simulating it only when the inputs changed
+def get_household_cashflow(responses_1, responses_2, joint_responses, selected_year, inflation):
+    sections = {
+        "Partner 1": {'income': responses_1['paycheck'], 'expenses': responses_1['total_expenses'], 'accounts': responses_1['accounts'], 'debts': responses_1['debts'], 'goals': responses_1['goals']},
+        "Partner 2": {'income': responses_2['paycheck'], 'expenses': responses_2['total_expenses'], 'accounts': responses_2['accounts'], 'debts': responses_2['debts'], 'goals': responses_2['goals']},
+        "Joint": {'income': joint_responses['joint_income'], 'expenses': joint_responses['joint_expenses'], 'fixed_payments': joint_responses['joint_debt_payments'],
+                  'accounts': joint_responses['joint_accounts'], 'debts': DebtLedger(), 'goals': joint_responses['joint_goals']},
+    }
+    end_year = max([selected_year] + [goal.target_year for values in sections.values() for goal in values['goals']])
+    key = fingerprint(sections, end_year, inflation, date.today().year, date.today().month)
+    return shared_sections.get_or_compute('cashflow', key, lambda: compute_cashflow(sections, end_year, inflation))
+
+# Function to display the month-by-month household simulation
+def display_cashflow(cashflow, inflation):
+    st.subheader("Household Cashflow, Month by Month")
+    st.write(f"Each month, what is left after expenses (growing {inflation:g}% a year) and debt payments is saved into the accounts, "
+             "debts are paid down, and each goal is withdrawn from its accounts at the end of its target year.")
+    st.write("Net worth at the end of each year:")
+    st.line_chart(cashflow['net_worth'])
+    if cashflow['goals']['Goal']:
+        st.dataframe(cashflow['goals'], hide_index=True)
+    if cashflow['shortfall'] > 0:
+        st.warning(f"Over the whole period, ${cashflow['shortfall']:,.0f} of expenses, debt payments and goals couldn't be covered from income or savings.")
 
 # Function to display the dashboard for both partners
-def show_dashboard(responses_1, responses_2, joint_responses, selected_year):
+def show_dashboard(responses_1, responses_2, joint_responses, selected_year, volatility=None, inflation=DEFAULT_INFLATION):
     st.title("Couple's Financial Dashboard")
 
-    def display_individual_dashboard(responses, title):
+    def display_individual_dashboard(responses, title, section):
+        responses['remaining_funds'] = remaining_funds(responses['paycheck'], responses['total_expenses'], responses['total_debt_payments'])
+        # The extra sent to the debts comes out of the remaining funds; the goals are planned with the rest
+        debt_extra = min(responses.get('debt_extra', 0.0), responses['remaining_funds']) if responses['debts'] else 0.0
+        goal_budget = responses['remaining_funds'] - debt_extra
+        outputs = get_section_outputs(section, responses['accounts'], responses['debts'], responses['goals'], (), selected_year, volatility,
+                                      debt_extra, goal_budget, responses.get('debt_order', []))
+
         st.subheader(title)
         st.write(f"**Monthly Take-Home Pay**: ${responses.get('paycheck', 0):,.0f}")
         st.write(f"**Monthly Expenses**: ${responses.get('total_expenses', 0):,.0f}")
         st.write(f"**Monthly Debt Payments**: ${responses.get('total_debt_payments', 0):,.0f}")
-
-        remaining_funds = responses['paycheck'] - responses['total_expenses'] - responses['total_debt_payments']
-        responses['remaining_funds'] = remaining_funds if remaining_funds > 0 else 0
         st.write(f"**Remaining Monthly Funds**: ${responses['remaining_funds']:,.0f}")
 
         st.subheader("Accounts Today:")
-        if responses['accounts']:
-            accounts_df = pd.DataFrame(responses['accounts'], columns=['Account Name', 'Type', 'Interest Rate (%)', 'Balance ($)'])
-            st.write(accounts_df)
+        if outputs['accounts_df'] is not None:
+            st.write(outputs['accounts_df'])
 
             # Project future values for accounts
             st.subheader("Projected Account Values in " + str(selected_year) + ":")
-            for account in responses['accounts']:
-                account_name = account[0]
-                account_type = account[1]
-                interest_rate = account[2]
-                balance = account[3]
-                future_value = calculate_future_value(balance, interest_rate, selected_year - date.today().year, 0)
-                st.write(f"{account_name} ({account_type}): ${future_value:,.0f}")
+            display_projected_values(outputs['projected_values'])
+
+            if outputs['simulation'] is not None:
+                display_simulation(outputs['simulation'], selected_year)
 
         else:
             st.write("No accounts added yet.")
 
         st.subheader("Debts:")
-        if responses['debts']:
-            debts_df = pd.DataFrame(responses['debts'], columns=['Debt Name', 'Amount ($)', 'Interest Rate (%)', 'Monthly Payment ($)'])
-            st.write(debts_df)
+        if outputs['debts_df'] is not None:
+            st.write(outputs['debts_df'])
+
+            st.subheader("Debt Payoff with Minimum Payments:")
+            st.write(outputs['debt_payoff_df'])
+            st.subheader(f"Payoff Strategies Using ${debt_extra:,.0f} of Remaining Funds per Month on Top of the Minimum Payments:")
+            st.write(outputs['strategy_df'])
         else:
             st.write("No debts added yet.")
 
         st.subheader("Goals:")
-        if responses['goals']:
-            goals_df = pd.DataFrame(responses['goals'], columns=['Goal Name', 'Cost ($)', 'Target Year', 'Account'])
-            st.write(goals_df)
-            display_goal_progress(responses['goals'], selected_year, {account[0]: account[3] for account in responses['accounts']})
+        if outputs['goals_df'] is not None:
+            st.write(outputs['goals_df'])
+            display_goal_progress(outputs['goal_progress'])
+            display_funding_plan(outputs['funding_plan'], goal_budget)
         else:
             st.write("No goals added yet.")
 
-    display_individual_dashboard(responses_1, "Partner 1's Financial Overview")
-    display_individual_dashboard(responses_2, "Partner 2's Financial Overview")
-    
+    display_individual_dashboard(responses_1, "Partner 1's Financial Overview", 'partner_1')
+    display_individual_dashboard(responses_2, "Partner 2's Financial Overview", 'partner_2')
+
+    joint_responses['joint_remaining_funds'] = remaining_funds(joint_responses['joint_income'], joint_responses['joint_expenses'], joint_responses['joint_debt_payments'])
+    joint_outputs = get_section_outputs('joint', joint_responses['joint_accounts'], DebtLedger(), joint_responses['joint_goals'], ('account',), selected_year, volatility,
+                                       available=joint_responses['joint_remaining_funds'])
+
     st.subheader("Joint Financial Overview")
     st.write(f"**Joint Monthly Income**: ${joint_responses.get('joint_income', 0):,.0f}")
     st.write(f"**Joint Monthly Expenses**: ${joint_responses.get('joint_expenses', 0):,.0f}")
     st.write(f"**Joint Monthly Debt Payments**: ${joint_responses.get('joint_debt_payments', 0):,.0f}")
-    
-    joint_remaining_funds = joint_responses['joint_income'] - joint_responses['joint_expenses'] - joint_responses['joint_debt_payments']
-    joint_responses['joint_remaining_funds'] = joint_remaining_funds if joint_remaining_funds > 0 else 0
     st.write(f"**Joint Remaining Monthly Funds**: ${joint_responses['joint_remaining_funds']:,.0f}")
 
     st.subheader("Joint Accounts Today:")
-    if joint_responses['joint_accounts']:
-        joint_accounts_df = pd.DataFrame(joint_responses['joint_accounts'], columns=['Account Name', 'Type', 'Interest Rate (%)', 'Balance ($)'])
-        st.write(joint_accounts_df)
+    if joint_outputs['accounts_df'] is not None:
+        st.write(joint_outputs['accounts_df'])
 
         # Project future values for joint accounts
         st.subheader("Projected Joint Account Values in " + str(selected_year) + ":")
-        for account in joint_responses['joint_accounts']:
-            account_name = account[0]
-            account_type = account[1]
-            interest_rate = account[2]
-            balance = account[3]
-            future_value = calculate_future_value(balance, interest_rate, selected_year - date.today().year, 0)
-            st.write(f"{account_name} ({account_type}): ${future_value:,.0f}")
+        display_projected_values(joint_outputs['projected_values'])
+
+        if joint_outputs['simulation'] is not None:
+            display_simulation(joint_outputs['simulation'], selected_year)
     else:
         st.write("No joint accounts added yet.")
 
     st.subheader("Joint Goals:")
-    if joint_responses['joint_goals']:
-        joint_goals_df = pd.DataFrame(joint_responses['joint_goals'], columns=['Goal Name', 'Cost ($)', 'Target Year'])
-        st.write(joint_goals_df)
-        display_goal_progress(joint_responses['joint_goals'], selected_year, {account[0]: account[3] for account in joint_responses['joint_accounts']})
+    if joint_outputs['goals_df'] is not None:
+        st.write(joint_outputs['goals_df'])
+        display_goal_progress(joint_outputs['goal_progress'])
+        display_funding_plan(joint_outputs['funding_plan'], joint_responses['joint_remaining_funds'])
     else:
         st.write("No joint goals added yet.")
 
+    display_cashflow(get_household_cashflow(responses_1, responses_2, joint_responses, selected_year, inflation), inflation)
+
+# Function to map each (section, kind) of the bulk import format to its journal key and ledger
+def import_targets(responses_1, responses_2, joint_responses):
+    return {
+        ('partner_1', 'account'): ('responses_1.accounts', responses_1['accounts']),
+        ('partner_1', 'debt'): ('responses_1.debts', responses_1['debts']),
+        ('partner_1', 'goal'): ('responses_1.goals', responses_1['goals']),
+        ('partner_2', 'account'): ('responses_2.accounts', responses_2['accounts']),
+        ('partner_2', 'debt'): ('responses_2.debts', responses_2['debts']),
+        ('partner_2', 'goal'): ('responses_2.goals', responses_2['goals']),
+        ('joint', 'account'): ('joint_responses.joint_accounts', joint_responses['joint_accounts']),
+        ('joint', 'goal'): ('joint_responses.joint_goals', joint_responses['joint_goals']),
+    }
+
+# Function to import a whole file of accounts, debts and goals with a single state update and one rerun
+def import_household_file(import_file, responses_1, responses_2, joint_responses):
+    targets = import_targets(responses_1, responses_2, joint_responses)
+    existing_names = {key: ledger.names for key, (journal_key, ledger) in targets.items()}
+    result = read_import_file(import_file, import_file.name, existing_names)
+    if result.errors:
+        st.error("Nothing was imported. Please fix these rows:\n\n" + "\n".join(f"- {error}" for error in result.errors))
+        return
+
+    for key, records in result.records.items():
+        journal_key, ledger = targets[key]
+        ledger.extend_records(records)
+        record('couples', 'extend', journal_key, records)
+    st.session_state.import_message = f"Imported {result.row_count} rows."
+    st.rerun()
+
 # Main function to run the app
 def main():
+    start_rerun('couples_tool')
+
+    # Set the page config to wide mode
+    setup_page("Get Aligned as a Couple")
+
     if 'dashboard_run' not in st.session_state:
         st.session_state.dashboard_run = False
 
+    # Restore the household saved for this browser link (only on the first run of a session)
+    saved_state = restore_state('couples') or {}
+
     # Partner 1 responses
     if 'responses_1' not in st.session_state:
         st.session_state.responses_1 = {
-            'accounts': [],
+            'accounts': AccountLedger.from_records(saved_state.get('responses_1.accounts', [])),
             'total_expenses': 0,
             'remaining_funds': 0,
             'total_debt_payments': 0,
-            'goals': [],
-            'debts': []
+            'goals': GoalLedger.from_records(saved_state.get('responses_1.goals', [])),
+            'debts': DebtLedger.from_records(saved_state.get('responses_1.debts', []))
         }
 
     # Partner 2 responses
     if 'responses_2' not in st.session_state:
         st.session_state.responses_2 = {
-            'accounts': [],
+            'accounts': AccountLedger.from_records(saved_state.get('responses_2.accounts', [])),
             'total_expenses': 0,
             'remaining_funds': 0,
             'total_debt_payments': 0,
-            'goals': [],
-            'debts': []
+            'goals': GoalLedger.from_records(saved_state.get('responses_2.goals', [])),
+            'debts': DebtLedger.from_records(saved_state.get('responses_2.debts', []))
         }
 
     # Joint responses
@@ -166,8 +470,8 @@ def main():
             'joint_expenses': 0,
             'joint_remaining_funds': 0,
             'joint_debt_payments': 0,
-            'joint_accounts': [],
-            'joint_goals': []
+            'joint_accounts': AccountLedger.from_records(saved_state.get('joint_responses.joint_accounts', [])),
+            'joint_goals': GoalLedger.from_records(saved_state.get('joint_responses.joint_goals', []))
         }
 
     responses_1 = st.session_state.responses_1
@@ -178,13 +482,17 @@ def main():
 
     col1, col2, col_joint = st.columns([1, 1, 1])
 
+    lap('restore')
+
     # Partner 1 Input Section
     with col1:
         st.header("Partner 1 Information")
         st.subheader("Personal Income")
         responses_1['paycheck'] = st.number_input("Partner 1: What is your monthly take-home pay after tax?", min_value=0.0, key='partner1_paycheck')
+        persist_widget('couples', 'partner1_paycheck')
         st.subheader("Expenses")
         responses_1['total_expenses'] = st.number_input("Partner 1: What are your total monthly expenses?", min_value=0.0, key='partner1_expenses')
+        persist_widget('couples', 'partner1_expenses')
 
         # Account Input
         st.subheader("Add Account:")
@@ -193,8 +501,11 @@ def main():
         interest_rate = st.number_input("Interest Rate (%)", min_value=0.0, key='interest_rate_1')
         balance = st.number_input("Account Balance ($)", min_value=0.0, key='balance_1')
         if st.button("Add this Account for Partner 1"):
-            if account_name:
-                responses_1['accounts'].append([account_name, account_type, interest_rate, balance])
+            if account_name in responses_1['accounts']:
+                st.error("Account already exists.")
+            elif account_name:
+                responses_1['accounts'].append(account_name, account_type, interest_rate, balance)
+                record('couples', 'append', 'responses_1.accounts', responses_1['accounts'].to_record(account_name))
                 st.success(f"Added Account: {account_name}")
             else:
                 st.error("Please enter an account name.")
@@ -206,32 +517,46 @@ def main():
         debt_interest_rate = st.number_input("Interest Rate (%)", min_value=0.0, key='debt_interest_rate_1')
         monthly_payment = st.number_input("Monthly Payment ($)", min_value=0.0, key='monthly_payment_1')
         if st.button("Add this Debt for Partner 1"):
-            if debt_name:
-                responses_1['debts'].append([debt_name, debt_amount, debt_interest_rate, monthly_payment])
+            if debt_name in responses_1['debts']:
+                st.error("Debt already exists.")
+            elif debt_name:
+                responses_1['debts'].append(debt_name, debt_amount, debt_interest_rate, monthly_payment)
+                record('couples', 'append', 'responses_1.debts', responses_1['debts'].to_record(debt_name))
                 st.success(f"Added Debt: {debt_name}")
             else:
                 st.error("Please enter a debt name.")
+        responses_1['debt_order'] = st.multiselect("Custom debt payoff order (optional)", options=responses_1['debts'].names, key='debt_order_1')
+        responses_1['debt_extra'] = st.number_input("Extra paid toward debts each month, out of the remaining funds ($)", min_value=0.0, key='debt_extra_1',
+                                                   help="The rest of the remaining funds goes to the goals in the funding plan")
+        persist_widget('couples', 'debt_extra_1')
 
         # Goal Input
         st.subheader("Add Goal:")
         goal_name = st.text_input("Goal Name", key='goal_name_1')
         goal_cost = st.number_input("Goal Cost ($)", min_value=0.0, key='goal_cost_1')
         target_year = st.number_input("Target Year", min_value=date.today().year, value=date.today().year, key='target_year_1')
-        goal_account = st.selectbox("Account for Goal", options=[a[0] for a in responses_1['accounts']], key='goal_account_1')
+        goal_accounts = st.multiselect("Accounts for Goal (leave empty to draw on all accounts)", options=responses_1['accounts'].names, key='goal_account_1')
         if st.button("Add this Goal for Partner 1"):
-            if goal_name:
-                responses_1['goals'].append({"name": goal_name, "cost": goal_cost, "target_year": target_year, "account": goal_account})
+            if goal_name in responses_1['goals']:
+                st.error("Goal already exists.")
+            elif goal_name:
+                responses_1['goals'].append(goal_name, goal_cost, target_year, goal_account(goal_accounts))
+                record('couples', 'append', 'responses_1.goals', responses_1['goals'].to_record(goal_name))
                 st.success(f"Added Goal: {goal_name}")
             else:
                 st.error("Please enter a goal name.")
 
+    lap('inputs.partner_1')
+
     # Partner 2 Input Section
     with col2:
         st.header("Partner 2 Information")
         st.subheader("Personal Income")
         responses_2['paycheck'] = st.number_input("Partner 2: What is your monthly take-home pay after tax?", min_value=0.0, key='partner2_paycheck')
+        persist_widget('couples', 'partner2_paycheck')
         st.subheader("Expenses")
         responses_2['total_expenses'] = st.number_input("Partner 2: What are your total monthly expenses?", min_value=0.0, key='partner2_expenses')
+        persist_widget('couples', 'partner2_expenses')
 
         # Account Input
         st.subheader("Add Account:")
@@ -240,8 +565,11 @@ def main():
         interest_rate = st.number_input("Interest Rate (%)", min_value=0.0, key='interest_rate_2')
         balance = st.number_input("Account Balance ($)", min_value=0.0, key='balance_2')
         if st.button("Add this Account for Partner 2"):
-            if account_name:
-                responses_2['accounts'].append([account_name, account_type, interest_rate, balance])
+            if account_name in responses_2['accounts']:
+                st.error("Account already exists.")
+            elif account_name:
+                responses_2['accounts'].append(account_name, account_type, interest_rate, balance)
+                record('couples', 'append', 'responses_2.accounts', responses_2['accounts'].to_record(account_name))
                 st.success(f"Added Account: {account_name}")
             else:
                 st.error("Please enter an account name.")
@@ -253,33 +581,48 @@ def main():
         debt_interest_rate = st.number_input("Interest Rate (%)", min_value=0.0, key='debt_interest_rate_2')
         monthly_payment = st.number_input("Monthly Payment ($)", min_value=0.0, key='monthly_payment_2')
         if st.button("Add this Debt for Partner 2"):
-            if debt_name:
-                responses_2['debts'].append([debt_name, debt_amount, debt_interest_rate, monthly_payment])
+            if debt_name in responses_2['debts']:
+                st.error("Debt already exists.")
+            elif debt_name:
+                responses_2['debts'].append(debt_name, debt_amount, debt_interest_rate, monthly_payment)
+                record('couples', 'append', 'responses_2.debts', responses_2['debts'].to_record(debt_name))
                 st.success(f"Added Debt: {debt_name}")
             else:
                 st.error("Please enter a debt name.")
+        responses_2['debt_order'] = st.multiselect("Custom debt payoff order (optional)", options=responses_2['debts'].names, key='debt_order_2')
+        responses_2['debt_extra'] = st.number_input("Extra paid toward debts each month, out of the remaining funds ($)", min_value=0.0, key='debt_extra_2',
+                                                   help="The rest of the remaining funds goes to the goals in the funding plan")
+        persist_widget('couples', 'debt_extra_2')
 
         # Goal Input
         st.subheader("Add Goal:")
         goal_name = st.text_input("Goal Name", key='goal_name_2')
         goal_cost = st.number_input("Goal Cost ($)", min_value=0.0, key='goal_cost_2')
         target_year = st.number_input("Target Year", min_value=date.today().year, value=date.today().year, key='target_year_2')
-        goal_account = st.selectbox("Account for Goal", options=[a[0] for a in responses_2['accounts']], key='goal_account_2')
+        goal_accounts = st.multiselect("Accounts for Goal (leave empty to draw on all accounts)", options=responses_2['accounts'].names, key='goal_account_2')
         if st.button("Add this Goal for Partner 2"):
-            if goal_name:
-                responses_2['goals'].append({"name": goal_name, "cost": goal_cost, "target_year": target_year, "account": goal_account})
+            if goal_name in responses_2['goals']:
+                st.error("Goal already exists.")
+            elif goal_name:
+                responses_2['goals'].append(goal_name, goal_cost, target_year, goal_account(goal_accounts))
+                record('couples', 'append', 'responses_2.goals', responses_2['goals'].to_record(goal_name))
                 st.success(f"Added Goal: {goal_name}")
             else:
                 st.error("Please enter a goal name.")
 
+    lap('inputs.partner_2')
+
     # Joint Input Section
     with col_joint:
         st.header("Joint Information")
         st.subheader("Joint Income")
         joint_responses['joint_income'] = st.number_input("What is your joint monthly income?", min_value=0.0, key='joint_income')
+        persist_widget('couples', 'joint_income')
         st.subheader("Joint Expenses")
         joint_responses['joint_expenses'] = st.number_input("What are your joint monthly expenses?", min_value=0.0, key='joint_expenses')
+        persist_widget('couples', 'joint_expenses')
         joint_responses['joint_debt_payments'] = st.number_input("Joint Monthly Debt Payments (shared debts)", min_value=0.0, key='joint_debt_payments')
+        persist_widget('couples', 'joint_debt_payments')
 
         # Joint Account Input
         st.subheader("Add Joint Account:")
@@ -288,8 +631,11 @@ def main():
         joint_interest_rate = st.number_input("Joint Interest Rate (%)", min_value=0.0, key='joint_interest_rate')
         joint_balance = st.number_input("Joint Account Balance ($)", min_value=0.0, key='joint_balance')
         if st.button("Add this Joint Account"):
-            if joint_account_name:
-                joint_responses['joint_accounts'].append([joint_account_name, joint_account_type, joint_interest_rate, joint_balance])
+            if joint_account_name in joint_responses['joint_accounts']:
+                st.error("Joint account already exists.")
+            elif joint_account_name:
+                joint_responses['joint_accounts'].append(joint_account_name, joint_account_type, joint_interest_rate, joint_balance)
+                record('couples', 'append', 'joint_responses.joint_accounts', joint_responses['joint_accounts'].to_record(joint_account_name))
                 st.success(f"Added Joint Account: {joint_account_name}")
             else:
                 st.error("Please enter a joint account name.")
@@ -300,74 +646,68 @@ def main():
         joint_goal_cost = st.number_input("Joint Goal Cost ($)", min_value=0.0, key='joint_goal_cost')
         joint_target_year = st.number_input("Joint Target Year", min_value=date.today().year, value=date.today().year, key='joint_target_year')
         if st.button("Add this Joint Goal"):
-            if joint_goal_name:
-                joint_responses['joint_goals'].append({"name": joint_goal_name, "cost": joint_goal_cost, "target_year": joint_target_year})
+            if joint_goal_name in joint_responses['joint_goals']:
+                st.error("Joint goal already exists.")
+            elif joint_goal_name:
+                joint_responses['joint_goals'].append(joint_goal_name, joint_goal_cost, joint_target_year)
+                record('couples', 'append', 'joint_responses.joint_goals', joint_responses['joint_goals'].to_record(joint_goal_name))
                 st.success(f"Added Joint Goal: {joint_goal_name}")
             else:
                 st.error("Please enter a joint goal name.")
 
-    # Summary Section
-    st.header("Summary of Inputs")
-    st.subheader("Partner 1's Accounts:")
-    if responses_1['accounts']:
-        for account in responses_1['accounts']:
-            st.write(f"- {account[0]} ({account[1]}): ${account[3]:,.2f}")
-    else:
-        st.write("No accounts added.")
-
-    st.subheader("Partner 1's Debts:")
-    if responses_1['debts']:
-        for debt in responses_1['debts']:
-            st.write(f"- {debt[0]}: ${debt[1]:,.2f} at {debt[2]:,.2f}% interest, monthly payment ${debt[3]:,.2f}")
-    else:
-        st.write("No debts added.")
-
-    st.subheader("Partner 1's Goals:")
-    if responses_1['goals']:
-        for goal in responses_1['goals']:
-            st.write(f"- {goal['name']}: ${goal['cost']:.2f} by {goal['target_year']}, Account: {goal['account']}")
-    else:
-        st.write("No goals added.")
-
-    st.subheader("Partner 2's Accounts:")
-    if responses_2['accounts']:
-        for account in responses_2['accounts']:
-            st.write(f"- {account[0]} ({account[1]}): ${account[3]:,.2f}")
-    else:
-        st.write("No accounts added.")
+    lap('inputs.joint')
 
-    st.subheader("Partner 2's Debts:")
-    if responses_2['debts']:
-        for debt in responses_2['debts']:
-            st.write(f"- {debt[0]}: ${debt[1]:,.2f} at {debt[2]:,.2f}% interest, monthly payment ${debt[3]:,.2f}")
-    else:
-        st.write("No debts added.")
+    # Bulk import Section
+    with st.expander("Bulk import accounts, debts and goals from a file"):
+        st.write("Upload a CSV, JSON or JSON Lines file with one row per item. Each row needs a `section` (partner_1, partner_2 or joint) and a `kind` (account, debt or goal), "
+                 "plus the item's fields: `name`, `type`, `rate`, `balance` for accounts, `name`, `amount`, `rate`, `payment` for debts and `name`, `cost`, `target_year`, `account` for goals.")
+        import_file = st.file_uploader("Import file", type=["csv", "json", "jsonl"], key='import_file')
+        if st.button("Import"):
+            if import_file is None:
+                st.error("Please choose a file to import.")
+            else:
+                import_household_file(import_file, responses_1, responses_2, joint_responses)
+        if 'import_message' in st.session_state:
+            st.success(st.session_state.pop('import_message'))
 
-    st.subheader("Partner 2's Goals:")
-    if responses_2['goals']:
-        for goal in responses_2['goals']:
-            st.write(f"- {goal['name']}: ${goal['cost']:.2f} by {goal['target_year']}, Account: {goal['account']}")
-    else:
-        st.write("No goals added.")
+    lap('bulk_import')
 
-    st.subheader("Joint Accounts:")
-    if joint_responses['joint_accounts']:
-        for account in joint_responses['joint_accounts']:
-            st.write(f"- {account[0]} ({account[1]}): ${account[3]:,.2f}")
-    else:
-        st.write("No joint accounts added.")
+    # Monthly debt payments come from the debts each partner entered
+    responses_1['total_debt_payments'] = float(responses_1['debts'].column('payment').sum())
+    responses_2['total_debt_payments'] = float(responses_2['debts'].column('payment').sum())
 
-    st.subheader("Joint Goals:")
-    if joint_responses['joint_goals']:
-        for goal in joint_responses['joint_goals']:
-            st.write(f"- {goal['name']}: ${goal['cost']:.2f} by {goal['target_year']}")
-    else:
-        st.write("No joint goals added.")
+    # Summary Section
+    st.header("Summary of Inputs")
+    show_summary_list("Partner 1's Accounts:", account_lines(responses_1['accounts']), "No accounts added.", 'accounts_1')
+    show_summary_list("Partner 1's Debts:", debt_lines(responses_1['debts']), "No debts added.", 'debts_1')
+    show_summary_list("Partner 1's Goals:", goal_lines(responses_1['goals']), "No goals added.", 'goals_1')
+    show_summary_list("Partner 2's Accounts:", account_lines(responses_2['accounts']), "No accounts added.", 'accounts_2')
+    show_summary_list("Partner 2's Debts:", debt_lines(responses_2['debts']), "No debts added.", 'debts_2')
+    show_summary_list("Partner 2's Goals:", goal_lines(responses_2['goals']), "No goals added.", 'goals_2')
+    show_summary_list("Joint Accounts:", account_lines(joint_responses['joint_accounts']), "No joint accounts added.", 'joint_accounts')
+    show_summary_list("Joint Goals:", goal_lines(joint_responses['joint_goals'], show_account=False), "No joint goals added.", 'joint_goals')
+
+    lap('summary')
+
+    # Optional Monte Carlo simulation of market returns
+    simulate_returns = st.checkbox("Simulate market uncertainty (Monte Carlo)", key='simulate_returns')
+    volatility = None
+    if simulate_returns:
+        volatility = st.number_input("Annual volatility of returns (%)", min_value=0.0, value=DEFAULT_VOLATILITY, key='volatility')
+    inflation = st.number_input("Yearly inflation of expenses (%)", min_value=0.0, value=DEFAULT_INFLATION, step=0.5, key='inflation')
+
+    lap('options')
 
     # Button to display the dashboard
     if st.button("Show Dashboard"):
         st.session_state.dashboard_run = True
-        show_dashboard(responses_1, responses_2, joint_responses, selected_year)
+        show_dashboard(responses_1, responses_2, joint_responses, selected_year, volatility, inflation)
+    lap('dashboard')
+
+    # Drop derived data if this session holds more than its derived-data budget
+    enforce_budget()
+    lap('session_budget')
+    finish_rerun()
 
 # Run the main function
 if __name__ == "__main__":
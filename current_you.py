@@ -1,110 +1,33 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
+from session_persistence import get_journal, restore_state, record, persist_widget
+from statements import summarize_statements
+from charts import pie_chart_png, bar_chart_png
+from session_budget import enforce_budget
+from metrics import start_rerun, lap, span, finish_rerun
+from styles import CURRENT_YOU_CSS, setup_page
+
+# Function to get the expense limit left by the Future You goals: the one the Future You tool worked out in
+# this session or, when it hasn't run in this session, the one its saved goals and income leave
+def future_you_expense_limit():
+    if st.session_state.get('future_you_restored'):
+        return st.session_state.get('future_you_expense_limit')
+    if 'saved_future_you_expense_limit' not in st.session_state:
+        saved = get_journal().restore()
+        limit = None
+        if saved.get('future_you.goals'):
+            from goal_solver import expense_limit  # Loaded only when there are goals, so numpy doesn't slow down the first page load
+            limit = expense_limit(saved['future_you.goals'], saved.get('future_you.widget.monthly_income', 0.0))
+        st.session_state.saved_future_you_expense_limit = limit
+    return st.session_state.saved_future_you_expense_limit
 
-# Set page config for better layout
-st.set_page_config(layout="wide")
-
-# Custom CSS for cleaner aesthetics
-def set_custom_styles():
-    st.markdown(
-        """
-        <style>
-        /* Background color */
-        .stApp {
-            background-color: #fafafa;
-        }
-        /* General styles */
-        body {
-            color: #333333;
-            background-color: #f0f2f6;
-        }
-        
-        /* Title and description */
-        .title {
-            color: #4B0082;  /* Indigo */
-            text-align: center;
-            margin-bottom: 20px;
-        }
-        
-        .description {
-            background-color: #e6e6fa;  /* Lavender */
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 30px;
-            font-family: 'Verdana', sans-serif;  /* Added font style */
-        }
-        
-        /* Section headers */
-        .section-header {
-            color: #4B0082;  /* Indigo */
-            margin-top: 30px;
-            margin-bottom: 10px;
-        }
-        
-        /* Section2 headers */
-        .section2-header {
-            color: black;  /* Black */
-            margin-top: 10px;
-            margin-bottom: 10px;
-        }
-
-        /* Text styling */
-        .stApp p, .stApp div, .stApp span, .stApp label {
-            color: #4f4f4f;
-            font-family: 'Verdana', sans-serif;
-        }
-        /* Button styling */
-        .stButton>button {
-            color: #e6e6fa;
-            background-color: #e6e6fa; /* Changed for better contrast */
-            border-radius: 5px;
-            padding: 0.6em 1.2em;
-            font-weight: bold;
-        }
-        /* Input field styling */
-        input {
-            border: 2px solid #2e6ef7;
-            border-radius: 6px;
-        }
-        /* Expense Calculation Results Styling */
-        .stApp .stMarkdown h3 {
-            font-family: 'Arial', sans-serif;
-            font-weight: bold;
-            color: #2e6ef7;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
+def main():
+    start_rerun('current_you')
 
-# Function to create pie chart
-def create_pie_chart(data, title, colors=None):
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.pie(data.values(), labels=data.keys(), autopct='%1.1f%%', startangle=90, colors=colors, textprops={'fontsize': 12})
-    ax.set_title(title, fontweight="bold")
-    plt.axis('equal')
-    return fig
-
-# Function to create bar chart
-def create_bar_chart(data, title):
-    fig, ax = plt.subplots(figsize=(8, 5))
-    bars = ax.bar(data.keys(), data.values(), color='#2e6ef7')
-    ax.set_title(title, fontweight="bold")
-    ax.set_ylabel('Amount ($)', fontweight="bold")
-    plt.xticks(rotation=45, ha='right')
-    
-    for bar in bars:
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height + 0.01*max(data.values()),
-                f'${height:.2f}', ha='center', va='bottom')
-        
-    plt.tight_layout()
-    return fig
+    # Set page config and the Current You styles
+    setup_page("The Current You Tool", CURRENT_YOU_CSS)
 
-def main():
-    # Apply custom styles
-    set_custom_styles()
+    # Restore the expenses saved for this browser link (only on the first run of a session)
+    saved_state = restore_state('current_you') or {}
 
     st.markdown("<h1 class='title'>The Current You Tool</h1>", unsafe_allow_html=True)
 
@@ -120,15 +43,52 @@ def main():
 
     # New Section: Enter Post-Tax Income
     st.markdown("<h4 class='section2-header'>Monthly Income</h4>", unsafe_allow_html=True)
-    post_tax_income = st.number_input("Enter your monthly post-tax income:", min_value=0.0, step=100.0)
+    post_tax_income = st.number_input("Enter your monthly post-tax income:", min_value=0.0, step=100.0, key='post_tax_income')
+    persist_widget('current_you', 'post_tax_income')
 
     # Initialize session state variables
     if 'fixed_expenses' not in st.session_state:
-        # Initialize with default fixed expense categories
-        st.session_state.fixed_expenses = {'Housing': 0.0, 'Utilities': 0.0, 'Insurance': 0.0, 'Transportation': 0.0, 'Debt Payments': 0.0, 'Groceries': 0.0}
+        if 'fixed_expenses' in saved_state:
+            st.session_state.fixed_expenses = saved_state['fixed_expenses']
+        else:
+            # Initialize with default fixed expense categories
+            st.session_state.fixed_expenses = {'Housing': 0.0, 'Utilities': 0.0, 'Insurance': 0.0, 'Transportation': 0.0, 'Debt Payments': 0.0, 'Groceries': 0.0}
+            record('current_you', 'set', 'fixed_expenses', st.session_state.fixed_expenses)
     if 'variable_expenses' not in st.session_state:
-        # Initialize with default variable expense categories
-        st.session_state.variable_expenses = {'Fun (trips, vacations etc.)': 0.0}
+        if 'variable_expenses' in saved_state:
+            st.session_state.variable_expenses = saved_state['variable_expenses']
+        else:
+            # Initialize with default variable expense categories
+            st.session_state.variable_expenses = {'Fun (trips, vacations etc.)': 0.0}
+            record('current_you', 'set', 'variable_expenses', st.session_state.variable_expenses)
+
+    lap('income')
+
+    # Fill in the expense categories from statement CSVs (before the expense inputs are drawn, so their values can be set)
+    with st.expander("Fill in from bank or credit card statements (CSV)"):
+        st.write("Upload CSV statements from each account or card. Every transaction is sorted into a category by its description, and each category is set to its average per month.")
+        statement_files = st.file_uploader("Statement files:", type=['csv'], accept_multiple_files=True, key='statement_files')
+        if st.button("Fill In My Expenses", key='apply_statements'):
+            if not statement_files:
+                st.warning("Please upload at least one statement.")
+            else:
+                try:
+                    summary = summarize_statements(statement_files)
+                except ValueError as error:
+                    st.error(str(error))
+                else:
+                    averages = summary.monthly_averages()
+                    for kind in ('fixed', 'variable'):
+                        expenses = st.session_state[f"{kind}_expenses"]
+                        for category, amount in averages[kind].items():
+                            expenses[category] = amount
+                            st.session_state[f"{kind}_{category}"] = amount
+                            record('current_you', 'put', f"{kind}_expenses", [category, amount])
+                    st.success(f"Read {summary.rows} transactions over {max(1, len(summary.months))} month(s); {summary.matched} matched a category and the rest were added to 'Other'.")
+                    if summary.skipped:
+                        st.warning(f"{summary.skipped} rows could not be read and were skipped.")
+
+    lap('statements')
 
     st.markdown("<h4 class='section2-header'>Monthly Fixed Expenses</h4>", unsafe_allow_html=True)
     # Display fixed expenses inputs
@@ -136,7 +96,12 @@ def main():
     for category in st.session_state.fixed_expenses:
         col1, col2 = st.columns([3, 1])
         with col1:
+            # Start the input from the saved amount the first time it is shown
+            if f"fixed_{category}" not in st.session_state:
+                st.session_state[f"fixed_{category}"] = st.session_state.fixed_expenses[category]
             amount = st.number_input(f"{category}:", min_value=0.0, step=10.0, key=f"fixed_{category}")
+            if amount != st.session_state.fixed_expenses[category]:
+                record('current_you', 'put', 'fixed_expenses', [category, amount])
             st.session_state.fixed_expenses[category] = amount
         with col2:
             if st.button("Delete", key=f"delete_fixed_{category}"):
@@ -144,6 +109,7 @@ def main():
     # Remove deleted fixed expense categories
     for category in fixed_expenses_to_delete:
         del st.session_state.fixed_expenses[category]
+        record('current_you', 'delete', 'fixed_expenses', category)
 
     # Add new fixed expense category
     new_fixed_category = st.text_input("Add a new fixed expense category:")
@@ -151,6 +117,7 @@ def main():
         if new_fixed_category:
             if new_fixed_category not in st.session_state.fixed_expenses:
                 st.session_state.fixed_expenses[new_fixed_category] = 0.0
+                record('current_you', 'put', 'fixed_expenses', [new_fixed_category, 0.0])
             else:
                 st.warning("Category already exists.")
         else:
@@ -162,7 +129,12 @@ def main():
     for category in st.session_state.variable_expenses:
         col1, col2 = st.columns([3, 1])
         with col1:
+            # Start the input from the saved amount the first time it is shown
+            if f"variable_{category}" not in st.session_state:
+                st.session_state[f"variable_{category}"] = st.session_state.variable_expenses[category]
             amount = st.number_input(f"{category}:", min_value=0.0, step=10.0, key=f"variable_{category}")
+            if amount != st.session_state.variable_expenses[category]:
+                record('current_you', 'put', 'variable_expenses', [category, amount])
             st.session_state.variable_expenses[category] = amount
         with col2:
             if st.button("Delete", key=f"delete_variable_{category}"):
@@ -170,6 +142,7 @@ def main():
     # Remove deleted variable expense categories
     for category in variable_expenses_to_delete:
         del st.session_state.variable_expenses[category]
+        record('current_you', 'delete', 'variable_expenses', category)
 
     # Add new variable expense category
     new_variable_category = st.text_input("Add a new variable expense category:")
@@ -177,6 +150,7 @@ def main():
         if new_variable_category:
             if new_variable_category not in st.session_state.variable_expenses:
                 st.session_state.variable_expenses[new_variable_category] = 0.0
+                record('current_you', 'put', 'variable_expenses', [new_variable_category, 0.0])
             else:
                 st.warning("Category already exists.")
         else:
@@ -184,7 +158,22 @@ def main():
 
     # Input expense limit from Future You tool
     st.markdown("<h2 class='section-header'>Step 2: Enter Expense Limit from 'Future You' Tool</h2>", unsafe_allow_html=True)
-    future_you_limit = st.number_input("Enter the monthly expense limit suggested by the Future You tool (the red number at the bottom of the Future You tool):", min_value=0.0, step=10.0)
+    # Take the limit the Future You goals leave whenever it changes; it can still be edited here
+    suggested_limit = future_you_expense_limit()
+    if suggested_limit is None:
+        st.session_state.pop('applied_expense_limit', None)
+    elif st.session_state.get('applied_expense_limit') != suggested_limit:
+        st.session_state.future_you_limit = suggested_limit
+        st.session_state.applied_expense_limit = suggested_limit
+    future_you_limit = st.number_input("Monthly expense limit from the Future You tool (filled in from your Future You goals when you have added some):", min_value=0.0, step=10.0, key='future_you_limit')
+    if suggested_limit is not None:
+        if future_you_limit == suggested_limit:
+            st.caption(f"Filled in from your Future You goals (${suggested_limit:,.0f} per month).")
+        else:
+            st.caption(f"Your Future You goals leave ${suggested_limit:,.0f} per month.")
+    persist_widget('current_you', 'future_you_limit')
+
+    lap('expenses')
 
     # Calculate total expenses
     if st.button("Calculate Expenses"):
@@ -222,30 +211,35 @@ def main():
                 st.write("Insights: You currently have a fixed to variable expense ratio of less than 65% - this means that the amount of money you have to spend every month is not the problem, instead it’s the amount you’re choosing to spend on fun and elective spending. This can be uncomfortable to adjust but it's your decision to make if you would rather change your goals or what you spend each month.")
 
         # Pie chart with fixed expenses, variable expenses, and Remaining Income
-        if post_tax_income > 0:
-            remaining_income = post_tax_income - total_expenses
-            if remaining_income < 0:
-                remaining_income = 0
-            allocation_data = {
-                'Fixed Expenses': total_fixed,
-                'Variable Expenses': total_variable,
-                'Remaining Income (to put towards goals & savings)': remaining_income
-            }
-            fig = create_pie_chart(allocation_data, 'Income & Expenses Breakdown', colors=['#ff9999', '#66b3ff', '#99ff99'])
-            st.pyplot(fig)
-        else:
-            # Pie chart without income
-            allocation_data = {
-                'Fixed Expenses': total_fixed,
-                'Variable Expenses': total_variable
-            }
-            fig = create_pie_chart(allocation_data, 'Expenses Breakdown', colors=['#ff9999', '#66b3ff'])
-            st.pyplot(fig)
-
-        # Bar chart for expense breakdown
-        all_expenses_data = {**fixed_expenses_data, **variable_expenses_data}
-        fig2 = create_bar_chart(all_expenses_data, 'Expense Breakdown by Category')
-        st.pyplot(fig2)
+        with span('charts'):
+            if post_tax_income > 0:
+                remaining_income = post_tax_income - total_expenses
+                if remaining_income < 0:
+                    remaining_income = 0
+                allocation_data = {
+                    'Fixed Expenses': total_fixed,
+                    'Variable Expenses': total_variable,
+                    'Remaining Income (to put towards goals & savings)': remaining_income
+                }
+                st.image(pie_chart_png(allocation_data, 'Income & Expenses Breakdown', colors=['#ff9999', '#66b3ff', '#99ff99']))
+            else:
+                # Pie chart without income
+                allocation_data = {
+                    'Fixed Expenses': total_fixed,
+                    'Variable Expenses': total_variable
+                }
+                st.image(pie_chart_png(allocation_data, 'Expenses Breakdown', colors=['#ff9999', '#66b3ff']))
+
+            # Bar chart for expense breakdown
+            all_expenses_data = {**fixed_expenses_data, **variable_expenses_data}
+            st.image(bar_chart_png(all_expenses_data, 'Expense Breakdown by Category'))
+
+    lap('results')
+
+    # Drop derived data if this session holds more than its derived-data budget
+    enforce_budget()
+    lap('session_budget')
+    finish_rerun()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,88 @@
+import numpy as np
+
+# Debt amortization for whole lists of debts at once. Each month is one vectorized step over all
+# debts, and the loop stops as soon as every debt is paid off.
+
+MAX_MONTHS = 12 * 30
+PAID_OFF = 0.005  # Balances under half a cent count as paid off
+
+MINIMUM_PAYMENTS = 'Minimum payments'
+AVALANCHE = 'Avalanche (highest rate first)'
+SNOWBALL = 'Snowball (smallest balance first)'
+CUSTOM = 'Custom order'
+
+
+# Function to amortize many debts together.
+# Extra money (and, with rollover, the payments of debts already paid off) goes to debts in the given priority order.
+def amortize(balances, annual_rates, payments, extra_payment=0.0, order=None, rollover=False, max_months=MAX_MONTHS):
+    balance = np.array(balances, dtype=float)
+    monthly_rates = np.asarray(annual_rates, dtype=float) / 100 / 12
+    payments = np.asarray(payments, dtype=float)
+    order = np.arange(balance.size) if order is None else np.asarray(order, dtype=int)
+
+    history = np.zeros((max_months + 1, balance.size))
+    history[0] = balance
+    total_interest = np.zeros(balance.size)
+    payoff_months = np.full(balance.size, np.nan)
+    payoff_months[balance <= PAID_OFF] = 0
+
+    month = 0
+    while month < max_months and (balance > PAID_OFF).any():
+        month += 1
+        interest = balance * monthly_rates
+        balance = balance + interest
+        total_interest += interest
+
+        # Regular payments, never more than what is owed
+        paid = np.minimum(payments, balance)
+        balance -= paid
+
+        # Spread the extra money over the debts in priority order
+        available = extra_payment
+        if rollover:
+            available += (payments - paid).sum()
+        if available > 0:
+            remaining = balance[order]
+            already_covered = np.cumsum(remaining) - remaining
+            balance[order] = remaining - np.clip(available - already_covered, 0, remaining)
+
+        newly_paid = np.isnan(payoff_months) & (balance <= PAID_OFF)
+        payoff_months[newly_paid] = month
+        balance[balance <= PAID_OFF] = 0
+        history[month] = balance
+
+    return {
+        'payoff_months': payoff_months,
+        'total_interest': total_interest,
+        'balances': history[:month + 1],
+    }
+
+
+# Function to order debts from highest to lowest interest rate
+def avalanche_order(balances, annual_rates):
+    return np.lexsort((np.asarray(balances, dtype=float), -np.asarray(annual_rates, dtype=float)))
+
+
+# Function to order debts from smallest to largest balance
+def snowball_order(balances, annual_rates):
+    return np.lexsort((-np.asarray(annual_rates, dtype=float), np.asarray(balances, dtype=float)))
+
+
+# Function to compare payoff strategies when extra money is applied each month.
+# custom_order lists debt positions to pay first; debts left out follow in their original order.
+def compare_strategies(balances, annual_rates, payments, extra_payment, custom_order=None, max_months=MAX_MONTHS):
+    strategies = {
+        MINIMUM_PAYMENTS: dict(extra_payment=0.0, rollover=False),
+        AVALANCHE: dict(order=avalanche_order(balances, annual_rates)),
+        SNOWBALL: dict(order=snowball_order(balances, annual_rates)),
+    }
+    if custom_order:
+        rest = [position for position in range(len(balances)) if position not in custom_order]
+        strategies[CUSTOM] = dict(order=list(custom_order) + rest)
+
+    results = {}
+    for strategy, options in strategies.items():
+        options.setdefault('extra_payment', extra_payment)
+        options.setdefault('rollover', True)
+        results[strategy] = amortize(balances, annual_rates, payments, max_months=max_months, **options)
+    return results
@@ -1,98 +1,17 @@
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
 from datetime import date
+from goal_solver import PAST_TARGET, UNREACHABLE, required_monthly_contribution, months_to_goal, target_year_from_months, expense_limit
+from session_persistence import restore_state, record, persist_widget
+from session_budget import use_derived, enforce_budget
+from metrics import start_rerun, lap, finish_rerun
+from monte_carlo import DEFAULT_VOLATILITY, simulate_balances, summarize_balances, goal_success_probability
+from allocation import ON_TIME, plan_goals, plan_status
+from styles import FUTURE_YOU_CSS, setup_page
 
-# Set page config for better layout
-st.set_page_config(layout="wide")
+start_rerun('future_you')
 
-# Define custom CSS styles
-st.markdown("""
-<style>
-/* General styles */
-body {
-    color: #333333;
-    background-color: #f0f2f6;
-}
-
-/* Title and description */
-.title {
-    color: #4B0082;  /* Indigo */
-    text-align: center;
-    margin-bottom: 20px;
-}
-
-.description {
-    background-color: #e6e6fa;  /* Lavender */
-    padding: 20px;
-    border-radius: 10px;
-    margin-bottom: 30px;
-}
-
-/* Section headers */
-.section-header {
-    color: #4B0082;  /* Indigo */
-    margin-top: 30px;
-    margin-bottom: 10px;
-}
-
-/* Section2 headers */
-.section2-header {
-    color: black;  /* Black */
-    margin-top: 10px;
-    margin-bottom: 10px;
-}
-
-/* Input sections */
-.input-section {
-    background-color: #ffffff;
-    padding: 20px;
-    border-radius: 10px;
-    margin-bottom: 30px;
-}
-/* Button styling */
-.stButton>button {
-    color: black;
-    background-color: #e6e6fa;
-    border-radius: 5px;
-    padding: 0.6em 1.2em;
-    font-weight: bold;
-}
-/* Text styling */
-.stApp p, .stApp div, .stApp span, .stApp label {
-    color: #4f4f4f;
-    font-family: 'Verdana', sans-serif;
- }
-/* Add goal section */
-.add-goal-section {
-    padding: 20px;
-    border: 2px dashed #9370DB;  /* Medium Purple */
-    border-radius: 10px;
-    margin-bottom: 30px;
-    background-color: #f9f9ff;
-}
-
-/* Sidebar styles */
-.sidebar .sidebar-content {
-    padding: 20px;
-}
-
-/* Results section */
-.results-section {
-    border: 2px solid #1E90FF;  /* Dodger Blue */
-    padding: 20px;
-    border-radius: 10px;
-    background-color: #f9f9ff;
-    margin-bottom: 30px;
-}
-
-/* Timeline */
-.plotly-chart {
-    margin-bottom: 30px;
-}
-</style>
-""", unsafe_allow_html=True)
+# Set page config and the Future You styles
+setup_page("The Future You Tool", FUTURE_YOU_CSS)
 
 # Title and Description
 st.markdown("<h1 class='title'>The Future You Tool</h1>", unsafe_allow_html=True)
@@ -105,14 +24,19 @@ st.markdown("""
 # Initialize variables
 current_year = date.today().year
 
+# Restore the goals saved for this browser link (only on the first run of a session)
+saved_state = restore_state('future_you') or {}
+
 # Initialize session state for goals and edit tracking
 if 'goals' not in st.session_state:
-    st.session_state.goals = []
+    st.session_state.goals = saved_state.get('goals', [])
 if 'retirement_goal_added' not in st.session_state:
-    st.session_state.retirement_goal_added = False
+    st.session_state.retirement_goal_added = saved_state.get('retirement_goal_added', False)
 if 'edit_goal_index' not in st.session_state:
     st.session_state.edit_goal_index = None
 
+lap('page_setup')
+
 # Inputs Section
 st.markdown("<h2 class='section-header'>Inputs</h2>", unsafe_allow_html=True)
 
@@ -121,8 +45,10 @@ monthly_income = st.number_input(
     "Enter your total monthly income after tax:",
     min_value=0.0,
     step=100.0,
-    format="%.2f"
+    format="%.2f",
+    key='monthly_income'
 )
+persist_widget('future_you', 'monthly_income')
 
 # Add default 'Retirement' goal if not already added and monthly income is provided
 if not st.session_state.retirement_goal_added and monthly_income > 0:
@@ -136,22 +62,22 @@ if not st.session_state.retirement_goal_added and monthly_income > 0:
         'goal_type': 'Target Year'
     }
     # Calculate monthly contribution for the retirement goal
-    months_to_goal = 12 * (retirement_goal['target_year'] - current_year)
-    rate_of_return_monthly = retirement_goal['interest_rate'] / 100 / 12
-    if months_to_goal <= 0:
+    monthly_contribution, status = required_monthly_contribution(
+        retirement_goal['goal_amount'],
+        retirement_goal['current_savings'],
+        retirement_goal['interest_rate'],
+        12 * (retirement_goal['target_year'] - current_year)
+    )
+    if status == PAST_TARGET:
         st.error("Retirement goal target year must be greater than the current year.")
     else:
-        if rate_of_return_monthly > 0:
-            denominator = (1 + rate_of_return_monthly) ** months_to_goal - 1
-            if denominator == 0:
-                st.error("Invalid calculation for retirement goal due to zero denominator.")
-            else:
-                retirement_goal['monthly_contribution'] = (retirement_goal['goal_amount'] - retirement_goal['current_savings'] * (1 + rate_of_return_monthly) ** months_to_goal) * rate_of_return_monthly / denominator
-        else:
-            retirement_goal['monthly_contribution'] = (retirement_goal['goal_amount'] - retirement_goal['current_savings']) / months_to_goal
-        retirement_goal['monthly_contribution'] = int(round(retirement_goal['monthly_contribution']))
+        retirement_goal['monthly_contribution'] = int(round(monthly_contribution))
         st.session_state.goals.append(retirement_goal)
         st.session_state.retirement_goal_added = True
+        record('future_you', 'append', 'goals', retirement_goal)
+        record('future_you', 'set', 'retirement_goal_added', True)
+
+lap('income_and_retirement')
 
 # Goal Addition
 st.markdown("<h4 class='section2-header'>Add a New Goal</h4>", unsafe_allow_html=True)
@@ -186,22 +112,13 @@ if goal_type == "Monthly Contribution":
         step=50.0,
         format="%.2f"
     )
+    target_year = None
     if contribution_amount > 0 and goal_amount > 0:
-        rate_of_return_monthly = interest_rate / 100 / 12
-        if rate_of_return_monthly > 0:
-            try:
-                # Adjusted for current_savings
-                future_value_contributions = contribution_amount * ((1 + rate_of_return_monthly) ** (12 * 100) - 1) / rate_of_return_monthly
-                target_year = current_year + int(np.ceil(np.log((goal_amount - current_savings * (1 + rate_of_return_monthly) ** (12 * 100)) / (contribution_amount * rate_of_return_monthly) + 1) / np.log(1 + rate_of_return_monthly)))
-            except:
-                st.error("Invalid calculation for months to goal.")
-                target_year = current_year + 1
+        months, status = months_to_goal(goal_amount, current_savings, interest_rate, contribution_amount)
+        if status == UNREACHABLE:
+            st.error("This goal can't be reached with that monthly contribution within 100 years.")
         else:
-            try:
-                months_to_goal = (goal_amount - current_savings) / contribution_amount
-                target_year = current_year + int(np.ceil(months_to_goal / 12))
-            except:
-                target_year = current_year + 1
+            target_year = target_year_from_months(current_year, months)
 elif goal_type == "Target Year":
     target_year = st.number_input(
         "Target year to reach this goal (yyyy)",
@@ -218,25 +135,19 @@ if st.button("Add goal to timeline"):
             if contribution_amount is None or contribution_amount <= 0:
                 st.error("Please enter a valid monthly contribution amount.")
                 st.stop()
+            if target_year is None:
+                st.error("This goal can't be reached with that monthly contribution within 100 years.")
+                st.stop()
             target_year = int(target_year)
             monthly_contribution = contribution_amount
         elif goal_type == "Target Year":
             if target_year is None or target_year <= current_year:
                 st.error("Please enter a valid target year.")
                 st.stop()
-            months_to_goal = 12 * (int(target_year) - current_year)
-            rate_of_return_monthly = interest_rate / 100 / 12
-            if months_to_goal <= 0:
+            monthly_contribution, status = required_monthly_contribution(goal_amount, current_savings, interest_rate, 12 * (int(target_year) - current_year))
+            if status == PAST_TARGET:
                 st.error("Target year must be greater than the current year.")
                 st.stop()
-            if rate_of_return_monthly > 0:
-                denominator = (1 + rate_of_return_monthly) ** months_to_goal - 1
-                if denominator == 0:
-                    st.error("Invalid calculation due to zero denominator.")
-                    st.stop()
-                monthly_contribution = (goal_amount - current_savings * (1 + rate_of_return_monthly) ** months_to_goal) * rate_of_return_monthly / denominator
-            else:
-                monthly_contribution = (goal_amount - current_savings) / months_to_goal
         monthly_contribution = int(round(monthly_contribution))
 
         # Add goal to session state
@@ -250,16 +161,39 @@ if st.button("Add goal to timeline"):
             'goal_type': goal_type  # Store goal type for display
         }
         st.session_state.goals.append(new_goal)
+        record('future_you', 'append', 'goals', new_goal)
         st.success(f"Goal '{goal_name}' added successfully.")
     else:
         st.error("Please enter a valid goal name, amount, and Initial contribution.")
 
+lap('add_goal')
+
 # Sidebar for managing goals
 st.sidebar.header("Manage Goals")
 
-# Manage goals section
-for index, goal in enumerate(st.session_state.goals):
-    with st.sidebar.expander(f"{goal['goal_name']} (Target Year: {goal['target_year']}, Monthly Contribution: ${goal['monthly_contribution']})"):
+# Message from the last goal update or removal, shown after the page reruns
+if 'goal_message' in st.session_state:
+    st.sidebar.success(st.session_state.pop('goal_message'))
+
+# Function to open a goal for editing. Only one goal is edited at a time, so when another goal
+# was open the whole page reruns to close it.
+def open_goal_editor(index):
+    if st.session_state.edit_goal_index is not None:
+        st.session_state.close_other_goal_editor = True
+    st.session_state.edit_goal_index = index
+
+# Function to close the goal being edited
+def close_goal_editor():
+    st.session_state.edit_goal_index = None
+
+# Each goal's expander is a fragment, so editing one goal only reruns that expander;
+# the whole page reruns only when a goal is actually updated or removed
+@st.fragment
+def manage_goal(index):
+    if st.session_state.pop('close_other_goal_editor', False):
+        st.rerun()
+    goal = st.session_state.goals[index]
+    with st.expander(f"{goal['goal_name']} (Target Year: {goal['target_year']}, Monthly Contribution: ${goal['monthly_contribution']})"):
         st.write(f"**Goal Amount:** ${goal['goal_amount']}")
         st.write(f"**Initial contribution:** ${int(round(goal['current_savings']))}")
         st.write(f"**Interest Rate:** {goal['interest_rate']}%")
@@ -320,22 +254,11 @@ for index, goal in enumerate(st.session_state.goals):
                 )
                 # Recalculate target_year based on new contribution
                 if edited_contribution_amount > 0 and edited_goal_amount > 0:
-                    rate_of_return_monthly = edited_interest_rate / 100 / 12
-                    if rate_of_return_monthly > 0:
-                        try:
-                            # Adjusted for current_savings
-                            # Using future value formula to estimate months_to_goal
-                            months_to_goal = np.log(1 + (edited_goal_amount - edited_current_savings * (1 + rate_of_return_monthly) ** (12 * 100)) / (edited_contribution_amount * rate_of_return_monthly)) / np.log(1 + rate_of_return_monthly)
-                            target_year_calculated = current_year + int(np.ceil(months_to_goal / 12))
-                        except:
-                            st.error("Invalid calculation for months to goal.")
-                            target_year_calculated = current_year + 1
+                    months, status = months_to_goal(edited_goal_amount, edited_current_savings, edited_interest_rate, edited_contribution_amount)
+                    if status == UNREACHABLE:
+                        st.error("This goal can't be reached with that monthly contribution within 100 years.")
                     else:
-                        try:
-                            months_to_goal = (edited_goal_amount - edited_current_savings) / edited_contribution_amount
-                            target_year_calculated = current_year + int(np.ceil(months_to_goal / 12))
-                        except:
-                            target_year_calculated = current_year + 1
+                        st.write(f"**Projected Target Year:** {target_year_from_months(current_year, months)}")
             elif edited_goal_type == "Target Year":
                 edited_target_year = st.number_input(
                     "Target Year",
@@ -349,45 +272,25 @@ for index, goal in enumerate(st.session_state.goals):
             # Update button
             if st.button("Update Goal", key=f"update_{index}"):
                 if edited_goal_type == "Target Year":
-                    months_to_goal = 12 * (int(edited_target_year) - current_year)
-                    rate_of_return_monthly = edited_interest_rate / 100 / 12
-                    if months_to_goal <= 0:
+                    edited_monthly_contribution, status = required_monthly_contribution(edited_goal_amount, edited_current_savings, edited_interest_rate, 12 * (int(edited_target_year) - current_year))
+                    if status == PAST_TARGET:
                         st.error("Target year must be greater than the current year.")
                         st.stop()
-                    if rate_of_return_monthly > 0:
-                        denominator = (1 + rate_of_return_monthly) ** months_to_goal - 1
-                        if denominator == 0:
-                            st.error("Invalid calculation due to zero denominator.")
-                            st.stop()
-                        edited_monthly_contribution = (edited_goal_amount - edited_current_savings * (1 + rate_of_return_monthly) ** months_to_goal) * rate_of_return_monthly / denominator
-                    else:
-                        edited_monthly_contribution = (edited_goal_amount - edited_current_savings) / months_to_goal
                 else:
                     # For "Monthly Contribution", recalculate target_year
-                    contribution_amount = edited_contribution_amount
-                    rate_of_return_monthly = edited_interest_rate / 100 / 12
-                    if contribution_amount <= 0:
+                    if edited_contribution_amount <= 0:
                         st.error("Monthly contribution must be greater than zero.")
                         st.stop()
-                    if rate_of_return_monthly > 0:
-                        try:
-                            # Adjusted for current_savings
-                            months_to_goal = np.log(1 + (edited_goal_amount - edited_current_savings * (1 + rate_of_return_monthly) ** months_to_goal) / (contribution_amount * rate_of_return_monthly)) / np.log(1 + rate_of_return_monthly)
-                            edited_target_year = current_year + int(np.ceil(months_to_goal / 12))
-                        except:
-                            st.error("Invalid calculation for months to goal.")
-                            edited_target_year = current_year + 1
-                    else:
-                        try:
-                            months_to_goal = (edited_goal_amount - edited_current_savings) / contribution_amount
-                            edited_target_year = current_year + int(np.ceil(months_to_goal / 12))
-                        except:
-                            edited_target_year = current_year + 1
-                    edited_monthly_contribution = int(round(contribution_amount))
-                
+                    months, status = months_to_goal(edited_goal_amount, edited_current_savings, edited_interest_rate, edited_contribution_amount)
+                    if status == UNREACHABLE:
+                        st.error("This goal can't be reached with that monthly contribution within 100 years.")
+                        st.stop()
+                    edited_target_year = target_year_from_months(current_year, months)
+                    edited_monthly_contribution = edited_contribution_amount
+
                 # Ensure monthly_contribution is integer after recalculation
-                edited_monthly_contribution = int(round(edited_monthly_contribution)) if edited_goal_type == "Target Year" else int(round(edited_monthly_contribution))
-                
+                edited_monthly_contribution = int(round(edited_monthly_contribution))
+
                 # Update the goal values in the session state
                 st.session_state.goals[index] = {
                     'goal_name': edited_goal_name,
@@ -398,30 +301,40 @@ for index, goal in enumerate(st.session_state.goals):
                     'target_year': int(edited_target_year),
                     'goal_type': edited_goal_type
                 }
-                st.success(f"Goal '{edited_goal_name}' updated successfully.")
+                record('future_you', 'replace', 'goals', [index, st.session_state.goals[index]])
+                st.session_state.goal_message = f"Goal '{edited_goal_name}' updated successfully."
                 # Reset edit_goal_index
                 st.session_state.edit_goal_index = None
+                # The outputs and the other expanders depend on the goals list, so rerun the whole page
+                st.rerun()
             
             # Cancel Edit button
-            if st.button("Cancel", key=f"cancel_{index}"):
-                st.session_state.edit_goal_index = None
+            st.button("Cancel", key=f"cancel_{index}", on_click=close_goal_editor)
 
         else:
             # Edit button
-            if st.button("Edit Goal", key=f"edit_{index}"):
-                st.session_state.edit_goal_index = index
+            st.button("Edit Goal", key=f"edit_{index}", on_click=open_goal_editor, args=(index,))
 
             # Remove button
             if st.button("Remove Goal", key=f"remove_{index}"):
                 st.session_state.goals.pop(index)
-                st.success(f"Goal '{goal['goal_name']}' removed successfully.")
+                record('future_you', 'pop', 'goals', index)
+                st.session_state.goal_message = f"Goal '{goal['goal_name']}' removed successfully."
                 # If the removed goal was being edited, reset edit_goal_index
                 if st.session_state.edit_goal_index == index:
                     st.session_state.edit_goal_index = None
                 # Adjust edit_goal_index if necessary
                 elif st.session_state.edit_goal_index is not None and st.session_state.edit_goal_index > index:
                     st.session_state.edit_goal_index -= 1
-                break  # Exit after removal to prevent index issues
+                st.rerun()
+
+
+# Manage goals section
+with st.sidebar:
+    for index in range(len(st.session_state.goals)):
+        manage_goal(index)
+
+lap('sidebar')
 
 # Outputs Section
 st.markdown("<h2 class='section-header'>Outputs</h2>", unsafe_allow_html=True)
@@ -430,54 +343,53 @@ st.markdown("<h2 class='section-header'>Outputs</h2>", unsafe_allow_html=True)
 st.markdown("<h4 class='section2-header'>My Timeline</h4>", unsafe_allow_html=True)
 
 def plot_timeline():
-    # Get latest goal year for timeline end
-    if st.session_state.goals:
-        latest_year = max(goal['target_year'] for goal in st.session_state.goals)
+    # Plotly is only loaded once the timeline is drawn
+    from timeline import build_timeline, patch_timeline
+
+    # Reuse the figure from the last run and only recompute the goals that changed since
+    previous = st.session_state.get('timeline_figure')
+    traces = None if previous is None else len(previous.data)
+    if previous is not None:
+        fig = patch_timeline(previous, st.session_state.goals, monthly_income, current_year)
     else:
-        latest_year = current_year
-
-    # Create timeline data
-    total_contribution = sum(goal['monthly_contribution'] for goal in st.session_state.goals)
-    remaining_for_current_you = monthly_income - total_contribution
-    timeline_data = {
-        'Year': [current_year] + [goal['target_year'] for goal in st.session_state.goals],
-        'Event': ['Current Year'] + [goal['goal_name'] for goal in st.session_state.goals],
-        'Text': [
-            f"<b>Year:</b> {current_year}<br><b>Monthly Income:</b> ${int(round(monthly_income))}<br><b>Monthly contributions towards goals:</b> ${int(round(total_contribution))}<br><b>Monthly money remaining for current you:</b> ${int(round(remaining_for_current_you))}"
-        ] + [
-            f"<b>Year:</b> {goal['target_year']}<br><b>Goal Name:</b> {goal['goal_name']}<br><b>Goal Amount:</b> ${int(round(goal['goal_amount']))}<br><b>Initial Contribution:</b> ${int(round(goal['current_savings']))}<br><b>Monthly Contribution:</b> ${int(round(goal['monthly_contribution']))}"
-            for goal in st.session_state.goals
-        ]
-    }
-    timeline_df = pd.DataFrame(timeline_data)
-
-    fig = go.Figure()
-
-    # Add dots for current year and goals
-    fig.add_trace(go.Scatter(
-        x=timeline_df['Year'],
-        y=[0] * len(timeline_df),
-        mode='markers+text',
-        marker=dict(size=12, color='black', line=dict(width=2, color='black')), 
-        text=timeline_df['Event'],
-        textposition='top center',
-        hoverinfo='text',
-        hovertext=timeline_df['Text']
-    ))
-
-    # Add line connecting the dots
-    fig.add_trace(go.Scatter(
-        x=timeline_df['Year'],
-        y=[0] * len(timeline_df),
-        mode='lines',
-        line=dict(color='black', width=2)
-    ))
-
-    fig.update_layout(xaxis_title='Year', yaxis=dict(visible=False), showlegend=False)
+        fig = build_timeline(st.session_state.goals, monthly_income, current_year)
+    st.session_state.timeline_figure = fig
+    # Measured again only when the figure was rebuilt or gained or lost goals
+    use_derived('timeline_figure', changed=fig is not previous or len(fig.data) != traces)
     st.plotly_chart(fig, use_container_width=True)
 
 # Show Timeline
 plot_timeline()
+lap('timeline')
+
+
+# The sensitivity sweep is a fragment, so changing its view only reruns the sweep
+@st.fragment
+def show_sweep():
+    # Plotly and the sweep are only loaded once a sweep is shown
+    from sweep import get_sweep, progress_at, sweep_heatmap
+
+    goals = st.session_state.goals
+    index = st.selectbox("Goal to explore", range(len(goals)), format_func=lambda i: goals[i]['goal_name'], key='sweep_goal')
+    goal = goals[index]
+    sweep = get_sweep(goal, current_year)
+    view = st.radio("Show", ["Required monthly contribution", "Year the goal is reached", "Progress by target year"], horizontal=True, key='sweep_view')
+    if view == "Required monthly contribution":
+        fig = sweep_heatmap(sweep['required'], sweep['years'], sweep['rates'], "Target Year", "Interest Rate (%)", "$/month", ",.0f")
+    elif view == "Year the goal is reached":
+        fig = sweep_heatmap(sweep['reach_year'], sweep['contributions'].round(), sweep['rates'], "Monthly Contribution ($)", "Interest Rate (%)", "Year", ".0f")
+    else:
+        contributions = sweep['contributions']
+        column = st.select_slider(
+            "Monthly contribution ($)",
+            options=range(len(contributions)),
+            value=int(abs(contributions - goal['monthly_contribution']).argmin()),
+            format_func=lambda i: f"${contributions[i]:,.0f}",
+            key=f"sweep_contribution_{index}"
+        )
+        fig = sweep_heatmap(progress_at(sweep, column), sweep['years'], sweep['rates'], "Target Year", "Interest Rate (%)", "% of goal", ".0f")
+    st.plotly_chart(fig, use_container_width=True)
+    st.write(f"As entered, {goal['goal_name']} earns {goal['interest_rate']}% with ${int(round(goal['monthly_contribution']))}/month and is reached in {goal['target_year']}.")
 
 
 # Monthly Contribution Results Section
@@ -485,6 +397,8 @@ plot_timeline()
 if 'goals' in st.session_state and st.session_state.goals:
     total_contribution = sum(goal['monthly_contribution'] for goal in st.session_state.goals)
     remaining_for_current_you = monthly_income - total_contribution
+    # Shared with the Current You tool, which uses it as the expense limit when run in the same app
+    st.session_state.future_you_expense_limit = expense_limit(st.session_state.goals, monthly_income)
 
     # Display the Monthly Breakdown header
     st.markdown("<h4 class='section2-header'>Monthly Breakdown</h4>", unsafe_allow_html=True)
@@ -500,9 +414,74 @@ if 'goals' in st.session_state and st.session_state.goals:
 
     # Display the remaining money section
     st.markdown(f"""
-        <h5 style='color: black;'>2) This is how much money you have left each month after you put money aside for your goals. (Monthly expense limit - input this into the Current You tool): <span style='color: #D22B2B;'><b>${int(round(remaining_for_current_you))}</b></span></h5>
+        <h5 style='color: black;'>2) This is how much money you have left each month after you put money aside for your goals. (Monthly expense limit - the Current You tool uses this as your limit): <span style='color: #D22B2B;'><b>${int(round(remaining_for_current_you))}</b></span></h5>
     """, unsafe_allow_html=True)
 
+    # Optional Monte Carlo simulation of each goal's savings
+    if st.checkbox("Simulate market uncertainty for my goals (Monte Carlo)"):
+        volatility = st.number_input(
+            "Annual volatility of returns (%)",
+            min_value=0.0,
+            value=DEFAULT_VOLATILITY,
+            step=1.0,
+            format="%.1f"
+        )
+        goals = st.session_state.goals
+        balances = simulate_balances(
+            [goal['current_savings'] for goal in goals],
+            [goal['interest_rate'] for goal in goals],
+            [goal['target_year'] - current_year for goal in goals],
+            [goal['monthly_contribution'] for goal in goals],
+            volatility=volatility,
+            seed=0
+        )
+        summary = summarize_balances(balances)
+        probability = goal_success_probability(balances, [goal['goal_amount'] for goal in goals])
+        st.markdown("<h4 class='section2-header'>Chance of Reaching Each Goal</h4>", unsafe_allow_html=True)
+        st.dataframe({
+            'Goal': [goal['goal_name'] for goal in goals],
+            'Target Year': [goal['target_year'] for goal in goals],
+            'Pessimistic (P10) ($)': summary['p10'].round(),
+            'Median (P50) ($)': summary['p50'].round(),
+            'Optimistic (P90) ($)': summary['p90'].round(),
+            'Probability (%)': (probability * 100).round(1),
+        }, hide_index=True)
+
+    # Optional plan for when the goals need more than can be put aside each month
+    if st.checkbox("Plan my goals with a limited monthly budget"):
+        budget = st.number_input(
+            "How much can you put towards your goals each month? ($)",
+            min_value=0.0,
+            value=float(max(int(round(total_contribution)), 0)),
+            step=50.0,
+            key='goal_budget'
+        )
+        plan = plan_goals(st.session_state.goals, budget, current_year)
+        on_time = sum(1 for row in plan if row['status'] == ON_TIME)
+        st.markdown(f"<h4 class='section2-header'>Funding Plan: {on_time} of {len(plan)} goals on time</h4>", unsafe_allow_html=True)
+        st.dataframe({
+            'Goal': [row['name'] for row in plan],
+            'Target Year': [row['target_year'] for row in plan],
+            'Needed ($/month)': [None if row['required'] is None else round(row['required']) for row in plan],
+            'Planned Now ($/month)': [round(row['contribution']) for row in plan],
+            'Reached In': [row['reached_year'] for row in plan],
+            'Status': [plan_status(row) for row in plan],
+        }, hide_index=True)
+        st.write("Goals are funded cheapest first; money freed once a goal is reached goes to the goals still saving, so late goals may get more later than they do now.")
+
+    # Sensitivity sweep over interest rates, target years and contributions
+    if st.checkbox("Explore how a goal reacts to other interest rates, target years and contributions"):
+        show_sweep()
+
 
 else:
+    # Without goals there is no limit for the Current You tool to take
+    st.session_state.pop('future_you_expense_limit', None)
     st.markdown("<h4>No goals have been added yet.</h4>", unsafe_allow_html=True)
+
+lap('breakdown')
+
+# Drop derived data if this session holds more than its derived-data budget
+enforce_budget()
+lap('session_budget')
+finish_rerun()
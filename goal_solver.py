@@ -0,0 +1,186 @@
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# Goal math shared by the Future You tool. Both directions are solved for whole arrays of goals:
+#   target year -> required monthly contribution
+#   monthly contribution -> months until the goal is reached
+
+MAX_MONTHS = 12 * 100  # Goals further away than 100 years are treated as unreachable
+FALLBACK_ITERATIONS = 60
+SCALAR_CACHE_SIZE = 4096  # Single-goal answers are shared by every session in the process
+
+# Status of each solved goal
+OK = 'ok'
+ALREADY_FUNDED = 'already_funded'  # The initial contribution alone grows past the goal amount
+PAST_TARGET = 'past_target'  # The target year is not after the current year
+UNREACHABLE = 'unreachable'  # The contribution never reaches the goal within MAX_MONTHS
+
+GoalSolution = namedtuple('GoalSolution', ['values', 'status'])
+
+
+# Function to compute the value of savings plus monthly contributions after a (possibly fractional) number of months
+def _future_value(current_savings, monthly_rates, monthly_contributions, months):
+    zero_rate = monthly_rates == 0
+    safe_rates = np.where(zero_rate, 1.0, monthly_rates)
+    growth_minus_one = np.expm1(months * np.log1p(monthly_rates))
+    annuity = np.where(zero_rate, months, growth_minus_one / safe_rates)
+    return current_savings * (1 + growth_minus_one) + monthly_contributions * annuity
+
+
+# Function to find months to goal by bisection with Newton steps for goals the closed form can't handle
+def _bracketed_months(goal_amounts, current_savings, monthly_rates, monthly_contributions, max_months):
+    low = np.zeros(goal_amounts.shape)
+    high = np.full(goal_amounts.shape, float(max_months))
+    months = high / 2
+    step = 1e-6
+    for _ in range(FALLBACK_ITERATIONS):
+        value = _future_value(current_savings, monthly_rates, monthly_contributions, months) - goal_amounts
+        low = np.where(value < 0, months, low)
+        high = np.where(value >= 0, months, high)
+
+        # Take the Newton step when it stays inside the bracket, otherwise bisect
+        slope = (_future_value(current_savings, monthly_rates, monthly_contributions, months + step) - goal_amounts - value) / step
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = months - value / slope
+        inside = np.isfinite(newton) & (newton > low) & (newton < high)
+        months = np.where(inside, newton, (low + high) / 2)
+    return high
+
+
+# Function to solve the monthly contribution needed to reach each goal in the given number of months
+def solve_monthly_contributions(goal_amounts, current_savings, annual_rates, months):
+    goal_amounts, current_savings, annual_rates, months = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(goal_amounts, dtype=float)),
+        np.asarray(current_savings, dtype=float),
+        np.asarray(annual_rates, dtype=float),
+        np.asarray(months, dtype=float),
+    )
+    monthly_rates = annual_rates / 100 / 12
+    growth_minus_one = np.expm1(months * np.log1p(monthly_rates))
+    shortfall = goal_amounts - current_savings * (1 + growth_minus_one)
+
+    zero_rate = monthly_rates == 0
+    safe_rates = np.where(zero_rate, 1.0, monthly_rates)
+    annuity = np.where(zero_rate, months, growth_minus_one / safe_rates)
+
+    past_target = months <= 0
+    funded = ~past_target & (shortfall <= 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        contributions = np.where(past_target, np.nan, np.where(funded, 0.0, shortfall / annuity))
+
+    status = np.full(goal_amounts.shape, OK, dtype=object)
+    status[funded] = ALREADY_FUNDED
+    status[past_target] = PAST_TARGET
+    return GoalSolution(contributions, status)
+
+
+# Function to solve how many months each goal takes with a fixed monthly contribution
+def solve_months_to_goal(goal_amounts, current_savings, annual_rates, monthly_contributions, max_months=MAX_MONTHS):
+    goal_amounts, current_savings, annual_rates, monthly_contributions = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(goal_amounts, dtype=float)),
+        np.asarray(current_savings, dtype=float),
+        np.asarray(annual_rates, dtype=float),
+        np.asarray(monthly_contributions, dtype=float),
+    )
+    monthly_rates = annual_rates / 100 / 12
+    zero_rate = monthly_rates == 0
+    safe_rates = np.where(zero_rate, 1.0, monthly_rates)
+
+    # Closed form: goal = savings * g + contribution * (g - 1) / r with g = (1 + r) ** months,
+    # rearranged so log1p keeps precision for very small rates
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio_minus_one = (goal_amounts - current_savings) * safe_rates / (current_savings * safe_rates + monthly_contributions)
+        months = np.where(
+            zero_rate,
+            (goal_amounts - current_savings) / monthly_contributions,
+            np.log1p(ratio_minus_one) / np.log1p(safe_rates),
+        )
+
+    funded = current_savings >= goal_amounts
+    months = np.where(funded, 0.0, months)
+
+    # Check the closed form against the forward formula and fall back where it is not valid
+    with np.errstate(over='ignore', invalid='ignore'):
+        check = _future_value(current_savings, monthly_rates, monthly_contributions, np.where(np.isfinite(months), months, 0.0))
+    valid = funded | (np.isfinite(months) & (months >= 0) & np.isclose(check, goal_amounts, rtol=1e-6, atol=1e-6))
+    reachable = _future_value(current_savings, monthly_rates, monthly_contributions, np.full(months.shape, float(max_months))) >= goal_amounts
+    needs_fallback = ~valid & reachable
+    if needs_fallback.any():
+        months[needs_fallback] = _bracketed_months(
+            goal_amounts[needs_fallback],
+            current_savings[needs_fallback],
+            monthly_rates[needs_fallback],
+            monthly_contributions[needs_fallback],
+            max_months,
+        )
+
+    unreachable = ~funded & (~reachable | (months > max_months))
+    months = np.where(unreachable, np.nan, months)
+
+    status = np.full(goal_amounts.shape, OK, dtype=object)
+    status[funded] = ALREADY_FUNDED
+    status[unreachable] = UNREACHABLE
+    return GoalSolution(months, status)
+
+
+# Function to solve a single goal's monthly contribution, returning (contribution, status)
+@lru_cache(maxsize=SCALAR_CACHE_SIZE)
+def required_monthly_contribution(goal_amount, current_savings, interest_rate, months):
+    solution = solve_monthly_contributions(goal_amount, current_savings, interest_rate, months)
+    return float(solution.values[0]), solution.status[0]
+
+
+# Function to solve a single goal's months to goal, returning (months, status)
+@lru_cache(maxsize=SCALAR_CACHE_SIZE)
+def months_to_goal(goal_amount, current_savings, interest_rate, monthly_contribution):
+    solution = solve_months_to_goal(goal_amount, current_savings, interest_rate, monthly_contribution)
+    return float(solution.values[0]), solution.status[0]
+
+
+# Function to turn a number of months into the calendar year the goal is reached (at least next year)
+def target_year_from_months(current_year, months):
+    return current_year + max(1, int(math.ceil(round(months, 6) / 12)))
+
+
+# Function to work out the monthly expense limit the goals leave for the Current You tool: the income less the
+# goals' monthly contributions, in whole dollars and never below zero. None when there are no goals.
+def expense_limit(goals, monthly_income):
+    if not goals:
+        return None
+    return float(max(int(round(monthly_income - sum(goal['monthly_contribution'] for goal in goals))), 0))
+
+
+# Function to re-solve every goal after an input such as the interest rate changes.
+# "Target Year" goals get a new monthly contribution and "Monthly Contribution" goals get a new target year.
+def solve_goals(goals, current_year):
+    if not goals:
+        return [], []
+
+    by_year = np.array([goal['goal_type'] == 'Target Year' for goal in goals])
+    goal_amounts = np.array([goal['goal_amount'] for goal in goals], dtype=float)
+    current_savings = np.array([goal['current_savings'] for goal in goals], dtype=float)
+    interest_rates = np.array([goal['interest_rate'] for goal in goals], dtype=float)
+    months = np.array([12 * (goal['target_year'] - current_year) for goal in goals], dtype=float)
+    contributions = np.array([goal['monthly_contribution'] or 0 for goal in goals], dtype=float)
+
+    contribution_solution = solve_monthly_contributions(goal_amounts, current_savings, interest_rates, months)
+    months_solution = solve_months_to_goal(goal_amounts, current_savings, interest_rates, contributions)
+
+    solved_goals = []
+    statuses = []
+    for index, goal in enumerate(goals):
+        solved_goal = dict(goal)
+        if by_year[index]:
+            status = contribution_solution.status[index]
+            if status != PAST_TARGET:
+                solved_goal['monthly_contribution'] = int(round(contribution_solution.values[index]))
+        else:
+            status = months_solution.status[index]
+            if status != UNREACHABLE:
+                solved_goal['target_year'] = target_year_from_months(current_year, months_solution.values[index])
+        solved_goals.append(solved_goal)
+        statuses.append(status)
+    return solved_goals, statuses
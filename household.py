@@ -0,0 +1,251 @@
+from datetime import date
+
+import numpy as np
+
+from projections import build_projection_table, balances_in_year
+from ledger import AccountLedger, DebtLedger, GoalLedger, account_names
+from debts import MINIMUM_PAYMENTS, AVALANCHE, compare_strategies
+from goal_solver import solve_goals
+from allocation import allocate_funds, plan_rows
+
+# Headless household math shared by the apps and the batch CLI: remaining funds, projection tables,
+# goal progress and a one-row summary of a whole household. Nothing here imports Streamlit.
+#
+# A household file is a JSON object shaped like the apps' inputs:
+#
+#   {"id": "smith", "selected_year": 2055,
+#    "partner_1": {"paycheck": 6000, "total_expenses": 2500,
+#                  "accounts": [{"name": "Savings", "type": "Savings", "rate": 4.5, "balance": 12000}],
+#                  "debts": [{"name": "Car", "amount": 15000, "rate": 6.0, "payment": 400}],
+#                  "goals": [{"name": "House", "cost": 60000, "target_year": 2030, "account": "Savings"}]},
+#    "partner_2": {...},
+#    "joint": {"income": 500, "expenses": 1500, "debt_payments": 0, "accounts": [...], "goals": [...]},
+#    "future_you": {"monthly_income": 8000, "goals": [<Future You goal dicts>]}}
+#
+# Every part is optional.
+
+PARTNERS = ('partner_1', 'partner_2')
+DEFAULT_SELECTED_YEAR = 2055
+
+
+# Function to compute the money left each month after expenses and debt payments (never negative)
+def remaining_funds(income, expenses, debt_payments):
+    remaining = income - expenses - debt_payments
+    return remaining if remaining > 0 else 0
+
+
+# Function to build the (account x year) projection table covering the selected year and every goal's target year
+def projection_table(accounts, goals, selected_year, start_year=None):
+    start_year = date.today().year if start_year is None else start_year
+    horizon_year = max([selected_year] + goals.column('target_year').tolist())
+    years, balances = build_projection_table(accounts.column('balance'), accounts.column('rate'), start_year, horizon_year)
+    return {
+        'account_index': {name: row for row, name in enumerate(accounts.names)},
+        'years': years,
+        'balances': balances,
+    }
+
+
+# Function to link each goal to the accounts it draws from (a goals x accounts mask). account_index maps
+# the section's account names to their columns; a goal that names no account draws on all of them.
+def goal_links(goals, account_index, width=None):
+    width = len(account_index) if width is None else width
+    links = np.zeros((len(goals), width), dtype=bool)
+    section_columns = list(account_index.values())
+    for row, account in enumerate(goals.column('account')):
+        names = account_names(account)
+        links[row, [account_index[name] for name in names if name in account_index] if names else section_columns] = True
+    return links
+
+
+# Function to share out each account among the goals that draw on it, in proportion to their costs.
+# A goal with several accounts spreads its cost evenly over them before the shares are taken.
+def goal_shares(costs, links):
+    costs = np.asarray(costs, dtype=float)
+    claims = np.where(links, (costs / np.maximum(links.sum(axis=1), 1))[:, None], 0.0)
+    totals = claims.sum(axis=0)
+    return np.divide(claims, totals, out=np.zeros_like(claims), where=totals > 0)
+
+
+# Function to fund every goal from its shares of its accounts' projected balances in the goal's target year, in one pass
+def goal_funding(costs, target_years, links, years, balances):
+    costs = np.asarray(costs, dtype=float)
+    shares = goal_shares(costs, links)
+    columns = np.clip(np.asarray(target_years, dtype=int) - years[0], 0, len(years) - 1)
+    funds = np.einsum('ga,ag->g', shares, balances[:, columns])
+    # A goal that costs nothing shows no progress, as before
+    progress = np.minimum(np.divide(funds, costs, out=np.zeros_like(funds), where=costs > 0), 1)
+    shortfall = np.maximum(costs - funds, 0)
+    return funds, progress, shortfall
+
+
+# Function to turn the funding arrays into one row per goal; goals with none of their accounts have no progress
+def funding_rows(goals, links, funds, progress, shortfall):
+    rows = []
+    linked = links.any(axis=1).tolist()
+    for goal, has_account, goal_funds, goal_fraction, goal_shortfall in zip(goals, linked, funds.tolist(), progress.tolist(), shortfall.tolist()):
+        rows.append({
+            "name": goal.name,
+            "cost": goal.cost,
+            "target_year": goal.target_year,
+            "account": ", ".join(account_names(goal.account)) or None,
+            "funds": goal_funds if has_account else None,
+            "shortfall": goal_shortfall if has_account else None,
+            "progress": goal_fraction if has_account else None,
+        })
+    return rows
+
+
+# Function to compute progress toward a section's goals from its projection table
+def goal_progress(goals, table):
+    links = goal_links(goals, table['account_index'], len(table['balances']))
+    funds, progress, shortfall = goal_funding(goals.column('cost'), goals.column('target_year'), links, table['years'], table['balances'])
+    return funding_rows(goals, links, funds, progress, shortfall)
+
+
+# Function to compute progress toward the goals of several sections (partners and joint) at once.
+# sections maps a section name to its (accounts, goals); every account is projected in one table and
+# goals only draw on accounts of their own section. Returns {section: goal rows}.
+def household_goal_progress(sections, selected_year, start_year=None):
+    start_year = date.today().year if start_year is None else start_year
+    horizon_year = selected_year
+    account_indexes = {}
+    offset = 0
+    for section, (accounts, goals) in sections.items():
+        account_indexes[section] = {name: offset + row for row, name in enumerate(accounts.names)}
+        offset += len(accounts)
+        horizon_year = max([horizon_year] + goals.column('target_year').tolist())
+
+    all_accounts = [accounts for accounts, goals in sections.values()]
+    years, balances = build_projection_table(
+        np.concatenate([accounts.column('balance') for accounts in all_accounts]),
+        np.concatenate([accounts.column('rate') for accounts in all_accounts]),
+        start_year,
+        horizon_year,
+    )
+    links = np.concatenate([goal_links(goals, account_indexes[section], offset) for section, (accounts, goals) in sections.items()])
+    costs = np.concatenate([goals.column('cost') for accounts, goals in sections.values()])
+    target_years = np.concatenate([goals.column('target_year') for accounts, goals in sections.values()])
+    funds, progress, shortfall = goal_funding(costs, target_years, links, years, balances)
+
+    rows = {}
+    start = 0
+    for section, (accounts, goals) in sections.items():
+        end = start + len(goals)
+        rows[section] = funding_rows(goals, links[start:end], funds[start:end], progress[start:end], shortfall[start:end])
+        start = end
+    return rows
+
+
+# Function to plan a section's remaining monthly funds across the shortfalls of its goals. Contributions
+# earn the average rate of each goal's accounts; goals without accounts earn nothing.
+def funding_plan(accounts, goals, table, available, start_year=None):
+    start_year = date.today().year if start_year is None else start_year
+    links = goal_links(goals, table['account_index'], len(table['balances']))
+    costs = goals.column('cost')
+    funds, progress, shortfall = goal_funding(costs, goals.column('target_year'), links, table['years'], table['balances'])
+    shares = goal_shares(costs, links)
+    share_totals = shares.sum(axis=1)
+    rates = np.divide(shares @ accounts.column('rate'), share_totals, out=np.zeros(len(goals)), where=share_totals > 0)
+    amounts = np.where(links.any(axis=1), shortfall, costs)
+    allocation = allocate_funds(amounts, 0.0, rates, 12 * (goals.column('target_year') - start_year), available)
+    return plan_rows(goals.names, goals.column('target_year'), allocation, start_year)
+
+
+# Function to summarize one section (a partner or the joint finances) of a household.
+# Pass progress_rows when the goals were already scored with household_goal_progress.
+def score_section(accounts, debts, goals, funds, selected_year, start_year, progress_rows=None):
+    table = projection_table(accounts, goals, selected_year, start_year)
+    if progress_rows is None:
+        progress_rows = goal_progress(goals, table)
+    progress = [row['progress'] for row in progress_rows if row['progress'] is not None]
+    summary = {
+        'remaining_funds': funds,
+        'balance_today': float(accounts.column('balance').sum()),
+        'projected_balance': float(balances_in_year(table['years'], table['balances'], selected_year).sum()) if accounts else 0.0,
+        'goals': len(goals),
+        'goals_funded': sum(1 for value in progress if value >= 1),
+        'goals_missing_account': len(progress_rows) - len(progress),
+        'mean_goal_progress': float(np.mean(progress)) if progress else np.nan,
+        'total_debt': float(debts.column('amount').sum()),
+        'debt_free_months': np.nan,
+        'avalanche_debt_free_months': np.nan,
+        'avalanche_interest_saved': 0.0,
+    }
+    if debts:
+        results = compare_strategies(debts.column('amount'), debts.column('rate'), debts.column('payment'), funds)
+        minimum = results[MINIMUM_PAYMENTS]
+        avalanche = results[AVALANCHE]
+        # A section is debt free once its last debt is paid off
+        summary['debt_free_months'] = np.nan if np.isnan(minimum['payoff_months']).any() else float(minimum['payoff_months'].max())
+        summary['avalanche_debt_free_months'] = np.nan if np.isnan(avalanche['payoff_months']).any() else float(avalanche['payoff_months'].max())
+        summary['avalanche_interest_saved'] = float(minimum['total_interest'].sum() - avalanche['total_interest'].sum())
+    return summary, progress_rows
+
+
+# Function to score a whole household, returning (summary row, goal rows)
+def score_household(household, start_year=None):
+    start_year = date.today().year if start_year is None else start_year
+    household_id = household.get('id')
+    selected_year = household.get('selected_year', DEFAULT_SELECTED_YEAR)
+    summary = {'household': household_id, 'selected_year': selected_year}
+    goal_rows = []
+
+    sections = {}
+    for partner in PARTNERS:
+        responses = household.get(partner, {})
+        debts = DebtLedger.from_records(responses.get('debts', []))
+        funds = remaining_funds(responses.get('paycheck', 0.0), responses.get('total_expenses', 0.0), float(debts.column('payment').sum()))
+        sections[partner] = (AccountLedger.from_records(responses.get('accounts', [])), debts, GoalLedger.from_records(responses.get('goals', [])), funds)
+    joint = household.get('joint', {})
+    sections['joint'] = (
+        AccountLedger.from_records(joint.get('accounts', [])),
+        DebtLedger(),
+        GoalLedger.from_records(joint.get('goals', [])),
+        remaining_funds(joint.get('income', 0.0), joint.get('expenses', 0.0), joint.get('debt_payments', 0.0)),
+    )
+
+    # Goals of all sections are scored together in one pass
+    section_progress = household_goal_progress({section: (accounts, goals) for section, (accounts, debts, goals, funds) in sections.items()}, selected_year, start_year)
+    for section, (accounts, debts, goals, funds) in sections.items():
+        section_summary, progress_rows = score_section(accounts, debts, goals, funds, selected_year, start_year, section_progress[section])
+        summary.update({f'{section}_{field}': value for field, value in section_summary.items()})
+        for row in progress_rows:
+            goal_rows.append({
+                'household': household_id,
+                'section': section,
+                'goal': row['name'],
+                'account': row['account'],
+                'cost': row['cost'],
+                'target_year': row['target_year'],
+                'funds': np.nan if row['funds'] is None else row['funds'],
+                'shortfall': np.nan if row['shortfall'] is None else row['shortfall'],
+                'progress': np.nan if row['progress'] is None else row['progress'],
+                'monthly_contribution': np.nan,
+                'status': 'missing_account' if row['progress'] is None else 'projected',
+            })
+
+    # Future You goals are re-solved for their contribution or target year
+    future_you = household.get('future_you')
+    summary.update({'future_you_goals': 0, 'future_you_contributions': np.nan, 'future_you_expense_limit': np.nan})
+    if future_you:
+        solved_goals, statuses = solve_goals(future_you.get('goals', []), start_year)
+        total_contribution = sum(goal['monthly_contribution'] or 0 for goal in solved_goals)
+        summary['future_you_goals'] = len(solved_goals)
+        summary['future_you_contributions'] = total_contribution
+        summary['future_you_expense_limit'] = future_you.get('monthly_income', 0.0) - total_contribution
+        for goal, status in zip(solved_goals, statuses):
+            goal_rows.append({
+                'household': household_id,
+                'section': 'future_you',
+                'goal': goal['goal_name'],
+                'account': None,
+                'cost': goal['goal_amount'],
+                'target_year': goal['target_year'],
+                'funds': np.nan,
+                'shortfall': np.nan,
+                'progress': np.nan,
+                'monthly_contribution': goal['monthly_contribution'],
+                'status': status,
+            })
+    return summary, goal_rows
@@ -0,0 +1,220 @@
+import numpy as np
+
+# Column-oriented storage for the accounts, debts and goals entered in the Couples tool.
+# Numeric columns live in NumPy arrays that grow by doubling, text columns in plain lists,
+# and a name index gives O(1) lookup. Iterating yields small __slots__ records.
+
+
+class Account:
+    __slots__ = ('name', 'type', 'rate', 'balance')
+
+    def __init__(self, name, type, rate, balance):
+        self.name = name
+        self.type = type
+        self.rate = rate
+        self.balance = balance
+
+
+class Debt:
+    __slots__ = ('name', 'amount', 'rate', 'payment')
+
+    def __init__(self, name, amount, rate, payment):
+        self.name = name
+        self.amount = amount
+        self.rate = rate
+        self.payment = payment
+
+
+class Goal:
+    __slots__ = ('name', 'cost', 'target_year', 'account')
+
+    def __init__(self, name, cost, target_year, account=None):
+        self.name = name
+        self.cost = cost
+        self.target_year = target_year
+        self.account = account
+
+
+# Function to list the accounts a goal draws from. A goal's account is one name, a list of names,
+# or None when the goal draws on every account of its section.
+def account_names(account):
+    if account is None or account == '':
+        return []
+    if isinstance(account, str):
+        return [account]
+    return list(account)
+
+
+# Function to store a list of account names as a goal's account (the inverse of account_names)
+def goal_account(names):
+    names = list(names)
+    if not names:
+        return None
+    return names[0] if len(names) == 1 else names
+
+
+class Ledger:
+    # Subclasses list their columns as (field, label, dtype); a dtype of None marks a text column
+    columns = ()
+    record_type = None
+
+    def __init__(self, rows=()):
+        self._size = 0
+        self._text = {}
+        self._numeric = {}
+        for field, label, dtype in self.columns:
+            if dtype is None:
+                self._text[field] = []
+            else:
+                self._numeric[field] = np.empty(4, dtype=dtype)
+        self._index = {}
+        self.version = 0
+        self.extend(rows)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        for row in range(self._size):
+            yield self.row(row)
+
+    def __getitem__(self, name):
+        return self.row(self._index[name])
+
+    # Function to build the record stored at a row position
+    def row(self, row):
+        values = []
+        for field, label, dtype in self.columns:
+            if dtype is None:
+                values.append(self._text[field][row])
+            else:
+                values.append(self._numeric[field][row].item())
+        return self.record_type(*values)
+
+    # Function to find the row position of a name
+    def position(self, name):
+        return self._index[name]
+
+    @property
+    def names(self):
+        return list(self._text['name'])
+
+    # Function to return a read-only view of a numeric column, or a tuple of a text column's values
+    def column(self, field):
+        if field in self._text:
+            return tuple(self._text[field])
+        view = self._numeric[field][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _grow(self, size):
+        for field, values in self._numeric.items():
+            if size > len(values):
+                grown = np.empty(max(size, 2 * len(values)), dtype=values.dtype)
+                grown[:self._size] = values[:self._size]
+                self._numeric[field] = grown
+
+    # Function to add one row, given its values in column order
+    def append(self, *values):
+        self.extend([values])
+
+    # Function to add many rows with a single index update
+    def extend(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        names = [row[0] for row in rows]
+        duplicates = [name for name in names if name in self._index]
+        if duplicates or len(set(names)) != len(names):
+            raise ValueError(f"Duplicate name: {(duplicates or names)[0]}")
+
+        start = self._size
+        self._grow(start + len(rows))
+        for column, (field, label, dtype) in enumerate(self.columns):
+            values = [row[column] if column < len(row) else None for row in rows]
+            if dtype is None:
+                self._text[field].extend(values)
+            else:
+                self._numeric[field][start:start + len(rows)] = values
+        for offset, name in enumerate(names):
+            self._index[name] = start + offset
+        self._size += len(rows)
+        self.version += 1
+
+    # Function to add many rows given as dicts keyed by field name
+    def extend_records(self, records):
+        self.extend([tuple(record.get(field) for field, label, dtype in self.columns) for record in records])
+
+    # Function to remove a row by name, keeping the order of the remaining rows
+    def remove(self, name):
+        row = self._index.pop(name)
+        for values in self._text.values():
+            del values[row]
+        for values in self._numeric.values():
+            values[row:self._size - 1] = values[row + 1:self._size]
+        self._size -= 1
+        for later_name in self._text['name'][row:]:
+            self._index[later_name] -= 1
+        self.version += 1
+
+    # Function to return one row as a plain dict, e.g. for saving or exporting
+    def to_record(self, name):
+        record = self[name]
+        return {field: getattr(record, field) for field, label, dtype in self.columns}
+
+    # Function to return all rows as plain dicts
+    def to_records(self):
+        return [self.to_record(name) for name in self._text['name']]
+
+    @classmethod
+    def from_records(cls, records):
+        ledger = cls()
+        ledger.extend_records(records)
+        return ledger
+
+    # Function to view the ledger as a DataFrame without copying the numeric columns.
+    # Pass copy=True for frames that outlive the ledger's current contents, e.g. in a shared cache.
+    def to_frame(self, exclude=(), copy=False):
+        import pandas as pd  # Only needed once results are shown, so it isn't loaded with the app
+        data = {label: self.column(field) for field, label, dtype in self.columns if field not in exclude}
+        return pd.DataFrame(data, copy=copy)
+
+    # Only the filled part of each column is pickled, so equal ledgers pickle (and fingerprint) the same
+    def __getstate__(self):
+        return {'records': [tuple(getattr(record, field) for field, label, dtype in self.columns) for record in self]}
+
+    def __setstate__(self, state):
+        self.__init__(state['records'])
+
+
+class AccountLedger(Ledger):
+    columns = (
+        ('name', 'Account Name', None),
+        ('type', 'Type', None),
+        ('rate', 'Interest Rate (%)', np.float64),
+        ('balance', 'Balance ($)', np.float64),
+    )
+    record_type = Account
+
+
+class DebtLedger(Ledger):
+    columns = (
+        ('name', 'Debt Name', None),
+        ('amount', 'Amount ($)', np.float64),
+        ('rate', 'Interest Rate (%)', np.float64),
+        ('payment', 'Monthly Payment ($)', np.float64),
+    )
+    record_type = Debt
+
+
+class GoalLedger(Ledger):
+    columns = (
+        ('name', 'Goal Name', None),
+        ('cost', 'Cost ($)', np.float64),
+        ('target_year', 'Target Year', np.int64),
+        ('account', 'Account', None),
+    )
+    record_type = Goal
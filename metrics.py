@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+
+# Per-rerun instrumentation for the apps. Turned on by pointing COUPLES_TOOL_METRICS at a file:
+#   COUPLES_TOOL_METRICS=metrics.jsonl  one JSON line per rerun with its spans and counters
+#   COUPLES_TOOL_METRICS=metrics.prom   Prometheus text with running totals, rewritten after each rerun
+# When the variable is not set every call returns straight away.
+#
+# A rerun is timed with start_rerun(app), lap(name) at the end of each section of the script,
+# span(name) around function calls, count(name) for events, and finish_rerun() at the end. Reruns
+# cut short by st.stop() or st.rerun() are written out (marked incomplete) when the next one starts.
+
+METRICS_PATH = os.environ.get('COUPLES_TOOL_METRICS', '')
+ENABLED = bool(METRICS_PATH)
+PROMETHEUS = METRICS_PATH.endswith('.prom')
+
+_local = threading.local()  # Each session reruns in its own thread
+_lock = threading.Lock()
+_span_totals = {}  # (app, span) -> [seconds, count]
+_counter_totals = {}  # (app, counter) -> value
+_reruns = {}  # app -> reruns
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, rerun, name):
+        self.rerun = rerun
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        spans = self.rerun['spans']
+        spans[self.name] = spans.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+def _current():
+    return getattr(_local, 'rerun', None)
+
+
+# Function to start timing a rerun of an app. A rerun that ended early (st.stop(), st.rerun() or an
+# error) never reached finish_rerun(), so it is kept in the session and exported when the next one starts.
+def start_rerun(app):
+    if not ENABLED:
+        return
+    import streamlit as st
+    unfinished = st.session_state.get('metrics_rerun')
+    if unfinished is not None:
+        _export(unfinished, complete=False)
+    now = time.perf_counter()
+    _local.rerun = {'app': app, 'start': now, 'last': now, 'spans': {}, 'counters': {}}
+    st.session_state.metrics_rerun = _local.rerun
+
+
+# Function to time the section of the script since the last lap (or the start of the rerun)
+def lap(name):
+    rerun = _current() if ENABLED else None
+    if rerun is None:
+        return
+    now = time.perf_counter()
+    rerun['spans'][name] = rerun['spans'].get(name, 0.0) + now - rerun['last']
+    rerun['last'] = now
+
+
+# Function to time a block: with span('dashboard'): ...
+def span(name):
+    rerun = _current() if ENABLED else None
+    if rerun is None:
+        return _NULL_SPAN
+    return _Span(rerun, name)
+
+
+# Function to add to a counter of the current rerun
+def count(name, value=1):
+    rerun = _current() if ENABLED else None
+    if rerun is None:
+        return
+    rerun['counters'][name] = rerun['counters'].get(name, 0) + value
+
+
+# Function to end the rerun and export its measurements
+def finish_rerun():
+    rerun = _current() if ENABLED else None
+    if rerun is None:
+        return
+    import streamlit as st
+    _local.rerun = None
+    st.session_state.pop('metrics_rerun', None)
+    rerun['last'] = time.perf_counter()
+    _export(rerun, complete=True)
+
+
+# Function to add a rerun to the totals and write it out; an incomplete rerun is timed up to its last lap
+def _export(rerun, complete):
+    rerun['spans']['total'] = rerun['last'] - rerun['start']
+    app = rerun['app']
+    with _lock:
+        _reruns[app] = _reruns.get(app, 0) + 1
+        for name, seconds in rerun['spans'].items():
+            total = _span_totals.setdefault((app, name), [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+        for name, value in rerun['counters'].items():
+            _counter_totals[(app, name)] = _counter_totals.get((app, name), 0) + value
+        if PROMETHEUS:
+            write_prometheus(METRICS_PATH)
+        else:
+            with open(METRICS_PATH, 'a') as file:
+                file.write(json.dumps({'time': time.time(), 'app': app, 'complete': complete, 'spans': rerun['spans'], 'counters': rerun['counters']}) + '\n')
+
+
+# Function to write the running totals in Prometheus text format, replacing the file in one step
+def write_prometheus(path):
+    lines = [
+        '# HELP couples_tool_reruns_total Reruns of each app.',
+        '# TYPE couples_tool_reruns_total counter',
+    ]
+    lines += [f'couples_tool_reruns_total{{app="{app}"}} {count}' for app, count in sorted(_reruns.items())]
+    lines += [
+        '# HELP couples_tool_span_seconds Time spent in each section of a rerun.',
+        '# TYPE couples_tool_span_seconds summary',
+    ]
+    for (app, name), (seconds, calls) in sorted(_span_totals.items()):
+        lines.append(f'couples_tool_span_seconds_sum{{app="{app}",span="{name}"}} {seconds:.6f}')
+        lines.append(f'couples_tool_span_seconds_count{{app="{app}",span="{name}"}} {calls}')
+    lines += [
+        '# HELP couples_tool_events_total Cache hits and misses and other events.',
+        '# TYPE couples_tool_events_total counter',
+    ]
+    lines += [f'couples_tool_events_total{{app="{app}",event="{name}"}} {value}' for (app, name), value in sorted(_counter_totals.items())]
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+    os.replace(temporary, path)
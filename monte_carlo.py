@@ -0,0 +1,74 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Stochastic version of the projection engine. Instead of one fixed rate, every account or goal is
+# run along many random return paths at once so we can report a range of outcomes.
+
+DEFAULT_PATHS = 10000
+DEFAULT_VOLATILITY = 15.0  # Annual standard deviation of returns (%)
+PATHS_PER_CHUNK = 25000
+PROCESS_POOL_PATHS = 200000  # Above this many paths the chunks are spread over a process pool
+
+
+# Function to simulate one chunk of return paths; kept at module level so a process pool can pickle it
+def _simulate_chunk(principals, annual_rates, volatilities, years, monthly_contributions, n_paths, seed_sequence):
+    rng = np.random.default_rng(seed_sequence)
+    balances = np.broadcast_to(principals, (n_paths, principals.size)).copy()
+
+    for year in range(1, int(years.max(initial=0)) + 1):
+        # Draw one annual return per path and item, and compound it monthly with contributions
+        annual_returns = rng.normal(annual_rates, volatilities, size=balances.shape)
+        annual_returns = np.maximum(annual_returns, -0.95)
+        monthly_rates = np.expm1(np.log1p(annual_returns) / 12)
+        safe_rates = np.where(monthly_rates == 0, 1.0, monthly_rates)
+        annuity = np.where(monthly_rates == 0, 12.0, annual_returns / safe_rates)
+        grown = balances * (1 + annual_returns) + monthly_contributions * annuity
+
+        # Items whose horizon has already passed keep their final balance
+        balances = np.where(years >= year, grown, balances)
+    return balances
+
+
+# Function to simulate end balances for many accounts or goals; returns an array of shape (n_paths, n_items)
+def simulate_balances(principals, annual_rates, years, monthly_contributions=0.0, volatility=DEFAULT_VOLATILITY, n_paths=DEFAULT_PATHS, seed=None):
+    principals, annual_rates, years, monthly_contributions, volatility = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(principals, dtype=float)),
+        np.asarray(annual_rates, dtype=float),
+        np.asarray(years, dtype=float),
+        np.asarray(monthly_contributions, dtype=float),
+        np.asarray(volatility, dtype=float),
+    )
+    # Rates are nominal annual rates compounded monthly, like the deterministic projections
+    annual_rates = (1 + annual_rates / 100 / 12) ** 12 - 1
+    volatility = volatility / 100
+    years = np.round(years)
+
+    chunk_sizes = [PATHS_PER_CHUNK] * (n_paths // PATHS_PER_CHUNK)
+    if n_paths % PATHS_PER_CHUNK:
+        chunk_sizes.append(n_paths % PATHS_PER_CHUNK)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    chunk_args = [
+        (principals, annual_rates, volatility, years, monthly_contributions, size, seed_sequence)
+        for size, seed_sequence in zip(chunk_sizes, seed_sequences)
+    ]
+
+    if n_paths > PROCESS_POOL_PATHS:
+        with ProcessPoolExecutor() as executor:
+            chunks = list(executor.map(_simulate_chunk, *zip(*chunk_args)))
+    else:
+        chunks = [_simulate_chunk(*args) for args in chunk_args]
+
+    if not chunks:
+        return np.empty((0, principals.size))
+    return np.concatenate(chunks, axis=0)
+
+
+# Function to summarize simulated balances into P10/P50/P90 for each item
+def summarize_balances(balances):
+    p10, p50, p90 = np.percentile(balances, [10, 50, 90], axis=0)
+    return {'p10': p10, 'p50': p50, 'p90': p90}
+
+
+# Function to estimate the probability that each item reaches its target amount
+def goal_success_probability(balances, targets):
+    return (balances >= np.asarray(targets, dtype=float)).mean(axis=0)
@@ -0,0 +1,145 @@
+import json
+import os
+import sqlite3
+import threading
+
+# Local persistence for household state. Every mutation is appended to a SQLite journal instead of
+# rewriting the whole state, a session is restored with a single query (latest snapshot + newer
+# journal entries), and the journal is folded into a new snapshot in a background thread.
+#
+# The state is a flat JSON document: keys like "couples.responses_1.accounts" map to plain values.
+
+DEFAULT_PATH = os.environ.get('COUPLES_TOOL_DB', 'household_state.db')
+COMPACT_AFTER = 500  # Journal entries since the last snapshot before compacting
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    household TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    household TEXT NOT NULL,
+    op TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS journal_household ON journal (household, id);
+"""
+
+RESTORE_QUERY = """
+SELECT 0, last_id, NULL, NULL, state FROM snapshots WHERE household = :household
+UNION ALL
+SELECT 1, id, op, key, value FROM journal
+WHERE household = :household
+  AND id > COALESCE((SELECT last_id FROM snapshots WHERE household = :household), 0)
+ORDER BY 1, 2
+"""
+
+
+# Function to apply one journaled mutation to a state document
+def apply_op(state, op, key, value):
+    if op == 'set':
+        state[key] = value
+    elif op == 'append':
+        state.setdefault(key, []).append(value)
+    elif op == 'extend':
+        state.setdefault(key, []).extend(value)
+    elif op == 'put':
+        field, field_value = value
+        state.setdefault(key, {})[field] = field_value
+    elif op == 'delete':
+        container = state.get(key)
+        if isinstance(container, dict):
+            container.pop(value, None)
+        elif isinstance(container, list):
+            state[key] = [item for item in container if not (isinstance(item, dict) and item.get('name') == value)]
+    elif op == 'replace':
+        index, item = value
+        state[key][index] = item
+    elif op == 'pop':
+        state[key].pop(value)
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
+
+
+# Function to open a connection with the journal tables in place
+def connect(path):
+    connection = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class Journal:
+    def __init__(self, household, path=DEFAULT_PATH):
+        self.household = household
+        self.path = path
+        self._connection = connect(path)
+        self._lock = threading.Lock()
+        self._compacting = False
+        self._since_snapshot = 0
+
+    # Function to rebuild the household state from the latest snapshot and the journal written after it
+    def restore(self):
+        with self._lock:
+            rows = self._connection.execute(RESTORE_QUERY, {'household': self.household}).fetchall()
+        state = {}
+        for kind, row_id, op, key, value in rows:
+            if kind == 0:
+                state = json.loads(value)
+            else:
+                apply_op(state, op, key, json.loads(value))
+        self._since_snapshot = sum(1 for row in rows if row[0] == 1)
+        return state
+
+    # Function to journal one mutation
+    def record(self, op, key, value=None):
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO journal (household, op, key, value) VALUES (?, ?, ?, ?)",
+                (self.household, op, key, json.dumps(value)),
+            )
+            self._since_snapshot += 1
+            start_compaction = self._since_snapshot >= COMPACT_AFTER and not self._compacting
+            if start_compaction:
+                self._compacting = True
+        if start_compaction:
+            threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        finally:
+            self._compacting = False
+
+    # Function to fold the journal into a new snapshot and drop the journal entries it covers
+    def compact(self):
+        connection = connect(self.path)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute(RESTORE_QUERY, {'household': self.household}).fetchall()
+            journal_rows = [row for row in rows if row[0] == 1]
+            if not journal_rows:
+                connection.execute("COMMIT")
+                return
+            state = json.loads(rows[0][4]) if rows[0][0] == 0 else {}
+            for kind, row_id, op, key, value in journal_rows:
+                apply_op(state, op, key, json.loads(value))
+            last_id = journal_rows[-1][1]
+            connection.execute(
+                "INSERT OR REPLACE INTO snapshots (household, last_id, state) VALUES (?, ?, ?)",
+                (self.household, last_id, json.dumps(state)),
+            )
+            connection.execute("DELETE FROM journal WHERE household = ? AND id <= ?", (self.household, last_id))
+            connection.execute("COMMIT")
+            with self._lock:
+                self._since_snapshot = max(0, self._since_snapshot - len(journal_rows))
+        except Exception:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
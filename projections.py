@@ -0,0 +1,50 @@
+import numpy as np
+
+# Projection engine shared by the dashboards. Everything works on arrays so a whole
+# household can be projected in a single call instead of one account at a time.
+
+
+# Function to compute (1 + monthly_rate) ** months once per distinct (rate, months) pair
+def growth_factors(monthly_rates, months):
+    monthly_rates, months = np.broadcast_arrays(np.asarray(monthly_rates, dtype=float), np.asarray(months, dtype=float))
+    if monthly_rates.size == 0:
+        return np.ones(monthly_rates.shape)
+    pairs = np.stack([monthly_rates.ravel(), months.ravel()], axis=1)
+    unique_pairs, inverse = np.unique(pairs, axis=0, return_inverse=True)
+    unique_growth = (1 + unique_pairs[:, 0]) ** unique_pairs[:, 1]
+    return unique_growth[inverse.reshape(-1)].reshape(monthly_rates.shape)
+
+
+# Function to project the future value of many accounts considering principal and monthly contributions
+def project_future_values(principals, annual_rates, years, monthly_contributions=0.0):
+    principals, annual_rates, years, monthly_contributions = np.broadcast_arrays(
+        np.asarray(principals, dtype=float),
+        np.asarray(annual_rates, dtype=float),
+        np.asarray(years, dtype=float),
+        np.asarray(monthly_contributions, dtype=float),
+    )
+    monthly_rates = annual_rates / 100 / 12
+    months = years * 12
+    growth = growth_factors(monthly_rates, months)
+
+    # With no interest the contributions simply add up month after month
+    zero_rate = monthly_rates == 0
+    safe_rates = np.where(zero_rate, 1.0, monthly_rates)
+    annuity = np.where(zero_rate, months, (growth - 1) / safe_rates)
+    return principals * growth + monthly_contributions * annuity
+
+
+# Function to build a dense (account x year) table of balances from start_year through end_year
+def build_projection_table(principals, annual_rates, start_year, end_year, monthly_contributions=0.0):
+    years = np.arange(start_year, max(start_year, end_year) + 1)
+    principals = np.asarray(principals, dtype=float).reshape(-1, 1)
+    annual_rates = np.asarray(annual_rates, dtype=float).reshape(-1, 1)
+    monthly_contributions = np.broadcast_to(np.asarray(monthly_contributions, dtype=float), principals.shape[:1]).reshape(-1, 1)
+    balances = project_future_values(principals, annual_rates, (years - start_year)[None, :], monthly_contributions)
+    return years, balances
+
+
+# Function to read every account's balance in a given year out of a projection table
+def balances_in_year(years, balances, year):
+    column = int(np.clip(year - years[0], 0, len(years) - 1))
+    return balances[:, column]
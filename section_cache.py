@@ -0,0 +1,57 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from metrics import count
+
+# Small memo cache for dashboard sections. Each section is keyed by a fingerprint of its inputs,
+# so only the sections whose inputs changed are recomputed on a rerun. Section outputs are pure
+# functions of their inputs, so one cache is shared by every session in the server process:
+# memory grows with the number of distinct households, not with the number of open browsers.
+
+MAX_ENTRIES = 24
+SHARED_ENTRIES = int(os.environ.get('COUPLES_TOOL_SHARED_SECTIONS', 512))
+
+
+# Function to fingerprint a section's inputs so unchanged sections can be recognised
+def fingerprint(*values):
+    return hashlib.sha1(pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+class SectionCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # Sessions run in their own threads
+
+    # Function to return a section's cached outputs, computing them only when its inputs changed
+    def get_or_compute(self, section, key, compute):
+        cache_key = (section, key)
+        with self._lock:
+            if cache_key in self.entries:
+                self.hits += 1
+                count('section_cache_hits')
+                self.entries.move_to_end(cache_key)
+                return self.entries[cache_key]
+            self.misses += 1
+            count('section_cache_misses')
+
+        value = compute()
+        with self._lock:
+            self.entries[cache_key] = value
+            # Evict the least recently used sections once the cache is full
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
+# The process-wide cache of dashboard sections, shared by all sessions
+shared_sections = SectionCache(SHARED_ENTRIES)
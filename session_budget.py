@@ -0,0 +1,55 @@
+import os
+import pickle
+import sys
+import time
+
+import streamlit as st
+
+# Per-session memory budget for derived data (projection tables, figures: anything that can be rebuilt
+# from the inputs). This is a budget for that derived cache only, not a measure of the whole session:
+# inputs, uploads and widget values are never measured or evicted, since dropping them would lose the
+# user's work. Each derived value is registered with use_derived(), which measures it when it is first
+# registered or has changed; when a session's derived data goes over DERIVED_MEMORY_MB the least
+# recently used is dropped, and the total kept is left in st.session_state.derived_memory_bytes. Pure
+# results that every session can reuse belong in the process-wide caches (section_cache.shared_sections,
+# charts.chart_cache) instead of session state.
+
+DERIVED_MEMORY_MB = float(os.environ.get('COUPLES_TOOL_DERIVED_MB', 16))
+
+
+# Function to mark a session key as derived data that was just used, measuring it when it is new or changed
+def use_derived(key, changed=False):
+    st.session_state.setdefault('derived_last_used', {})[key] = time.monotonic()
+    sizes = st.session_state.setdefault('derived_sizes', {})
+    if changed or key not in sizes:
+        sizes[key] = measure(st.session_state[key]) if key in st.session_state else 0
+
+
+# Function to estimate the memory held by one value
+def measure(value):
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        # Connections, locks and the like can't be pickled; count their shallow size
+        return sys.getsizeof(value)
+
+
+# Function to evict derived data, least recently used first, until it fits the budget. Returns the
+# bytes of derived data kept.
+def enforce_budget(limit_mb=DERIVED_MEMORY_MB):
+    last_used = st.session_state.get('derived_last_used', {})
+    sizes = st.session_state.get('derived_sizes', {})
+    # Derived data can also be dropped elsewhere (e.g. when the inputs change)
+    for key in [key for key in sizes if key not in st.session_state]:
+        del sizes[key]
+        last_used.pop(key, None)
+    total = sum(sizes.values())
+    limit = limit_mb * 2 ** 20
+    for key in sorted(last_used, key=last_used.get):
+        if total <= limit:
+            break
+        total -= sizes.pop(key, 0)
+        st.session_state.pop(key, None)
+        del last_used[key]
+    st.session_state.derived_memory_bytes = total
+    return total
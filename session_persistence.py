@@ -0,0 +1,64 @@
+import uuid
+
+import streamlit as st
+
+from persistence import Journal
+
+# Streamlit glue for the persistence layer: each household is identified by a "household" query
+# parameter, so refreshing the page (or restarting the server) finds the same journal again.
+
+
+# Function to get this session's journal, creating a household id in the URL on the first visit
+def get_journal():
+    if 'journal' not in st.session_state:
+        household = st.query_params.get('household')
+        if not household:
+            household = uuid.uuid4().hex
+            st.query_params['household'] = household
+        st.session_state.journal = Journal(household)
+    return st.session_state.journal
+
+
+# Function to put back an app's saved widget values that Streamlit dropped, which happens to a page's
+# widgets while another page of the multipage app is shown
+def restore_widgets(namespace):
+    prefix = namespace + '.widget.'
+    for full_key, value in st.session_state.get('persisted_widgets', {}).items():
+        if full_key.startswith(prefix) and full_key[len(prefix):] not in st.session_state:
+            st.session_state[full_key[len(prefix):]] = value
+
+
+# Function to load one app's saved state the first time it runs in a session.
+# Returns the app's keys with the namespace stripped, or None when the state was already restored.
+def restore_state(namespace):
+    restored_key = f'{namespace}_restored'
+    if st.session_state.get(restored_key):
+        restore_widgets(namespace)
+        return None
+    st.session_state[restored_key] = True
+
+    prefix = namespace + '.'
+    state = {key[len(prefix):]: value for key, value in get_journal().restore().items() if key.startswith(prefix)}
+
+    # Put saved widget values back before the widgets are created
+    saved_widgets = st.session_state.setdefault('persisted_widgets', {})
+    for key, value in state.items():
+        if key.startswith('widget.'):
+            st.session_state[key[len('widget.'):]] = value
+            saved_widgets[prefix + key] = value
+    return state
+
+
+# Function to journal a mutation under an app's namespace
+def record(namespace, op, key, value=None):
+    get_journal().record(op, f'{namespace}.{key}', value)
+
+
+# Function to journal a widget's value when it differs from what was last saved
+def persist_widget(namespace, key, default=0.0):
+    saved_widgets = st.session_state.setdefault('persisted_widgets', {})
+    full_key = f'{namespace}.widget.{key}'
+    value = st.session_state.get(key, default)
+    if saved_widgets.get(full_key, default) != value:
+        saved_widgets[full_key] = value
+        get_journal().record('set', full_key, value)
@@ -0,0 +1,186 @@
+import csv
+import io
+import re
+from collections import defaultdict
+from itertools import islice
+
+# Bank and credit card statement ingestion for the Current You tool. Statement CSVs are streamed
+# row by row in chunks, each merchant description is matched against one compiled regex built from
+# all category keywords, and the amounts are summed per category and turned into monthly averages.
+
+CHUNK_ROWS = 5000
+OTHER_CATEGORY = ('variable', 'Other')
+IGNORE = None  # Rows matching these keywords (card payments, transfers) are not spending
+
+# Keywords for each (fixed/variable, category); the category names match the Current You defaults
+DEFAULT_RULES = {
+    ('fixed', 'Housing'): ['rent payment', 'monthly rent', 'mortgage', 'property tax', 'strata', 'hoa', 'condo fee', 'landlord'],
+    ('fixed', 'Utilities'): ['hydro', 'electric', 'power co', 'water bill', 'utility', 'utilities', 'internet', 'comcast', 'xfinity', 'verizon', 'at&t', 't-mobile', 'rogers', 'bell canada', 'telus', 'enbridge', 'fortis'],
+    ('fixed', 'Insurance'): ['insurance', 'geico', 'allstate', 'state farm', 'progressive', 'intact', 'desjardins', 'manulife', 'sun life'],
+    ('fixed', 'Transportation'): ['uber trip', 'uber *trip', 'lyft', 'shell oil', 'shell canada', 'shell service', 'esso', 'chevron', 'exxon', 'petro-canada', 'petro canada', 'husky', 'gas station', 'fuel station', 'transit', 'parking', 'presto', 'metro card', 'car wash'],
+    ('fixed', 'Debt Payments'): ['loan payment', 'student loan', 'car payment', 'auto loan', 'line of credit', 'nelnet', 'navient'],
+    ('fixed', 'Groceries'): ['grocery', 'groceries', 'supermarket', 'safeway', 'whole foods', 'trader joe', 'kroger', 'costco', 'walmart', 'loblaws', 'sobeys', 'no frills', 'metro inc', 'aldi', 'instacart', 'publix', 'save-on', 'freshco'],
+    ('variable', 'Fun (trips, vacations etc.)'): ['airbnb', 'expedia', 'airline', 'air canada', 'westjet', 'delta air', 'united air', 'hotel', 'booking.com', 'netflix', 'spotify', 'disney+', 'cinema', 'cineplex', 'theatre', 'concert', 'ticketmaster', 'steam games'],
+    ('variable', 'Dining Out'): ['restaurant', 'cafe', 'coffee', 'starbucks', 'tim hortons', 'mcdonald', 'doordash', 'uber eats', 'ubereats', 'skip the dishes', 'grubhub', 'pizza', 'sushi', 'bar & grill', 'pub & grill', 'brewpub', 'gastropub'],
+    ('variable', 'Shopping'): ['amazon', 'amzn', 'target', 'best buy', 'ikea', 'winners', 'h&m', 'zara', 'etsy', 'apple.com', 'shoppers drug'],
+    IGNORE: ['payment thank you', 'payment - thank you', 'autopay', 'credit card payment', 'transfer to', 'transfer from', 'e-transfer', 'interest charge'],
+}
+
+DATE_HEADERS = ('date', 'transaction date', 'trans. date', 'posted date', 'posting date', 'post date')
+DESCRIPTION_HEADERS = ('description', 'merchant', 'payee', 'name', 'details', 'memo', 'transaction description')
+AMOUNT_HEADERS = ('amount', 'transaction amount', 'cad$', 'usd$')
+DEBIT_HEADERS = ('debit', 'withdrawal', 'withdrawals', 'money out')
+CREDIT_HEADERS = ('credit', 'deposit', 'deposits', 'money in')
+
+MONTHS = {name: number for number, name in enumerate(['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+ISO_DATE = re.compile(r'(\d{4})[-/.](\d{1,2})[-/.]\d{1,2}')
+SLASH_DATE = re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})')
+NAMED_DATE = re.compile(r'([A-Za-z]{3})[a-z]*\.?\s+\d{1,2},?\s+(\d{4})|\d{1,2}[-\s]([A-Za-z]{3})[a-z]*[-\s](\d{4})')
+
+
+# Function to compile every keyword into one case-insensitive regex; longer keywords are tried first.
+# Keywords only match whole words, so 'rent payment' doesn't match inside 'CURRENT'. The lookarounds
+# (rather than \b) also work for keywords that end in a symbol, such as 'disney+'.
+def compile_rules(rules=DEFAULT_RULES):
+    keyword_categories = {}
+    for category, keywords in rules.items():
+        for keyword in keywords:
+            keyword_categories[keyword.lower()] = category
+    alternatives = sorted(keyword_categories, key=len, reverse=True)
+    pattern = re.compile(r'(?<!\w)(?:' + '|'.join(re.escape(keyword) for keyword in alternatives) + r')(?!\w)', re.IGNORECASE)
+    return pattern, keyword_categories
+
+
+# Function to find the (year, month) of a statement date without calling strptime on every row
+def month_key(text):
+    match = ISO_DATE.search(text)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = SLASH_DATE.search(text)
+    if match:
+        first, second, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+        year = year + 2000 if year < 100 else year
+        # Month first unless the first number can only be a day
+        return (year, second) if first > 12 else (year, first)
+    match = NAMED_DATE.search(text)
+    if match:
+        name, year = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+        month = MONTHS.get(name.lower())
+        if month:
+            return int(year), month
+    return None
+
+
+# Function to parse an amount such as "-1,234.56", "$45.00" or "(12.00)"
+def parse_amount(text):
+    text = text.strip().replace(',', '').replace('$', '')
+    if not text:
+        return 0.0
+    if text.startswith('(') and text.endswith(')'):
+        text = '-' + text[1:-1]
+    return float(text)
+
+
+# Function to find the position of the first header that matches one of the names
+def find_column(headers, names):
+    for position, header in enumerate(headers):
+        if header in names:
+            return position
+    return None
+
+
+class StatementSummary:
+    def __init__(self, rules=DEFAULT_RULES):
+        self.pattern, self.keyword_categories = compile_rules(rules)
+        self.spending = defaultdict(float)  # Spending per category, from debit columns or sign-aware amounts
+        self.months = set()
+        self.rows = 0
+        self.matched = 0
+        self.skipped = 0
+
+    # Function to categorize one description
+    def categorize(self, description):
+        match = self.pattern.search(description)
+        if match is None:
+            return OTHER_CATEGORY
+        return self.keyword_categories[match.group(0).lower()]
+
+    # Function to stream one statement file into the running totals
+    def add_file(self, file):
+        file.seek(0)
+        stream = io.TextIOWrapper(file, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            reader = csv.reader(stream)
+            headers = [header.strip().lower() for header in next(reader, [])]
+            date_column = find_column(headers, DATE_HEADERS)
+            description_column = find_column(headers, DESCRIPTION_HEADERS)
+            amount_column = find_column(headers, AMOUNT_HEADERS)
+            debit_column = find_column(headers, DEBIT_HEADERS)
+            credit_column = find_column(headers, CREDIT_HEADERS)
+            if description_column is None or (amount_column is None and debit_column is None):
+                raise ValueError("Could not find a description and an amount column in the statement.")
+
+            # A single amount column is summed by sign, then the side with more rows is treated as spending
+            positive = defaultdict(float)
+            negative = defaultdict(float)
+            positive_rows = negative_rows = 0
+            while True:
+                chunk = list(islice(reader, CHUNK_ROWS))
+                if not chunk:
+                    break
+                for row in chunk:
+                    try:
+                        description = row[description_column]
+                        if amount_column is not None:
+                            amount = parse_amount(row[amount_column])
+                        else:
+                            amount = -parse_amount(row[debit_column])
+                            if credit_column is not None:
+                                amount += parse_amount(row[credit_column])
+                    except (IndexError, ValueError):
+                        self.skipped += 1
+                        continue
+                    self.rows += 1
+                    if date_column is not None and date_column < len(row):
+                        month = month_key(row[date_column])
+                        if month:
+                            self.months.add(month)
+
+                    category = self.categorize(description)
+                    if category is IGNORE or amount == 0:
+                        continue
+                    self.matched += category != OTHER_CATEGORY
+                    if amount > 0:
+                        positive[category] += amount
+                        positive_rows += 1
+                    else:
+                        negative[category] -= amount
+                        negative_rows += 1
+
+            if amount_column is None or negative_rows >= positive_rows:
+                spending, refunds = negative, positive
+            else:
+                spending, refunds = positive, negative
+            for category, amount in spending.items():
+                self.spending[category] += amount
+            for category, amount in refunds.items():
+                self.spending[category] -= amount
+        finally:
+            stream.detach()
+
+    # Function to turn the totals into monthly averages split into fixed and variable categories
+    def monthly_averages(self, months=None):
+        months = months or max(1, len(self.months))
+        averages = {'fixed': {}, 'variable': {}}
+        for (kind, category), amount in sorted(self.spending.items()):
+            if amount > 0:
+                averages[kind][category] = round(amount / months, 2)
+        return averages
+
+
+# Function to summarize several statement files at once
+def summarize_statements(files, rules=DEFAULT_RULES):
+    summary = StatementSummary(rules)
+    for file in files:
+        summary.add_file(file)
+    return summary
@@ -0,0 +1,128 @@
+import streamlit as st
+
+# Page setup shared by the tools. Each page calls setup_page once per run, whether it runs on its own
+# or inside the multipage app (app.py), so st.set_page_config is only called in one place.
+
+# Styles used by both the Current You and the Future You tools
+BASE_CSS = """
+/* General styles */
+body {
+    color: #333333;
+    background-color: #f0f2f6;
+}
+
+/* Title and description */
+.title {
+    color: #4B0082;  /* Indigo */
+    text-align: center;
+    margin-bottom: 20px;
+}
+
+.description {
+    background-color: #e6e6fa;  /* Lavender */
+    padding: 20px;
+    border-radius: 10px;
+    margin-bottom: 30px;
+}
+
+/* Section headers */
+.section-header {
+    color: #4B0082;  /* Indigo */
+    margin-top: 30px;
+    margin-bottom: 10px;
+}
+
+/* Section2 headers */
+.section2-header {
+    color: black;  /* Black */
+    margin-top: 10px;
+    margin-bottom: 10px;
+}
+
+/* Text styling */
+.stApp p, .stApp div, .stApp span, .stApp label {
+    color: #4f4f4f;
+    font-family: 'Verdana', sans-serif;
+}
+"""
+
+FUTURE_YOU_CSS = BASE_CSS + """
+/* Input sections */
+.input-section {
+    background-color: #ffffff;
+    padding: 20px;
+    border-radius: 10px;
+    margin-bottom: 30px;
+}
+/* Button styling */
+.stButton>button {
+    color: black;
+    background-color: #e6e6fa;
+    border-radius: 5px;
+    padding: 0.6em 1.2em;
+    font-weight: bold;
+}
+/* Add goal section */
+.add-goal-section {
+    padding: 20px;
+    border: 2px dashed #9370DB;  /* Medium Purple */
+    border-radius: 10px;
+    margin-bottom: 30px;
+    background-color: #f9f9ff;
+}
+
+/* Sidebar styles */
+.sidebar .sidebar-content {
+    padding: 20px;
+}
+
+/* Results section */
+.results-section {
+    border: 2px solid #1E90FF;  /* Dodger Blue */
+    padding: 20px;
+    border-radius: 10px;
+    background-color: #f9f9ff;
+    margin-bottom: 30px;
+}
+
+/* Timeline */
+.plotly-chart {
+    margin-bottom: 30px;
+}
+"""
+
+CURRENT_YOU_CSS = BASE_CSS + """
+/* Background color */
+.stApp {
+    background-color: #fafafa;
+}
+.description {
+    font-family: 'Verdana', sans-serif;
+}
+/* Button styling */
+.stButton>button {
+    color: #e6e6fa;
+    background-color: #e6e6fa; /* Changed for better contrast */
+    border-radius: 5px;
+    padding: 0.6em 1.2em;
+    font-weight: bold;
+}
+/* Input field styling */
+input {
+    border: 2px solid #2e6ef7;
+    border-radius: 6px;
+}
+/* Expense Calculation Results Styling */
+.stApp .stMarkdown h3 {
+    font-family: 'Arial', sans-serif;
+    font-weight: bold;
+    color: #2e6ef7;
+}
+"""
+
+
+# Function to set up a page: wide layout, its title in the browser tab, and its styles
+def setup_page(page_title, css=None):
+    st.set_page_config(page_title=page_title, layout="wide")
+    if css:
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+import plotly.graph_objects as go
+
+from projections import project_future_values
+from goal_solver import solve_monthly_contributions, solve_months_to_goal, target_year_from_months
+from section_cache import SectionCache, fingerprint
+
+# Sensitivity sweep for the Future You tool. One goal is evaluated over a grid of interest rates,
+# target years and monthly contributions in a single broadcast NumPy pass:
+#   required contribution  (rate x target year)
+#   progress at the target (rate x target year x contribution)
+#   year the goal is reached (rate x contribution)
+# Sweeps are pure functions of the goal, so they are cached for every session by the goal's fingerprint.
+
+RATE_STEPS = 50
+YEAR_STEPS = 50
+CONTRIBUTION_STEPS = 50
+MAX_RATE = 12.0
+SWEEP_ENTRIES = 64  # A 50 x 50 x 50 sweep holds about 1 MB
+
+sweep_cache = SectionCache(SWEEP_ENTRIES)
+
+
+# Function to choose the grid for a goal: rates up to MAX_RATE, the next YEAR_STEPS years, and
+# contributions up to twice what the goal needs today (rounded up to a whole $50)
+def sweep_axes(goal, current_year):
+    rates = np.linspace(0.0, MAX_RATE, RATE_STEPS)
+    years = current_year + 1 + np.arange(YEAR_STEPS)
+    top = 50 * math.ceil(max(2 * (goal['monthly_contribution'] or 0), 50) / 50)
+    contributions = np.linspace(0.0, top, CONTRIBUTION_STEPS)
+    return rates, years, contributions
+
+
+# Function to evaluate a goal over the whole grid at once
+def sweep_goal(goal_amount, current_savings, rates, years, contributions, current_year):
+    months = 12.0 * (years - current_year)
+    required = solve_monthly_contributions(goal_amount, current_savings, rates[:, None], months[None, :]).values
+    future_values = project_future_values(current_savings, rates[:, None, None], (years - current_year)[None, :, None], contributions[None, None, :])
+    progress = future_values / goal_amount if goal_amount > 0 else np.ones(future_values.shape)
+    reach_months = solve_months_to_goal(goal_amount, current_savings, rates[:, None], contributions[None, :]).values
+    # Reach years are counted the way the goal list counts them; goals never reached stay NaN
+    reach_year = np.full(reach_months.shape, np.nan)
+    reached = np.isfinite(reach_months)
+    reach_year[reached] = [target_year_from_months(current_year, value) for value in reach_months[reached]]
+    return {
+        'rates': rates,
+        'years': years,
+        'contributions': contributions,
+        'required': required,
+        'progress': progress,
+        'reach_year': reach_year,
+    }
+
+
+# Function to get a goal's sweep, computing it only for goals (and years) not seen before
+def get_sweep(goal, current_year):
+    key = fingerprint(goal['goal_amount'], goal['current_savings'], goal['monthly_contribution'], current_year)
+    return sweep_cache.get_or_compute('sweep', key, lambda: sweep_goal(goal['goal_amount'], goal['current_savings'], *sweep_axes(goal, current_year), current_year))
+
+
+# Function to read the progress (as a percentage, capped at 100) at one contribution level, as a (rate x target year) grid
+def progress_at(sweep, column):
+    return np.minimum(sweep['progress'][:, :, column], 1.0) * 100
+
+
+# Function to draw one heatmap of a sweep; a NaN cell (e.g. never reached) is left blank
+def sweep_heatmap(z, x, y, x_title, y_title, value_title, value_format):
+    fig = go.Figure(go.Heatmap(
+        z=z,
+        x=x,
+        y=y,
+        colorscale='Viridis',
+        colorbar=dict(title=value_title),
+        hovertemplate=f"{x_title}: %{{x}}<br>{y_title}: %{{y:.2f}}<br>{value_title}: %{{z:{value_format}}}<extra></extra>",
+    ))
+    fig.update_layout(
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        margin=dict(l=40, r=40, t=30, b=40),
+        height=450,
+    )
+    return fig
@@ -0,0 +1,43 @@
+import numpy as np
+
+from allocation import LATE, ON_TIME, UNFUNDED, allocate_funds
+
+
+def test_enough_budget_funds_every_goal_on_time():
+    allocation = allocate_funds([12000.0, 6000.0], [0.0, 0.0], [0.0, 0.0], [24, 12], available=1000.0)
+    assert list(allocation.status) == [ON_TIME, ON_TIME]
+    np.testing.assert_allclose(allocation.required, [500.0, 500.0])
+    np.testing.assert_allclose(allocation.contributions, [500.0, 500.0])
+    assert list(allocation.months_late) == [0, 0]
+    np.testing.assert_allclose(allocation.schedule.sum(axis=1), [12000.0, 6000.0])
+
+
+def test_short_budget_makes_a_goal_late():
+    allocation = allocate_funds([12000.0, 6000.0], [0.0, 0.0], [0.0, 0.0], [24, 12], available=600.0)
+    # The cheaper goal is funded steadily; the other takes what is left and finishes late
+    assert list(allocation.status) == [LATE, ON_TIME]
+    assert allocation.completion_months[1] == 12
+    assert allocation.completion_months[0] > 24
+    assert allocation.months_late[0] == allocation.completion_months[0] - 24
+    np.testing.assert_allclose(allocation.schedule[0].sum(), 12000.0)
+    # Never more than the budget in any month
+    assert (allocation.schedule.sum(axis=0) <= 600.0 + 1e-9).all()
+
+
+def test_repair_funds_a_goal_from_money_freed_later():
+    # 200 + 333 a month don't both fit in 500, but the second goal is on time with what is left over
+    # while the first goal saves and all 500 once it is reached
+    allocation = allocate_funds([1200.0, 6000.0], [0.0, 0.0], [0.0, 0.0], [6, 18], available=500.0)
+    assert list(allocation.status) == [ON_TIME, ON_TIME]
+    np.testing.assert_allclose(allocation.schedule[0, :6], 200.0)
+    np.testing.assert_allclose(allocation.schedule[1].sum(), 6000.0)
+    assert allocation.completion_months[1] == 18
+
+
+def test_goals_out_of_reach_are_unfunded():
+    allocation = allocate_funds([1e9, 5000.0], [0.0, 6000.0], [0.0, 0.0], [12, 12], available=100.0, max_months=120)
+    assert list(allocation.status) == [UNFUNDED, ON_TIME]
+    assert np.isnan(allocation.completion_months[0])
+    # Savings already cover the second goal
+    assert allocation.required[1] == 0
+    assert allocation.completion_months[1] == 0
@@ -0,0 +1,120 @@
+import asyncio
+import json
+from datetime import date
+
+import pytest
+
+import api_server
+from api_server import ApiServer, HttpError, ResponseCache, handle
+from projections import project_future_values
+
+
+def test_bad_input_is_a_400():
+    assert handle('/score', b'{"partner_1": 3}')[0] == 400
+    assert handle('/goal-progress', b'{"accounts": [1]}')[0] == 400
+    assert handle('/projections', b'[1, 2]')[0] == 400
+    assert handle('/projections', b'not json')[0] == 400
+
+
+def test_unexpected_errors_are_a_500(monkeypatch):
+    monkeypatch.setitem(api_server.ROUTES, '/broken', lambda request: 1 / 0)
+    status, payload = handle('/broken', b'{}')
+    assert status == 500
+    assert 'error' in json.loads(payload)
+
+
+def test_projections_endpoint():
+    status, payload = handle('/projections', json.dumps({'items': [
+        {'principal': 1000, 'annual_rate': 5, 'years': 10, 'monthly_contribution': 100},
+        {'principal': 500, 'annual_rate': 0, 'years': 2},
+    ]}).encode())
+    assert status == 200
+    values = json.loads(payload)['future_values']
+    assert values[0] == pytest.approx(float(project_future_values(1000, 5, 10, 100)))
+    assert values[1] == pytest.approx(500.0)
+
+
+def test_contributions_endpoint_uses_the_given_year():
+    status, payload = handle('/contributions', json.dumps({'current_year': 2026, 'items': [
+        {'goal_amount': 12000, 'interest_rate': 0, 'target_year': 2027},
+    ]}).encode())
+    assert status == 200
+    assert json.loads(payload) == {'monthly_contributions': [1000.0], 'status': ['ok']}
+
+
+class CountingServer(ApiServer):
+    # Computes in this process, counting the computations and optionally holding them until released
+    def __init__(self):
+        self.executor = None
+        self.cache = ResponseCache()
+        self.requests = 0
+        self.computed = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def compute(self, path, body):
+        self.computed += 1
+        await self.release.wait()
+        return handle(path, body)
+
+
+BODY = json.dumps({'items': [{'principal': 1000, 'annual_rate': 5, 'years': 10}]}).encode()
+
+
+def test_repeated_requests_are_answered_from_the_cache():
+    async def run():
+        server = CountingServer()
+        first = await server.respond('POST', '/projections', BODY)
+        second = await server.respond('POST', '/projections', BODY)
+        return server, first, second
+    server, first, second = asyncio.run(run())
+    assert first == second and first[0] == 200
+    assert server.computed == 1
+    assert (server.cache.hits, server.cache.misses) == (1, 1)
+
+
+def test_identical_requests_in_flight_share_one_computation():
+    async def run():
+        server = CountingServer()
+        server.release.clear()
+        requests = [asyncio.ensure_future(server.respond('POST', '/projections', BODY)) for _ in range(5)]
+        await asyncio.sleep(0)
+        server.release.set()
+        return server, await asyncio.gather(*requests)
+    server, responses = asyncio.run(run())
+    assert server.computed == 1
+    assert all(response == responses[0] for response in responses)
+
+
+def test_cached_answers_expire_with_the_year(monkeypatch):
+    class Today(date):
+        year_now = 2026
+
+        @classmethod
+        def today(cls):
+            return date(cls.year_now, 6, 1)
+
+    monkeypatch.setattr(api_server, 'date', Today)
+    body = json.dumps({'items': [{'goal_amount': 12000, 'interest_rate': 0, 'target_year': 2028}]}).encode()
+
+    async def run():
+        server = CountingServer()
+        before = await server.respond('POST', '/contributions', body)
+        Today.year_now = 2027
+        after = await server.respond('POST', '/contributions', body)
+        return server, before, after
+    server, before, after = asyncio.run(run())
+    assert server.computed == 2
+    assert json.loads(before[1])['monthly_contributions'] == [500.0]
+    assert json.loads(after[1])['monthly_contributions'] == [1000.0]
+
+
+def test_unknown_paths_and_methods():
+    server = CountingServer()
+    with pytest.raises(HttpError) as error:
+        asyncio.run(server.respond('POST', '/nothing', b'{}'))
+    assert error.value.status == 404
+    with pytest.raises(HttpError) as error:
+        asyncio.run(server.respond('GET', '/projections', b'{}'))
+    assert error.value.status == 405
+    assert server.computed == 0
@@ -0,0 +1,81 @@
+import io
+import json
+from datetime import date
+
+import pytest
+
+from bulk_import import iter_json_rows, read_import_file
+
+ROWS = [
+    {'section': 'partner_1', 'kind': 'account', 'name': 'Savings, "main" ]', 'type': 'Savings', 'rate': 4.5, 'balance': 12000},
+    {'section': 'joint', 'kind': 'goal', 'name': 'House {2030}', 'cost': 60000, 'target_year': 2030, 'account': ['A', 'B']},
+    {'section': 'partner_2', 'kind': 'debt', 'name': 'Car', 'amount': 15000.5, 'rate': 6, 'payment': 400},
+]
+
+
+@pytest.mark.parametrize('read_size', [1, 2, 3, 7, 64, 65536])
+def test_objects_split_across_reads(read_size):
+    text = '  [\n' + ',\n'.join(json.dumps(row) for row in ROWS) + '\n]  '
+    assert list(iter_json_rows(io.StringIO(text), read_size=read_size)) == ROWS
+
+
+def test_empty_list():
+    assert list(iter_json_rows(io.StringIO('[ ]'), read_size=1)) == []
+
+
+def test_rejects_a_file_that_is_not_a_list():
+    with pytest.raises(ValueError, match="must be a list"):
+        list(iter_json_rows(io.StringIO(json.dumps(ROWS[0]))))
+
+
+def test_rejects_a_truncated_file():
+    text = '[' + json.dumps(ROWS[0]) + ', ' + json.dumps(ROWS[1])[:20]
+    with pytest.raises(ValueError, match="ended in the middle of a row"):
+        list(iter_json_rows(io.StringIO(text), read_size=8))
+
+
+def read_csv(text):
+    return read_import_file(io.BytesIO(text.encode('utf-8')), 'household.csv')
+
+
+def test_csv_import_reads_every_kind():
+    result = read_csv(
+        "section,kind,name,type,rate,balance,amount,payment,cost,target_year,account\n"
+        "partner_1,account,Emergency Fund,Savings,4.5,12000,,,,,\n"
+        "partner_1,debt,Car,,6,,15000.5,400,,,\n"
+        f"partner_1,goal,House,,,,,,60000,{date.today().year + 5}.0,Emergency Fund\n"
+    )
+
+    assert result.errors == []
+    assert result.row_count == 3
+    assert result.records[('partner_1', 'account')] == [{'name': 'Emergency Fund', 'type': 'Savings', 'rate': 4.5, 'balance': 12000.0}]
+    assert result.records[('partner_1', 'debt')] == [{'name': 'Car', 'amount': 15000.5, 'rate': 6.0, 'payment': 400.0}]
+    assert result.records[('partner_1', 'goal')] == [{'name': 'House', 'cost': 60000.0, 'target_year': date.today().year + 5, 'account': 'Emergency Fund'}]
+
+
+def test_csv_import_rejects_numbers_that_are_not_finite_or_whole():
+    year = date.today().year + 5
+    result = read_csv(
+        "section,kind,name,type,rate,balance,amount,payment,cost,target_year,account\n"
+        "partner_1,account,A,Savings,nan,100,,,,,\n"
+        "partner_1,account,B,Savings,4,inf,,,,,\n"
+        "partner_2,debt,C,,-Infinity,,100,10,,,\n"
+        f"joint,goal,D,,,,,,1000,{year}.5,\n"
+        "joint,goal,E,,,,,,1000,soon,\n"
+    )
+
+    assert result.errors == [
+        "Row 2: rate 'nan' is not a finite number",
+        "Row 3: balance 'inf' is not a finite number",
+        "Row 4: rate '-Infinity' is not a finite number",
+        f"Row 5: target_year '{year}.5' is not a whole number",
+        "Row 6: target_year 'soon' is not a valid int",
+    ]
+    assert result.records == {}
+
+
+def test_json_import_rejects_an_infinite_year():
+    text = json.dumps([{'section': 'joint', 'kind': 'goal', 'name': 'House', 'cost': 1000, 'target_year': float('inf')}])
+    result = read_import_file(io.BytesIO(text.encode('utf-8')), 'household.json')
+
+    assert result.errors == ["Row 1: target_year 'inf' is not a finite number"]
@@ -0,0 +1,67 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from cashflow import simulate_cashflow
+from ledger import AccountLedger, DebtLedger, GoalLedger
+
+
+def section(goals, income=0.0, expenses=0.0, balance=10000.0):
+    return {
+        'income': income,
+        'expenses': expenses,
+        'accounts': AccountLedger.from_records([{'name': 'Savings', 'type': 'Savings', 'rate': 0.0, 'balance': balance}]),
+        'debts': DebtLedger(),
+        'goals': GoalLedger.from_records(goals),
+    }
+
+
+def withdrawals(frame):
+    goals = frame.xs('goal', level='kind', axis=1)
+    return {column[1]: str(goals.index[goals[column] > 0][0]) for column in goals.columns if (goals[column] > 0).any()}
+
+
+@pytest.mark.parametrize('start', [date(2026, 1, 1), date(2026, 6, 15), date(2026, 12, 1)])
+def test_goals_are_withdrawn_in_the_last_month_of_their_target_year(start):
+    frame = simulate_cashflow({'A': section([
+        {'name': 'Car', 'cost': 1000.0, 'target_year': 2030, 'account': 'Savings'},
+        {'name': 'Now', 'cost': 500.0, 'target_year': 2026, 'account': None},
+        {'name': 'Past', 'cost': 100.0, 'target_year': 2020, 'account': 'Savings'},
+    ])}, 2031, start=start)
+
+    assert str(frame.index[0]) == start.strftime('%Y-%m')
+    assert str(frame.index[-1]) == '2031-12'
+    assert withdrawals(frame) == {'Car': '2030-12', 'Now': '2026-12', 'Past': start.strftime('%Y-%m')}
+
+
+def test_goal_balance_and_shortfall():
+    frame = simulate_cashflow({'A': section([
+        {'name': 'House', 'cost': 25000.0, 'target_year': 2027, 'account': 'Savings'},
+    ], income=1000.0, expenses=500.0)}, 2027, inflation=0.0, start=date(2027, 1, 1))
+
+    # 10000 saved plus 500 a month for the 12 months of 2027 is short of the 25000 goal by 9000
+    assert frame[('A', 'goal', 'House')].sum() == pytest.approx(16000.0)
+    assert frame[('A', 'cashflow', 'shortfall')].sum() == pytest.approx(9000.0)
+    assert frame[('A', 'account', 'Savings')].iloc[-1] == pytest.approx(0.0)
+
+
+def test_expenses_grow_with_inflation():
+    frame = simulate_cashflow({'A': section([], income=0.0, expenses=1000.0, balance=1e6)}, 2028, inflation=12.0, start=date(2026, 1, 1))
+    expenses = frame[('A', 'cashflow', 'expenses')].to_numpy()
+    np.testing.assert_allclose(expenses[12] / expenses[0], 1.12)
+
+
+def test_household_without_goals():
+    frame = simulate_cashflow({'A': section([], income=1000.0, expenses=400.0)}, 2027, inflation=0.0, start=date(2027, 1, 1))
+    assert 'goal' not in frame.columns.get_level_values('kind')
+    assert frame[('A', 'account', 'Savings')].iloc[-1] == pytest.approx(10000.0 + 12 * 600.0)
+
+
+def test_household_without_accounts_or_debts():
+    empty = {'income': 1000.0, 'expenses': 1500.0, 'accounts': AccountLedger(), 'debts': DebtLedger(), 'goals': GoalLedger()}
+    frame = simulate_cashflow({'A': empty, 'B': dict(empty, expenses=0.0)}, 2027, inflation=0.0, start=date(2027, 1, 1))
+    assert set(frame.columns.get_level_values('kind')) == {'cashflow'}
+    # With nowhere to save or draw from, a deficit is a shortfall and a surplus is not saved
+    assert frame[('A', 'cashflow', 'shortfall')].sum() == pytest.approx(12 * 500.0)
+    assert frame[('B', 'cashflow', 'saved')].sum() == 0.0
@@ -0,0 +1,35 @@
+import matplotlib.pyplot as plt
+
+from charts import ChartCache, bar_chart_png, chart_cache, pie_chart_png
+
+EXPENSES = {'Housing': 1500.0, 'Groceries': 400.0, 'Fun': 250.0}
+
+
+def test_unchanged_charts_come_from_the_cache():
+    chart_cache.clear()
+    image = pie_chart_png(EXPENSES, 'Expenses')
+
+    assert image.startswith(b'\x89PNG')
+    assert pie_chart_png(dict(EXPENSES), 'Expenses') is image
+    assert (chart_cache.hits, chart_cache.misses) == (1, 1)
+    # Other data, another title or another kind of chart is rendered again
+    assert pie_chart_png(dict(EXPENSES, Fun=300.0), 'Expenses') is not image
+    assert pie_chart_png(EXPENSES, 'Spending') is not image
+    assert bar_chart_png(EXPENSES, 'Expenses') is not image
+    assert chart_cache.misses == 4
+    # Charts are drawn off-screen, so pyplot is left without figures
+    assert plt.get_fignums() == []
+
+
+def test_cache_evicts_least_recently_used_to_fit_its_bytes():
+    cache = ChartCache(max_bytes=25)
+    cache.get_or_render('a', lambda: b'a' * 10)
+    cache.get_or_render('b', lambda: b'b' * 10)
+    cache.get_or_render('a', lambda: b'never drawn')
+    cache.get_or_render('c', lambda: b'c' * 10)
+
+    assert list(cache.entries) == ['a', 'c']
+    assert cache.size == 20
+    # A chart larger than the whole budget is still kept on its own
+    cache.get_or_render('big', lambda: b'x' * 100)
+    assert list(cache.entries) == ['big']
@@ -0,0 +1,44 @@
+from streamlit.testing.v1 import AppTest
+
+from couples_tool import account_lines, debt_lines, escape_markdown, goal_lines
+from ledger import AccountLedger, DebtLedger, GoalLedger, goal_account
+
+
+def test_summary_lines_escape_names():
+    accounts = AccountLedger()
+    accounts.append('Fund_1 | *Main* $5', 'Savings', 2.0, 1500.0)
+    debts = DebtLedger()
+    debts.append('[Card](x)', 1000.0, 20.0, 50.0)
+    goals = GoalLedger()
+    goals.append('~Trip~', 3000.0, 2030, goal_account(['Fund_1 | *Main* $5']))
+
+    assert account_lines(accounts) == ["- Fund\\_1 \\| \\*Main\\* \\$5 (Savings): \\$1,500.00"]
+    assert debt_lines(debts) == ["- \\[Card\\]\\(x\\): \\$1,000.00 at 20.00% interest, monthly payment \\$50.00"]
+    assert goal_lines(goals) == ["- \\~Trip\\~: \\$3000.00 by 2030, Account: Fund\\_1 \\| \\*Main\\* \\$5"]
+    assert escape_markdown('Plain name 2') == 'Plain name 2'
+
+
+def summary_script():
+    import streamlit as st
+    from couples_tool import show_summary_list
+
+    show_summary_list("Accounts:", [f"- Account {i}" for i in range(st.session_state.get('entries', 60))], "No accounts added.", 'accounts')
+
+
+def test_summary_page_is_clamped_when_entries_are_removed():
+    at = AppTest.from_function(summary_script).run()
+    at.number_input(key='summary_page_accounts').set_value(3).run()
+    assert at.markdown[0].value.splitlines()[0] == "- Account 50"
+
+    # With 30 entries left there are only two pages, so the last one is shown
+    at.session_state['entries'] = 30
+    at.run()
+    assert not at.exception
+    assert at.number_input(key='summary_page_accounts').value == 2
+    assert at.markdown[0].value.splitlines() == [f"- Account {i}" for i in range(25, 30)]
+
+    # A short list has no pages at all
+    at.session_state['entries'] = 3
+    at.run()
+    assert len(at.number_input) == 0
+    assert at.markdown[0].value.splitlines() == ["- Account 0", "- Account 1", "- Account 2"]
@@ -0,0 +1,46 @@
+import numpy as np
+
+from debts import AVALANCHE, CUSTOM, MINIMUM_PAYMENTS, SNOWBALL, amortize, compare_strategies
+
+
+def test_amortize_matches_the_loan_formula():
+    balance, rate, months = 20000.0, 6.0, 60
+    monthly_rate = rate / 100 / 12
+    payment = balance * monthly_rate / (1 - (1 + monthly_rate) ** -months)
+
+    result = amortize([balance], [rate], [payment])
+
+    assert result['payoff_months'][0] == months
+    np.testing.assert_allclose(result['total_interest'][0], payment * months - balance, atol=0.01)
+    assert result['balances'].shape == (months + 1, 1)
+    assert result['balances'][-1, 0] == 0
+
+
+def test_amortize_extra_money_goes_in_priority_order():
+    result = amortize([1000.0, 1000.0], [0.0, 0.0], [100.0, 100.0], extra_payment=100.0, order=[1, 0])
+    # The second debt gets the extra 100 a month until it is gone, then the first one does
+    assert list(result['payoff_months']) == [8, 5]
+
+
+def test_amortize_stops_at_max_months_when_payments_are_too_small():
+    result = amortize([10000.0], [24.0], [100.0], max_months=24)
+    assert np.isnan(result['payoff_months'][0])
+    assert len(result['balances']) == 25
+
+
+def test_compare_strategies():
+    balances = [500.0, 8000.0, 3000.0]
+    rates = [5.0, 22.0, 12.0]
+    payments = [25.0, 200.0, 90.0]
+
+    results = compare_strategies(balances, rates, payments, 300.0, custom_order=[2])
+
+    assert list(results) == [MINIMUM_PAYMENTS, AVALANCHE, SNOWBALL, CUSTOM]
+    interest = {strategy: result['total_interest'].sum() for strategy, result in results.items()}
+    assert interest[AVALANCHE] <= interest[SNOWBALL] < interest[MINIMUM_PAYMENTS]
+    # Snowball clears the smallest balance first
+    snowball_payoff = results[SNOWBALL]['payoff_months']
+    assert snowball_payoff[0] == snowball_payoff.min()
+    # Extra money shortens every strategy
+    for strategy in (AVALANCHE, SNOWBALL, CUSTOM):
+        assert np.nanmax(results[strategy]['payoff_months']) < np.nanmax(results[MINIMUM_PAYMENTS]['payoff_months'])
@@ -0,0 +1,68 @@
+import os
+from datetime import date
+
+from streamlit.testing.v1 import AppTest
+
+from goal_solver import required_monthly_contribution
+from persistence import Journal
+
+FUTURE_YOU = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'future_you.py')
+YEAR = date.today().year
+
+
+def goal(name, target_year, contribution):
+    return {'goal_name': name, 'goal_amount': 20000, 'current_savings': 1000.0, 'interest_rate': 5.0,
+            'monthly_contribution': contribution, 'target_year': target_year, 'goal_type': 'Target Year'}
+
+
+# Function to open Future You on a household saved with the given goals
+def open_app(tmp_path, goals):
+    journal = Journal('household', str(tmp_path / 'state.db'))
+    journal.record('set', 'future_you.goals', goals)
+    at = AppTest.from_file(FUTURE_YOU, default_timeout=60)
+    at.session_state['journal'] = journal
+    at.run()
+    assert not at.exception
+    return at, journal
+
+
+def click(at, label, occurrence=0):
+    [button for button in at.sidebar.button if button.label == label][occurrence].click()
+    at.run()
+    assert not at.exception
+
+
+def test_updating_a_goal_saves_it_and_closes_its_editor(tmp_path):
+    at, journal = open_app(tmp_path, [goal('Car', YEAR + 5, 300), goal('Trip', YEAR + 2, 100)])
+    click(at, "Edit Goal", 1)
+    at.sidebar.number_input(key='edit_target_year_1').set_value(YEAR + 4)
+    click(at, "Update Goal")
+
+    trip = at.session_state['goals'][1]
+    assert trip['target_year'] == YEAR + 4
+    assert trip['monthly_contribution'] == round(required_monthly_contribution(20000, 1000.0, 5.0, 48)[0])
+    assert journal.restore()['future_you.goals'][1] == trip
+    assert at.session_state['edit_goal_index'] is None
+    assert [button.label for button in at.sidebar.button].count("Update Goal") == 0
+    assert at.sidebar.success[0].value == "Goal 'Trip' updated successfully."
+
+
+def test_only_one_goal_is_edited_at_a_time(tmp_path):
+    at, _ = open_app(tmp_path, [goal('Car', YEAR + 5, 300), goal('Trip', YEAR + 2, 100)])
+    click(at, "Edit Goal", 0)
+    # Car's editor is open, so Trip has the only Edit Goal button left
+    click(at, "Edit Goal", 0)
+
+    assert at.session_state['edit_goal_index'] == 1
+    assert [button.key for button in at.sidebar.button if button.label == "Update Goal"] == ['update_1']
+
+
+def test_removing_an_earlier_goal_keeps_the_open_editor(tmp_path):
+    at, journal = open_app(tmp_path, [goal('Car', YEAR + 5, 300), goal('Trip', YEAR + 2, 100), goal('Boat', YEAR + 8, 150)])
+    click(at, "Edit Goal", 2)
+    click(at, "Remove Goal", 0)
+
+    assert [goal['goal_name'] for goal in at.session_state['goals']] == ['Trip', 'Boat']
+    assert [goal['goal_name'] for goal in journal.restore()['future_you.goals']] == ['Trip', 'Boat']
+    assert at.session_state['edit_goal_index'] == 1
+    assert [button.key for button in at.sidebar.button if button.label == "Update Goal"] == ['update_1']
@@ -0,0 +1,55 @@
+import numpy as np
+
+from goal_solver import (
+    ALREADY_FUNDED, OK, PAST_TARGET, UNREACHABLE, _bracketed_months, _future_value, expense_limit,
+    solve_monthly_contributions, solve_months_to_goal, target_year_from_months,
+)
+
+
+def test_months_to_goal_closed_form_matches_bisection():
+    goal_amounts = np.array([10000.0, 250000.0, 50000.0, 1000.0, 80000.0])
+    current_savings = np.array([0.0, 20000.0, 5000.0, 100.0, 0.0])
+    annual_rates = np.array([5.0, 7.0, 0.0, 1e-9, 3.5])
+    contributions = np.array([200.0, 900.0, 300.0, 25.0, 150.0])
+
+    solution = solve_months_to_goal(goal_amounts, current_savings, annual_rates, contributions)
+    bracketed = _bracketed_months(goal_amounts, current_savings, annual_rates / 100 / 12, contributions, 1200)
+
+    assert list(solution.status) == [OK] * 5
+    np.testing.assert_allclose(solution.values, bracketed, rtol=1e-6)
+
+
+def test_contribution_reaches_goal_in_time():
+    solution = solve_monthly_contributions([10000.0, 50000.0], [1000.0, 0.0], [5.0, 0.0], [60, 120])
+    reached = _future_value(np.array([1000.0, 0.0]), np.array([5.0, 0.0]) / 100 / 12, solution.values, np.array([60.0, 120.0]))
+    np.testing.assert_allclose(reached, [10000.0, 50000.0])
+    # With no interest the goal is simply split over the months
+    assert solution.values[1] == 50000.0 / 120
+
+
+def test_contribution_statuses():
+    solution = solve_monthly_contributions([10000.0, 10000.0, 10000.0], [0.0, 20000.0, 0.0], 5.0, [60, 60, 0])
+    assert list(solution.status) == [OK, ALREADY_FUNDED, PAST_TARGET]
+    assert solution.values[1] == 0
+    assert np.isnan(solution.values[2])
+
+
+def test_months_statuses():
+    solution = solve_months_to_goal([10000.0, 10000.0, 1e9], [20000.0, 0.0, 0.0], 0.0, [100.0, 0.0, 1.0])
+    assert list(solution.status) == [ALREADY_FUNDED, UNREACHABLE, UNREACHABLE]
+    assert solution.values[0] == 0
+    assert np.isnan(solution.values[1:]).all()
+
+
+def test_target_year_is_at_least_next_year():
+    assert target_year_from_months(2026, 0) == 2027
+    assert target_year_from_months(2026, 12) == 2027
+    assert target_year_from_months(2026, 12.5) == 2028
+
+
+def test_expense_limit_is_income_left_after_goal_contributions():
+    goals = [{'monthly_contribution': 1200.0}, {'monthly_contribution': 549.6}]
+
+    assert expense_limit(goals, 6000.0) == 4250.0
+    assert expense_limit(goals, 1000.0) == 0.0
+    assert expense_limit([], 6000.0) is None
@@ -0,0 +1,40 @@
+import numpy as np
+
+from household import goal_links, goal_progress, goal_shares, household_goal_progress, projection_table
+from ledger import AccountLedger, GoalLedger
+
+ACCOUNTS = AccountLedger.from_records([
+    {'name': 'Savings', 'type': 'Savings', 'rate': 0.0, 'balance': 10000.0},
+    {'name': 'Invest', 'type': 'Investment', 'rate': 0.0, 'balance': 30000.0},
+])
+
+
+def test_shared_accounts_are_split_by_cost():
+    goals = GoalLedger.from_records([
+        {'name': 'House', 'cost': 30000.0, 'target_year': 2030, 'account': ['Savings', 'Invest']},
+        {'name': 'Car', 'cost': 5000.0, 'target_year': 2030, 'account': 'Savings'},
+        {'name': 'Trip', 'cost': 1000.0, 'target_year': 2030, 'account': None},
+        {'name': 'Boat', 'cost': 1000.0, 'target_year': 2030, 'account': 'Missing'},
+    ])
+    links = goal_links(goals, {'Savings': 0, 'Invest': 1})
+    assert links.tolist() == [[True, True], [True, False], [True, True], [False, False]]
+
+    shares = goal_shares(goals.column('cost'), links)
+    # Each account is shared out completely among the goals that draw on it
+    np.testing.assert_allclose(shares.sum(axis=0), [1.0, 1.0])
+    # House claims 15000 of each account, Car 5000 of Savings, Trip 500 of each
+    np.testing.assert_allclose(shares[:, 0], np.array([15000.0, 5000.0, 500.0, 0.0]) / 20500.0)
+
+    rows = goal_progress(goals, projection_table(ACCOUNTS, goals, 2030, start_year=2026))
+    funds = [row['funds'] for row in rows]
+    np.testing.assert_allclose(funds[:3], [10000.0 * 15000 / 20500 + 30000.0 * 15000 / 15500, 10000.0 * 5000 / 20500, 10000.0 * 500 / 20500 + 30000.0 * 500 / 15500])
+    assert rows[3]['progress'] is None and rows[3]['account'] == 'Missing'
+    assert rows[1]['shortfall'] == 5000.0 - funds[1]
+
+
+def test_household_progress_matches_each_section():
+    goals = GoalLedger.from_records([{'name': 'House', 'cost': 50000.0, 'target_year': 2035, 'account': None}])
+    joint_accounts = AccountLedger.from_records([{'name': 'Joint', 'type': 'Savings', 'rate': 5.0, 'balance': 20000.0}])
+    rows = household_goal_progress({'partner_1': (ACCOUNTS, goals), 'joint': (joint_accounts, goals)}, 2030, start_year=2026)
+    assert rows['partner_1'] == goal_progress(goals, projection_table(ACCOUNTS, goals, 2030, start_year=2026))
+    assert rows['joint'] == goal_progress(goals, projection_table(joint_accounts, goals, 2030, start_year=2026))
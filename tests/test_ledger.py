@@ -0,0 +1,57 @@
+import pickle
+
+import pytest
+
+from ledger import AccountLedger, GoalLedger, account_names, goal_account
+
+RECORDS = [
+    {'name': 'Savings', 'type': 'Savings', 'rate': 4.0, 'balance': 10000.0},
+    {'name': 'Invest', 'type': 'Investment', 'rate': 7.0, 'balance': 25000.0},
+    {'name': 'TFSA', 'type': 'Savings', 'rate': 3.0, 'balance': 500.0},
+]
+
+
+def test_records_round_trip():
+    ledger = AccountLedger.from_records(RECORDS)
+    assert ledger.to_records() == RECORDS
+    assert pickle.loads(pickle.dumps(ledger)).to_records() == RECORDS
+    assert list(ledger.column('balance')) == [10000.0, 25000.0, 500.0]
+    assert ledger['Invest'].rate == 7.0
+
+
+def test_goal_accounts_round_trip():
+    goals = GoalLedger.from_records([
+        {'name': 'House', 'cost': 50000.0, 'target_year': 2032, 'account': goal_account(['Savings', 'Invest'])},
+        {'name': 'Trip', 'cost': 3000.0, 'target_year': 2028, 'account': goal_account([])},
+    ])
+    assert [account_names(account) for account in goals.column('account')] == [['Savings', 'Invest'], []]
+    assert goals.to_records()[1]['account'] is None
+
+
+def test_duplicate_names_are_rejected():
+    ledger = AccountLedger.from_records(RECORDS)
+    with pytest.raises(ValueError, match="Duplicate name: Savings"):
+        ledger.append('Savings', 'Savings', 1.0, 1.0)
+    with pytest.raises(ValueError, match="Duplicate name: New"):
+        ledger.extend([('New', 'Savings', 1.0, 1.0), ('New', 'Savings', 2.0, 2.0)])
+    # A rejected batch leaves the ledger untouched
+    assert ledger.to_records() == RECORDS
+
+
+def test_remove_keeps_order_and_index():
+    ledger = AccountLedger.from_records(RECORDS)
+    version = ledger.version
+    ledger.remove('Savings')
+    assert ledger.names == ['Invest', 'TFSA']
+    assert ledger.position('TFSA') == 1
+    assert ledger['TFSA'].balance == 500.0
+    assert ledger.version > version
+
+
+def test_columns_are_read_only():
+    ledger = AccountLedger.from_records(RECORDS)
+    with pytest.raises(ValueError):
+        ledger.column('balance')[0] = 0.0
+    with pytest.raises((TypeError, AttributeError)):
+        ledger.column('name').append('Other')
+    assert 'Other' not in ledger
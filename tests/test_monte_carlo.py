@@ -0,0 +1,42 @@
+import numpy as np
+
+import monte_carlo
+from monte_carlo import goal_success_probability, simulate_balances, summarize_balances
+from projections import project_future_values
+
+PRINCIPALS = [1000.0, 20000.0, 0.0]
+RATES = [5.0, 7.0, 3.0]
+YEARS = [10, 25, 3]
+CONTRIBUTIONS = [100.0, 0.0, 250.0]
+
+
+def test_without_volatility_every_path_is_the_projection():
+    balances = simulate_balances(PRINCIPALS, RATES, YEARS, CONTRIBUTIONS, volatility=0.0, n_paths=5, seed=1)
+
+    np.testing.assert_allclose(balances, np.broadcast_to(project_future_values(PRINCIPALS, RATES, YEARS, CONTRIBUTIONS), (5, 3)), rtol=1e-9)
+
+
+def test_seeded_runs_repeat():
+    first = simulate_balances(PRINCIPALS, RATES, YEARS, CONTRIBUTIONS, n_paths=2000, seed=42)
+
+    np.testing.assert_array_equal(first, simulate_balances(PRINCIPALS, RATES, YEARS, CONTRIBUTIONS, n_paths=2000, seed=42))
+    assert not np.array_equal(first, simulate_balances(PRINCIPALS, RATES, YEARS, CONTRIBUTIONS, n_paths=2000, seed=43))
+
+
+def test_process_pool_gives_the_same_paths(monkeypatch):
+    monkeypatch.setattr(monte_carlo, 'PATHS_PER_CHUNK', 100)
+    in_process = simulate_balances(PRINCIPALS, RATES, YEARS, CONTRIBUTIONS, n_paths=350, seed=7)
+    monkeypatch.setattr(monte_carlo, 'PROCESS_POOL_PATHS', 200)
+    pooled = simulate_balances(PRINCIPALS, RATES, YEARS, CONTRIBUTIONS, n_paths=350, seed=7)
+
+    assert pooled.shape == (350, 3)
+    np.testing.assert_array_equal(pooled, in_process)
+
+
+def test_summary_and_goal_probability():
+    balances = np.arange(1.0, 101.0)[:, None] * [1.0, 10.0]
+    summary = summarize_balances(balances)
+
+    np.testing.assert_allclose(summary['p50'], [50.5, 505.0])
+    assert summary['p10'][0] < summary['p50'][0] < summary['p90'][0]
+    np.testing.assert_allclose(goal_success_probability(balances, [91.0, 2000.0]), [0.1, 0.0])
@@ -0,0 +1,38 @@
+import sqlite3
+
+from persistence import Journal
+
+
+def test_restore_after_compaction(tmp_path):
+    path = str(tmp_path / 'state.db')
+    journal = Journal('household', path)
+    journal.record('set', 'future_you.widget.monthly_income', 6000.0)
+    journal.record('append', 'future_you.goals', {'name': 'Car', 'cost': 20000})
+    journal.record('append', 'future_you.goals', {'name': 'Trip', 'cost': 3000})
+    journal.record('put', 'current_you.fixed_expenses', ['Housing', 1500.0])
+    journal.compact()
+
+    # Entries written after the snapshot are applied on top of it
+    journal.record('delete', 'future_you.goals', 'Car')
+    journal.record('put', 'current_you.fixed_expenses', ['Utilities', 120.0])
+    Journal('other', path).record('set', 'future_you.widget.monthly_income', 1.0)
+
+    assert Journal('household', path).restore() == {
+        'future_you.widget.monthly_income': 6000.0,
+        'future_you.goals': [{'name': 'Trip', 'cost': 3000}],
+        'current_you.fixed_expenses': {'Housing': 1500.0, 'Utilities': 120.0},
+    }
+
+
+def test_compaction_drops_covered_entries(tmp_path):
+    path = str(tmp_path / 'state.db')
+    journal = Journal('household', path)
+    for value in range(10):
+        journal.record('set', 'key', value)
+    journal.compact()
+    journal.compact()  # Nothing new to fold in
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT COUNT(*) FROM journal").fetchone()[0] == 0
+    assert connection.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 1
+    assert Journal('household', path).restore() == {'key': 9}
@@ -0,0 +1,41 @@
+import numpy as np
+
+from projections import balances_in_year, build_projection_table, growth_factors, project_future_values
+
+
+# The scalar formula the dashboard used before the projection engine
+def scalar_future_value(principal, annual_rate, years, monthly_contribution):
+    if annual_rate == 0:
+        return principal + (monthly_contribution * years * 12)
+    monthly_rate = annual_rate / 100 / 12
+    months = years * 12
+    return principal * (1 + monthly_rate) ** months + monthly_contribution * (((1 + monthly_rate) ** months - 1) / monthly_rate)
+
+
+def test_batch_projection_matches_the_scalar_formula():
+    principals = np.array([0.0, 1000.0, 25000.0, 500.0, 12000.0])
+    annual_rates = np.array([5.0, 0.0, 7.25, 1e-6, 3.0])
+    years = np.array([10, 3, 30, 1, 0])
+    contributions = np.array([200.0, 50.0, 0.0, 10.0, 100.0])
+
+    expected = [scalar_future_value(*values) for values in zip(principals, annual_rates, years, contributions)]
+    np.testing.assert_allclose(project_future_values(principals, annual_rates, years, contributions), expected, rtol=1e-9)
+
+
+def test_growth_factors_repeat_pairs():
+    rates = np.array([[0.01, 0.02], [0.01, 0.0]])
+    months = np.array([12, 24])
+
+    np.testing.assert_allclose(growth_factors(rates, months), [[1.01 ** 12, 1.02 ** 24], [1.01 ** 12, 1.0]])
+
+
+def test_projection_table_year_lookup():
+    years, balances = build_projection_table([1000.0, 5000.0], [4.0, 0.0], 2025, 2035, [100.0, 0.0])
+
+    assert list(years) == list(range(2025, 2036))
+    for year in (2025, 2030, 2035):
+        expected = [scalar_future_value(1000.0, 4.0, year - 2025, 100.0), 5000.0]
+        np.testing.assert_allclose(balances_in_year(years, balances, year), expected, rtol=1e-9)
+    # Years outside the table read its first or last column
+    np.testing.assert_allclose(balances_in_year(years, balances, 2050), balances[:, -1])
+    np.testing.assert_allclose(balances_in_year(years, balances, 2000), balances[:, 0])
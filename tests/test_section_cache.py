@@ -0,0 +1,41 @@
+from ledger import AccountLedger
+from section_cache import SectionCache, fingerprint
+
+
+def test_unchanged_sections_are_not_recomputed():
+    cache = SectionCache(4)
+    computed = []
+
+    def compute(value):
+        computed.append(value)
+        return value * 2
+
+    assert cache.get_or_compute('partner_1', fingerprint(1), lambda: compute(1)) == 2
+    assert cache.get_or_compute('partner_1', fingerprint(1), lambda: compute(1)) == 2
+    # The same inputs in another section, or new inputs in the same section, are computed
+    assert cache.get_or_compute('partner_2', fingerprint(1), lambda: compute(1)) == 2
+    assert cache.get_or_compute('partner_1', fingerprint(2), lambda: compute(2)) == 4
+    assert computed == [1, 1, 2]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_least_recently_used_section_is_evicted():
+    cache = SectionCache(2)
+    cache.get_or_compute('a', 'key', lambda: 'a')
+    cache.get_or_compute('b', 'key', lambda: 'b')
+    cache.get_or_compute('a', 'key', lambda: 'recomputed')
+    cache.get_or_compute('c', 'key', lambda: 'c')
+
+    assert list(cache.entries) == [('a', 'key'), ('c', 'key')]
+    assert cache.get_or_compute('b', 'key', lambda: 'recomputed') == 'recomputed'
+
+
+def test_fingerprint_follows_ledger_contents():
+    accounts = AccountLedger()
+    accounts.append('Savings', 'Savings', 2.0, 1000.0)
+    before = fingerprint(accounts, 2030)
+
+    assert fingerprint(accounts, 2030) == before
+    assert fingerprint(accounts, 2031) != before
+    accounts.append('Brokerage', 'Investment', 6.0, 500.0)
+    assert fingerprint(accounts, 2030) != before
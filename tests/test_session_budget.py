@@ -0,0 +1,36 @@
+from streamlit.testing.v1 import AppTest
+
+
+def budget_script():
+    import streamlit as st
+    from session_budget import use_derived, enforce_budget
+
+    # Inputs are never registered, so they are kept whatever their size
+    st.session_state.setdefault('upload', b'x' * 2 ** 21)
+    if 'first' not in st.session_state:
+        for key in ('first', 'second', 'third'):
+            st.session_state[key] = b'x' * 2 ** 20
+            use_derived(key)
+        # Using the oldest again makes the second the least recently used
+        use_derived('first')
+    enforce_budget(limit_mb=2.5)
+
+
+def test_least_recently_used_derived_data_is_evicted():
+    at = AppTest.from_function(budget_script).run()
+    assert not at.exception
+
+    assert 'second' not in at.session_state
+    assert 'first' in at.session_state and 'third' in at.session_state
+    assert 'upload' in at.session_state
+    assert 2 * 2 ** 20 < at.session_state['derived_memory_bytes'] <= 2.5 * 2 ** 20
+    assert set(at.session_state['derived_sizes']) == {'first', 'third'}
+
+
+def test_derived_data_dropped_elsewhere_is_forgotten():
+    at = AppTest.from_function(budget_script).run()
+    del at.session_state['third']
+    at.run()
+
+    assert set(at.session_state['derived_sizes']) == {'first'}
+    assert at.session_state['derived_memory_bytes'] == at.session_state['derived_sizes']['first']
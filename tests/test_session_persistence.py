@@ -0,0 +1,56 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from persistence import Journal
+
+CURRENT_YOU = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'current_you.py')
+
+
+def restore_script():
+    import streamlit as st
+    from session_persistence import restore_widgets
+
+    # Saved values of widgets Streamlit dropped while another page was shown
+    st.session_state.setdefault('persisted_widgets', {
+        'future_you.widget.monthly_income': 8000.0,
+        'future_you.widget.interest_rate': 5.0,
+        'current_you.widget.post_tax_income': 7000.0,
+    })
+    if st.session_state.get('restore'):
+        restore_widgets('future_you')
+
+
+def test_restore_widgets_puts_back_dropped_widgets_of_its_namespace():
+    at = AppTest.from_function(restore_script)
+    at.session_state['restore'] = True
+    at.session_state['interest_rate'] = 3.0
+    at.run()
+
+    assert at.session_state['monthly_income'] == 8000.0
+    # Widgets still in the session keep their current value
+    assert at.session_state['interest_rate'] == 3.0
+    assert 'post_tax_income' not in at.session_state
+
+
+def test_current_you_takes_the_limit_from_saved_future_you_goals(tmp_path):
+    journal = Journal('household', str(tmp_path / 'state.db'))
+    journal.record('set', 'future_you.widget.monthly_income', 6000.0)
+    for contribution in (1200.0, 549.6):
+        journal.record('append', 'future_you.goals', {'goal_name': f'Goal {contribution}', 'monthly_contribution': contribution})
+
+    at = AppTest.from_file(CURRENT_YOU, default_timeout=60)
+    at.session_state['journal'] = journal
+    at.run()
+
+    assert not at.exception
+    assert at.number_input(key='future_you_limit').value == 4250.0
+
+
+def test_current_you_without_saved_goals_has_no_limit(tmp_path):
+    at = AppTest.from_file(CURRENT_YOU, default_timeout=60)
+    at.session_state['journal'] = Journal('household', str(tmp_path / 'state.db'))
+    at.run()
+
+    assert not at.exception
+    assert at.number_input(key='future_you_limit').value == 0.0
@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from statements import IGNORE, OTHER_CATEGORY, StatementSummary, month_key, summarize_statements
+
+
+@pytest.mark.parametrize('description, category', [
+    ("PARENTS TUTORING", OTHER_CATEGORY),
+    ("AVIS CAR RENTAL", OTHER_CATEGORY),
+    ("CURRENT ACCOUNT FEE", OTHER_CATEGORY),
+    ("REPUBLIC SERVICES", OTHER_CATEGORY),
+    ("SHELLFISH RESTAURANT", ('variable', 'Dining Out')),
+    ("SPARKING WATER CO", OTHER_CATEGORY),
+    ("RENT PAYMENT - OCT", ('fixed', 'Housing')),
+    ("HOA DUES", ('fixed', 'Housing')),
+    ("SHELL OIL 57442", ('fixed', 'Transportation')),
+    ("PETRO-CANADA 0042", ('fixed', 'Transportation')),
+    ("DISNEY+ MONTHLY", ('variable', 'Fun (trips, vacations etc.)')),
+    ("Uber *Trip help.uber.com", ('fixed', 'Transportation')),
+    ("PAYMENT - THANK YOU", IGNORE),
+])
+def test_keywords_match_whole_words(description, category):
+    assert StatementSummary().categorize(description) == category
+
+
+def test_month_key_formats():
+    assert month_key("2026-03-14") == (2026, 3)
+    assert month_key("14/03/2026") == (2026, 3)
+    assert month_key("03/14/26") == (2026, 3)
+    assert month_key("Mar 14, 2026") == (2026, 3)
+    assert month_key("14-Mar-2026") == (2026, 3)
+
+
+def test_monthly_averages_from_a_statement():
+    csv_text = (
+        "Date,Description,Amount\n"
+        "2026-01-03,RENT PAYMENT,-1500.00\n"
+        "2026-01-10,STARBUCKS #123,-6.50\n"
+        "2026-01-15,PAYMENT THANK YOU,2000.00\n"
+        "2026-02-03,RENT PAYMENT,-1500.00\n"
+        "2026-02-11,STARBUCKS #123,-5.50\n"
+        "2026-02-12,STARBUCKS REFUND,2.00\n"
+        "2026-02-20,\"CORNER STORE, INC\",\"-1,000.00\"\n"
+    )
+    summary = summarize_statements([io.BytesIO(csv_text.encode())])
+    assert summary.monthly_averages() == {
+        'fixed': {'Housing': 1500.0},
+        'variable': {'Dining Out': 5.0, 'Other': 500.0},
+    }
@@ -0,0 +1,43 @@
+import numpy as np
+
+from goal_solver import months_to_goal, required_monthly_contribution, target_year_from_months
+from sweep import get_sweep, sweep_axes, sweep_cache, sweep_goal
+
+GOAL = {'goal_name': 'House', 'goal_amount': 60000.0, 'current_savings': 5000.0, 'interest_rate': 5.0, 'monthly_contribution': 500.0}
+
+
+def test_sweep_matches_the_single_goal_solvers():
+    rates, years, contributions = sweep_axes(GOAL, 2025)
+    sweep = sweep_goal(GOAL['goal_amount'], GOAL['current_savings'], rates, years, contributions, 2025)
+
+    for rate_index in (0, 7, 49):
+        rate = float(rates[rate_index])
+        for year_index in (0, 9, 49):
+            required, _ = required_monthly_contribution(GOAL['goal_amount'], GOAL['current_savings'], rate, 12.0 * (years[year_index] - 2025))
+            np.testing.assert_allclose(sweep['required'][rate_index, year_index], required, rtol=1e-9)
+        for contribution_index in (0, 1, 20, 49):
+            months, _ = months_to_goal(GOAL['goal_amount'], GOAL['current_savings'], rate, float(contributions[contribution_index]))
+            reach_year = sweep['reach_year'][rate_index, contribution_index]
+            if np.isnan(months):
+                assert np.isnan(reach_year)
+            else:
+                assert reach_year == target_year_from_months(2025, months)
+
+
+def test_goals_already_funded_are_reached_next_year():
+    rates, years, contributions = sweep_axes(GOAL, 2025)
+    sweep = sweep_goal(1000.0, 5000.0, rates, years, contributions, 2025)
+
+    assert (sweep['reach_year'] == 2026).all()
+
+
+def test_sweeps_are_cached_per_goal():
+    sweep_cache.clear()
+    sweep = get_sweep(GOAL, 2025)
+
+    # Only the goal's amount, savings and contribution pick the sweep, not its other fields
+    assert get_sweep(dict(GOAL, goal_name='Home', interest_rate=3.0), 2025) is sweep
+    assert get_sweep(dict(GOAL, goal_amount=70000.0), 2025) is not sweep
+    assert get_sweep(dict(GOAL, current_savings=6000.0), 2025) is not sweep
+    assert get_sweep(GOAL, 2026) is not sweep
+    assert sweep_cache.hits == 1
@@ -0,0 +1,54 @@
+import numpy as np
+
+import timeline
+from projections import project_future_values
+from timeline import MILESTONE_TRACES, build_timeline, goal_trajectories, patch_timeline
+
+
+def goal(name, amount, target_year, contribution=200.0):
+    return {'goal_name': name, 'goal_amount': amount, 'current_savings': 1000.0, 'interest_rate': 5.0,
+            'monthly_contribution': contribution, 'target_year': target_year, 'goal_type': 'Target Year'}
+
+
+GOALS = [goal('Car', 20000, 2030), goal('House', 60000, 2040), goal('Trip', 3000, 2027)]
+
+
+# Function to read what a figure draws: milestones, then each trajectory's name and points
+def drawn(fig):
+    return [(trace.name, trace.meta, list(trace.x), list(trace.y), list(trace.text or [])) for trace in fig.data]
+
+
+def test_trajectories_end_on_each_target():
+    months, balances = goal_trajectories(GOALS, 2025, step=7)
+
+    for row, months_to_target in enumerate([60, 180, 24]):
+        assert months_to_target in months
+        column = list(months).index(months_to_target)
+        np.testing.assert_allclose(balances[row, column], project_future_values(1000.0, 5.0, months_to_target / 12, 200.0))
+        assert np.isnan(balances[row, column + 1:]).all()
+
+
+def test_patch_matches_a_fresh_build_and_only_redraws_changed_goals(monkeypatch):
+    fig = build_timeline(GOALS, 8000.0, 2025)
+    edited = [GOALS[0], goal('House', 60000, 2040, contribution=450.0), GOALS[2], goal('Boat', 15000, 2033)]
+
+    redrawn = []
+    original = timeline.goal_trajectories
+
+    def recording_trajectories(goals, *args):
+        redrawn.extend(goal['goal_name'] for goal in goals)
+        return original(goals, *args)
+
+    monkeypatch.setattr(timeline, 'goal_trajectories', recording_trajectories)
+    patched = patch_timeline(fig, edited, 9000.0, 2025)
+
+    assert sorted(redrawn) == ['Boat', 'House']
+    assert drawn(patched) == drawn(build_timeline(edited, 9000.0, 2025))
+    assert len(patched.data) == MILESTONE_TRACES + len(edited)
+
+
+def test_patch_after_removing_a_goal():
+    fig = build_timeline(GOALS, 8000.0, 2025)
+    patched = patch_timeline(fig, GOALS[1:], 8000.0, 2025)
+
+    assert drawn(patched) == drawn(build_timeline(GOALS[1:], 8000.0, 2025))
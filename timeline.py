@@ -0,0 +1,152 @@
+import math
+
+import numpy as np
+import plotly.graph_objects as go
+
+from projections import project_future_values
+from section_cache import fingerprint
+
+# Timeline figure for the Future You tool: one milestone dot per goal plus each goal's projected
+# savings, month by month, up to its target year. All trajectories are computed in one vectorized
+# pass, thinned out when there are many points, and drawn with WebGL when there are many goals.
+# A built figure can be patched in place so only the goals that changed are recomputed.
+
+MAX_POINTS = 20000  # Points across all trajectories before the months are thinned out
+WEBGL_GOALS = 20  # Goals before the trajectories switch to Scattergl
+MILESTONE_TRACES = 2  # The dots and the line joining them come before the trajectories
+
+
+# Function to fingerprint each goal, so unchanged goals keep their trajectory trace.
+# Identical goals get a running number so each still has its own trace.
+def goal_keys(goals):
+    seen = {}
+    keys = []
+    for goal in goals:
+        key = fingerprint(sorted(goal.items()))
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(f"{key}:{seen[key]}")
+    return keys
+
+
+# Function to pick how many months apart the plotted points are, given the number of goals and the horizon
+def month_step(goal_count, horizon_months):
+    return max(1, math.ceil(goal_count * (horizon_months + 1) / MAX_POINTS))
+
+
+# Function to compute the projected savings of many goals month by month, in one vectorized pass.
+# Returns (months, balances) with balances shaped goal x month and NaN after each goal's target year.
+def goal_trajectories(goals, current_year, step=1):
+    horizons = np.array([12 * max(0, goal['target_year'] - current_year) for goal in goals], dtype=int)
+    horizon = int(horizons.max()) if len(goals) else 0
+    # Every step-th month plus each goal's own target month, so every line ends exactly on its goal
+    months = np.union1d(np.arange(0, horizon + 1, step), horizons)
+    balances = project_future_values(
+        np.array([goal['current_savings'] for goal in goals], dtype=float)[:, None],
+        np.array([goal['interest_rate'] for goal in goals], dtype=float)[:, None],
+        months[None, :] / 12,
+        np.array([goal['monthly_contribution'] for goal in goals], dtype=float)[:, None],
+    )
+    balances[months[None, :] > horizons[:, None]] = np.nan
+    return months, balances
+
+
+# Function to build one trajectory trace per goal
+def trajectory_traces(goals, keys, current_year, step, webgl):
+    if not goals:
+        return []
+    months, balances = goal_trajectories(goals, current_year, step)
+    years = current_year + months / 12
+    scatter = go.Scattergl if webgl else go.Scatter
+    traces = []
+    for goal, key, balance in zip(goals, keys, balances):
+        filled = ~np.isnan(balance)
+        traces.append(scatter(
+            x=years[filled],
+            y=balance[filled].round(2),
+            mode='lines',
+            name=goal['goal_name'],
+            yaxis='y2',
+            meta=key,
+            hovertemplate=f"<b>{goal['goal_name']}</b><br>%{{x:.1f}}: $%{{y:,.0f}}<extra></extra>",
+        ))
+    return traces
+
+
+# Function to compute the milestone dots (current year plus one per goal) and their hover text
+def milestones(goals, monthly_income, current_year):
+    total_contribution = sum(goal['monthly_contribution'] for goal in goals)
+    remaining_for_current_you = monthly_income - total_contribution
+    years = [current_year] + [goal['target_year'] for goal in goals]
+    events = ['Current Year'] + [goal['goal_name'] for goal in goals]
+    texts = [
+        f"<b>Year:</b> {current_year}<br><b>Monthly Income:</b> ${int(round(monthly_income))}<br><b>Monthly contributions towards goals:</b> ${int(round(total_contribution))}<br><b>Monthly money remaining for current you:</b> ${int(round(remaining_for_current_you))}"
+    ] + [
+        f"<b>Year:</b> {goal['target_year']}<br><b>Goal Name:</b> {goal['goal_name']}<br><b>Goal Amount:</b> ${int(round(goal['goal_amount']))}<br><b>Initial Contribution:</b> ${int(round(goal['current_savings']))}<br><b>Monthly Contribution:</b> ${int(round(goal['monthly_contribution']))}"
+        for goal in goals
+    ]
+    return years, events, texts
+
+
+# Function to build the whole timeline figure
+def build_timeline(goals, monthly_income, current_year):
+    years, events, texts = milestones(goals, monthly_income, current_year)
+    fig = go.Figure()
+
+    # Add dots for current year and goals
+    fig.add_trace(go.Scatter(
+        x=years,
+        y=[0] * len(years),
+        mode='markers+text',
+        marker=dict(size=12, color='black', line=dict(width=2, color='black')),
+        text=events,
+        textposition='top center',
+        hoverinfo='text',
+        hovertext=texts,
+        showlegend=False
+    ))
+
+    # Add line connecting the dots
+    fig.add_trace(go.Scatter(
+        x=years,
+        y=[0] * len(years),
+        mode='lines',
+        line=dict(color='black', width=2),
+        showlegend=False
+    ))
+
+    # Add each goal's projected savings on a second axis
+    step = month_step(len(goals), 12 * max([goal['target_year'] - current_year for goal in goals], default=0))
+    webgl = len(goals) > WEBGL_GOALS
+    fig.add_traces(trajectory_traces(goals, goal_keys(goals), current_year, step, webgl))
+
+    fig.update_layout(
+        xaxis_title='Year',
+        yaxis=dict(visible=False),
+        yaxis2=dict(title='Projected savings ($)', overlaying='y', side='right', rangemode='tozero'),
+        showlegend=False,
+        meta=dict(step=step, webgl=webgl)
+    )
+    return fig
+
+
+# Function to bring a built timeline up to date, recomputing only the trajectories of goals that changed
+def patch_timeline(fig, goals, monthly_income, current_year):
+    step = month_step(len(goals), 12 * max([goal['target_year'] - current_year for goal in goals], default=0))
+    webgl = len(goals) > WEBGL_GOALS
+    if fig.layout.meta != dict(step=step, webgl=webgl):
+        return build_timeline(goals, monthly_income, current_year)
+
+    keys = goal_keys(goals)
+    cached = {trace.meta: trace for trace in fig.data[MILESTONE_TRACES:]}
+    if list(cached) != keys:
+        # Keep the traces of unchanged goals, then add the new ones and put everything back in goal order
+        changed = [(goal, key) for goal, key in zip(goals, keys) if key not in cached]
+        fig.data = fig.data[:MILESTONE_TRACES] + tuple(cached[key] for key in keys if key in cached)
+        fig.add_traces(trajectory_traces([goal for goal, key in changed], [key for goal, key in changed], current_year, step, webgl))
+        position = {key: index for index, key in enumerate(keys)}
+        fig.data = fig.data[:MILESTONE_TRACES] + tuple(sorted(fig.data[MILESTONE_TRACES:], key=lambda trace: position[trace.meta]))
+
+    years, events, texts = milestones(goals, monthly_income, current_year)
+    fig.data[0].update(x=years, y=[0] * len(years), text=events, hovertext=texts)
+    fig.data[1].update(x=years, y=[0] * len(years))
+    return fig